@@ -0,0 +1,122 @@
+"""Absolute-position speed/volume control.
+
+Instead of stepping the speed or volume a notch at a time on random draws from
+per-frame distance deltas, the smoothed pinch distance is mapped straight to a
+target level through a calibrated curve. A hysteresis band keeps the level from
+flickering at level boundaries, and only the settled target is emitted, at a
+bounded rate, so one pinch sweep costs one browser command instead of many.
+The same input sequence always produces the same commands.
+"""
+
+
+class ControlCurve:
+    """Piecewise-linear map from pinch distance to a position in [0, 1].
+
+    `points` are (distance, position) pairs with increasing distance; inputs
+    outside the calibrated range are clamped.
+    """
+    def __init__(self, points):
+        self.points = sorted(points)
+        if len(self.points) < 2:
+            raise ValueError("A control curve needs at least two points")
+
+    @classmethod
+    def linear(cls, low, high):
+        return cls([(low, 0.0), (high, 1.0)])
+
+    def __call__(self, distance):
+        points = self.points
+        if distance <= points[0][0]:
+            return points[0][1]
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            if distance <= x1:
+                return y0 + (y1 - y0) * (distance - x0) / (x1 - x0)
+        return points[-1][1]
+
+
+class HysteresisQuantizer:
+    """Snaps a position in [0, 1] to one of `levels` with a dead band.
+
+    The level only moves once the position is more than `hysteresis` (in
+    units of one level step) past the midpoint to the neighbouring level.
+    """
+    def __init__(self, levels, hysteresis=0.3, initial_index=None):
+        self.levels = list(levels)
+        self.hysteresis = hysteresis
+        self.index = initial_index
+
+    def __call__(self, position):
+        raw = position * (len(self.levels) - 1)
+        nearest = int(round(raw))
+        if self.index is None or abs(raw - self.index) > 0.5 + self.hysteresis:
+            self.index = max(0, min(len(self.levels) - 1, nearest))
+        return self.index
+
+
+class CoalescingEmitter:
+    """Emits a target only after it has settled, and not more often than allowed.
+
+    `update` returns the value to send now, or None. A target must stay
+    unchanged for `settle_time` seconds, and emissions are at least
+    `min_interval` seconds apart; intermediate targets are never sent.
+    """
+    def __init__(self, settle_time=0.15, min_interval=0.3, initial=None):
+        self.settle_time = settle_time
+        self.min_interval = min_interval
+        self.emitted = initial
+        self.pending = None
+        self.pending_since = None
+        self.last_emit = float("-inf")
+        self.suppressed = 0
+
+    def update(self, t, target):
+        if target != self.pending:
+            if self.pending is not None and self.pending != self.emitted:
+                self.suppressed += 1
+            self.pending = target
+            self.pending_since = t
+        if self.pending == self.emitted:
+            return None
+        if t - self.pending_since >= self.settle_time and t - self.last_emit >= self.min_interval:
+            self.emitted = self.pending
+            self.last_emit = t
+            return self.emitted
+        return None
+
+
+class AbsoluteControl:
+    """Distance -> curve -> quantized level -> coalesced emission."""
+    def __init__(self, levels, curve, hysteresis=0.3, settle_time=0.15, min_interval=0.3, initial=None):
+        self.levels = list(levels)
+        self.curve = curve
+        initial_index = self._index_of(initial) if initial is not None else None
+        self.quantizer = HysteresisQuantizer(self.levels, hysteresis, initial_index)
+        self.emitter = CoalescingEmitter(settle_time, min_interval, initial)
+
+    def _index_of(self, value):
+        return min(range(len(self.levels)), key=lambda i: abs(self.levels[i] - value))
+
+    def sync(self, value):
+        """Adopt a value set elsewhere (page buttons, keyboard) as the emitted state."""
+        self.emitter.emitted = value
+        self.emitter.pending = value
+        self.quantizer.index = self._index_of(value)
+
+    def update(self, t, distance):
+        """Returns (target, value to emit now or None)."""
+        index = self.quantizer(self.curve(distance))
+        target = self.levels[index]
+        return target, self.emitter.update(t, target)
+
+    def settle(self, t):
+        """Keeps the last target without a new distance; returns the value to emit now or None."""
+        if self.emitter.pending is None:
+            return None
+        return self.emitter.update(t, self.emitter.pending)
+
+
+def parse_range(text):
+    low, high = (float(part) for part in text.split(","))
+    if not low < high:
+        raise ValueError(f"Calibration range must be LOW,HIGH with LOW < HIGH, got {text!r}")
+    return low, high
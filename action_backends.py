@@ -0,0 +1,260 @@
+"""Player action backends.
+
+Gestures end in five player actions: set_speed, set_volume, toggle_pause,
+next and query_state. `ActionBackend` is that interface; the controller's
+Selenium/DevTools path (youtube_controlv1.SeleniumBackend) is one
+implementation and `MpvBackend` another, talking to a local mpv over its
+JSON IPC socket (`mpv --input-ipc-server=/tmp/mpvsocket`). Each mpv command is
+one line on a local socket, so an action takes well under a millisecond.
+
+`MpvStandIn` answers the same protocol from a fake player, for checks without
+mpv installed:
+
+    python action_backends.py [--socket /tmp/mpvsocket] [--commands 1000]
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+PlayerState = namedtuple("PlayerState", "speed volume paused")
+# speed: playback rate, volume: 0.0 - 1.0, paused: bool
+
+
+class ActionBackendError(Exception):
+    pass
+
+
+class ActionBackend:
+    """Player actions used by the gesture controller.
+
+    Setters return True when the player accepted the value. Implementations
+    raise ActionBackendError (or the transport's own exception) on failure.
+    """
+    name = "backend"
+
+    def set_speed(self, speed):
+        raise NotImplementedError
+
+    def set_volume(self, volume):
+        raise NotImplementedError
+
+    def toggle_pause(self):
+        """Toggles pause; returns the paused state after the toggle."""
+        raise NotImplementedError
+
+    def next(self):
+        raise NotImplementedError
+
+    def query_state(self):
+        """Current PlayerState."""
+        raise NotImplementedError
+
+    def alive(self):
+        return True
+
+    def close(self):
+        pass
+
+
+# ======== mpv JSON IPC ========
+class MpvBackend(ActionBackend):
+    """mpv over its JSON IPC socket (a Unix socket, or a named pipe on Windows)."""
+    name = "mpv"
+
+    def __init__(self, path, timeout=2.0):
+        self.path = path
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.request_id = 0
+        self.buffer = b""
+        if os.name == "nt":
+            self.pipe = open(path, "r+b", buffering=0)
+            self.sock = None
+        else:
+            self.pipe = None
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(path)
+
+    def _write(self, data):
+        if self.sock is not None:
+            self.sock.sendall(data)
+        else:
+            self.pipe.write(data)
+
+    def _read_line(self):
+        while b"\n" not in self.buffer:
+            chunk = self.sock.recv(4096) if self.sock is not None else self.pipe.read(4096)
+            if not chunk:
+                raise ActionBackendError("mpv closed the IPC connection")
+            self.buffer += chunk
+        line, self.buffer = self.buffer.split(b"\n", 1)
+        return line
+
+    def commands(self, *commands):
+        """Sends several commands in one write and returns their data in order."""
+        with self.lock:
+            ids = []
+            lines = []
+            for command in commands:
+                self.request_id += 1
+                ids.append(self.request_id)
+                lines.append(json.dumps({"command": list(command), "request_id": self.request_id}))
+            self._write(("\n".join(lines) + "\n").encode())
+            replies = {}
+            while len(replies) < len(ids):
+                reply = json.loads(self._read_line())
+                # Asynchronous events share the connection; skip them.
+                if reply.get("request_id") in ids:
+                    replies[reply["request_id"]] = reply
+        results = []
+        for request_id, command in zip(ids, commands):
+            reply = replies[request_id]
+            if reply.get("error") != "success":
+                raise ActionBackendError(f"mpv {command[0]} failed: {reply.get('error')}")
+            results.append(reply.get("data"))
+        return results
+
+    def set_speed(self, speed):
+        self.commands(("set_property", "speed", speed))
+        return True
+
+    def set_volume(self, volume):
+        self.commands(("set_property", "volume", volume * 100))
+        return True
+
+    def toggle_pause(self):
+        _, paused = self.commands(("cycle", "pause"), ("get_property", "pause"))
+        return paused
+
+    def next(self):
+        self.commands(("playlist-next", "force"))
+        return True
+
+    def query_state(self):
+        speed, volume, paused = self.commands(("get_property", "speed"), ("get_property", "volume"),
+                                              ("get_property", "pause"))
+        return PlayerState(speed, volume / 100, paused)
+
+    def alive(self):
+        try:
+            self.commands(("get_property", "pid"))
+            return True
+        except (OSError, ValueError, ActionBackendError):
+            return False
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+        if self.pipe is not None:
+            self.pipe.close()
+
+
+class MpvStandIn:
+    """Unix-socket server answering mpv's JSON IPC from a fake player."""
+    def __init__(self, path=None):
+        self.path = path or os.path.join(tempfile.mkdtemp(prefix="mpv-standin-"), "socket")
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.path)
+        self.server.listen(4)
+        self.properties = {"speed": 1.0, "volume": 100.0, "pause": False, "playlist-pos": 0, "pid": os.getpid()}
+        self.lock = threading.Lock()
+        self.commands = 0
+        self.running = False
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self._accept_loop, name="mpv-standin", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self.server.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        stream = conn.makefile("rb")
+        for line in stream:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                continue
+            replies = self.handle(request)
+            conn.sendall(b"".join(json.dumps(reply).encode() + b"\n" for reply in replies))
+        conn.close()
+
+    def handle(self, request):
+        command = request.get("command", [])
+        reply = {"request_id": request.get("request_id", 0), "error": "success"}
+        events = []
+        with self.lock:
+            self.commands += 1
+            name = command[0] if command else None
+            if name == "get_property" and command[1] in self.properties:
+                reply["data"] = self.properties[command[1]]
+            elif name == "set_property" and command[1] in self.properties:
+                self.properties[command[1]] = command[2]
+                reply["data"] = None
+            elif name == "cycle" and command[1] == "pause":
+                self.properties["pause"] = not self.properties["pause"]
+                events.append({"event": "pause" if self.properties["pause"] else "unpause"})
+            elif name == "playlist-next":
+                self.properties["playlist-pos"] += 1
+                events.append({"event": "start-file", "playlist_entry_id": self.properties["playlist-pos"]})
+            else:
+                reply["error"] = "invalid parameter"
+        # Real mpv interleaves events with replies; send them first to exercise the client.
+        return events + [reply]
+
+
+# ======== Self-check ========
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure action latency through the mpv IPC backend.")
+    parser.add_argument("--socket", help="IPC socket of a running mpv (default: start the bundled stand-in)")
+    parser.add_argument("--commands", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    stand_in = None
+    path = args.socket
+    if path is None:
+        stand_in = MpvStandIn().start()
+        path = stand_in.path
+    backend = MpvBackend(path)
+    latencies = []
+    for i in range(args.commands):
+        start = time.perf_counter()
+        if i % 2:
+            backend.set_speed(0.25 + (i % 8) * 0.25)
+        else:
+            backend.set_volume((i % 11) / 10)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print(f"{args.commands} actions: p50 {latencies[len(latencies) // 2] * 1000:.3f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.3f} ms")
+    print(f"Paused after toggle: {backend.toggle_pause()}, next: {backend.next()}")
+    print(f"State: {backend.query_state()}")
+    backend.close()
+    if stand_in is not None:
+        stand_in.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
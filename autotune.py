@@ -0,0 +1,304 @@
+"""Tune gesture parameters on recorded landmark sessions.
+
+Takes landmark recordings (--record) with a labels CSV each (`time,gesture`,
+one row per intended action, see gesture_engine.load_labels) and searches
+the parameters in gesture_engine.DEFAULT_PROFILE: pinch thresholds, hold
+durations, the action cooldown, and the relative speed/volume step
+thresholds and intervals. The result is a profile JSON for
+`youtube_controlv1.py --profile`.
+
+A candidate is scored the way the render loop would behave on the
+recordings: hold gestures through `evaluate_batch` and relative steps through
+`step_events`, which mirrors the step conditions of process_frame_result.
+Fires are matched to labels (`match_events`). The cost per labelled action is
+
+    (sum of latencies + false_cost * false triggers + miss_cost * misses) / labels
+
+so --false-trigger-cost sets how many seconds of latency one false trigger
+is worth. Only gestures that appear in the labels are scored unless
+--gestures says otherwise; a corpus labelled for pause/play does not tune the
+volume steps.
+
+The search samples the space at random (the defaults are always a
+candidate), then refines around the best candidates with shrinking steps.
+Candidates are scored in a process pool; each worker receives the feature
+arrays once, smoothing is not redone per candidate.
+
+    python autotune.py station3_*.hlrec --labels station3_a.csv,station3_b.csv --out station3.json
+    python youtube_controlv1.py --profile station3.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from gesture_engine import (DEFAULT_PROFILE, GestureEvent, evaluate_batch, load_labels, match_events,
+                            profile_rules, recording_features, speed_step_threshold)
+
+# name: (low, high, decimals)
+SEARCH_SPACE = {
+    "threshold_close": (0.05, 0.12, 3),
+    "threshold_open": (0.11, 0.25, 3),
+    "pause_duration": (0.3, 1.2, 2),
+    "next_duration": (0.4, 1.5, 2),
+    "action_interval": (0.8, 3.0, 2),
+    "speed_change_interval": (0.0, 0.3, 3),
+    "volume_change_interval": (0.0, 0.3, 3),
+    "volume_change_threshold": (0.002, 0.015, 4),
+    "speed_threshold_base": (0.001, 0.006, 4),
+    "speed_threshold_gain": (0.0, 0.004, 4),
+    "speed_threshold_min": (0.001, 0.004, 4),
+    "speed_threshold_max": (0.003, 0.01, 4),
+}
+STEP_GESTURES = {"speed": ("Speed Up", "Speed Down"), "volume": ("Volume Up", "Volume Down")}
+# Which gestures each parameter affects; parameters of unscored gestures keep their defaults.
+PARAMETER_GESTURES = {
+    "threshold_close": {"Pause", "Play", "Speed Up", "Speed Down"},
+    "threshold_open": {"Play"},
+    "pause_duration": {"Pause", "Play"},
+    "next_duration": {"Next"},
+    "action_interval": {"Pause", "Play", "Next"},
+    "speed_change_interval": set(STEP_GESTURES["speed"]),
+    "volume_change_interval": set(STEP_GESTURES["volume"]),
+    "volume_change_threshold": set(STEP_GESTURES["volume"]),
+    "speed_threshold_base": set(STEP_GESTURES["speed"]),
+    "speed_threshold_gain": set(STEP_GESTURES["speed"]),
+    "speed_threshold_min": set(STEP_GESTURES["speed"]),
+    "speed_threshold_max": set(STEP_GESTURES["speed"]),
+}
+TRACK_TIMEOUT = 0.3  # HandTracker's max_missed: a longer gap starts a new track without a previous distance
+PROFILE_VERSION = 1
+
+
+# ======== Simulation ========
+def step_events(times, distance, present, profile, kind):
+    """Relative speed or volume steps the render loop would attempt, as fire events.
+
+    A step needs a smoothed pinch change since the hand's previous frame above
+    the threshold and the step interval since the last attempt. Whether
+    adjust_playback_speed / adjust_volume then moves a level is random and not
+    modelled; an attempt counts as a fire.
+    """
+    frames = np.flatnonzero(present)
+    if len(frames) < 2:
+        return []
+    t = times[frames]
+    d = distance[frames]
+    change = np.diff(d)
+    continuous = np.diff(t) <= TRACK_TIMEOUT
+    if kind == "speed":
+        candidate = continuous & (np.abs(change) > speed_step_threshold(change, profile)) & \
+                    (np.abs(d[1:] - profile["threshold_close"]) > 0.02)
+        interval = profile["speed_change_interval"]
+    else:
+        candidate = continuous & (np.abs(change) > profile["volume_change_threshold"])
+        interval = profile["volume_change_interval"]
+    up, down = STEP_GESTURES[kind]
+    events = []
+    last = -np.inf
+    for i in np.flatnonzero(candidate):
+        if t[i + 1] - last > interval:
+            last = t[i + 1]
+            events.append(GestureEvent(float(last), up if change[i] > 0 else down, "fire", 0.0))
+    return events
+
+
+def simulate(profile, times, features, gestures, hold_mode="timer", false_trigger_bound=0.01):
+    """Fire events of the scored gestures for one recording, sorted by time."""
+    rules = profile_rules(profile, hold_mode=hold_mode, false_trigger_bound=false_trigger_bound)
+    fires = [event for event in evaluate_batch(rules, times, features)
+             if event.kind == "fire" and event.name in gestures]
+    if gestures & set(STEP_GESTURES["speed"]):
+        fires += step_events(times, features["left_distance"], features["left_present"], profile, "speed")
+    if gestures & set(STEP_GESTURES["volume"]):
+        fires += step_events(times, features["right_distance"], features["right_present"], profile, "volume")
+    fires = [event for event in fires if event.name in gestures]
+    fires.sort(key=lambda event: event.time)
+    return fires
+
+
+def score_profile(profile, corpus, options):
+    """Cost and counts of one candidate over the whole corpus."""
+    labels_total = matched_total = false_total = missed_total = 0
+    latencies = []
+    for times, features, labels, gestures in corpus:
+        fires = simulate(profile, times, features, gestures, options["hold_mode"], options["false_trigger_bound"])
+        matched, false, missed = match_events(fires, labels, options["tolerance"], options["window"])
+        labels_total += len(labels)
+        matched_total += len(matched)
+        false_total += len(false)
+        missed_total += len(missed)
+        latencies.extend(max(0.0, event.time - ref_time) for event, ref_time in matched)
+    cost = (sum(latencies) + options["false_cost"] * false_total + options["miss_cost"] * missed_total) / max(labels_total, 1)
+    return {
+        "cost": round(cost, 4),
+        "labels": labels_total,
+        "matched": matched_total,
+        "false_triggers": false_total,
+        "missed": missed_total,
+        "latency_p50": round(float(np.percentile(latencies, 50)), 3) if latencies else None,
+        "latency_p95": round(float(np.percentile(latencies, 95)), 3) if latencies else None,
+    }
+
+
+# ======== Worker pool ========
+_worker = {}
+
+
+def _init_worker(corpus, options):
+    _worker["corpus"] = corpus
+    _worker["options"] = options
+
+
+def _score_in_worker(profile):
+    return score_profile(profile, _worker["corpus"], _worker["options"])
+
+
+# ======== Search ========
+def tunable_parameters(corpus):
+    """Parameters that affect at least one scored gesture of the corpus."""
+    scored = set().union(*(gestures for _, _, _, gestures in corpus))
+    return [name for name in SEARCH_SPACE if PARAMETER_GESTURES[name] & scored]
+
+
+def sample_profile(rng, names, center=None, scale=1.0):
+    """A random candidate varying `names`; around `center` with steps of `scale` times each range when given."""
+    profile = dict(DEFAULT_PROFILE if center is None else center)
+    for name in names:
+        low, high, decimals = SEARCH_SPACE[name]
+        if center is None:
+            value = rng.uniform(low, high)
+        else:
+            value = center[name] + rng.normal(0.0, scale * (high - low) / 4)
+        profile[name] = round(float(np.clip(value, low, high)), decimals)
+    # Keep a dead band between pause and play, and the clip range ordered.
+    if profile["threshold_open"] - profile["threshold_close"] < 0.02:
+        profile["threshold_open"] = round(profile["threshold_close"] + 0.02, 3)
+    if profile["speed_threshold_min"] > profile["speed_threshold_max"]:
+        profile["speed_threshold_min"], profile["speed_threshold_max"] = \
+            profile["speed_threshold_max"], profile["speed_threshold_min"]
+    return profile
+
+
+def search(corpus, options, trials=400, workers=None, seed=0, rounds=4, keep=5, progress=None):
+    """Returns [(score, profile)] of all candidates, best first."""
+    rng = np.random.default_rng(seed)
+    explore = max(1, trials // 2)
+    names = tunable_parameters(corpus)
+    candidates = [dict(DEFAULT_PROFILE)] + [sample_profile(rng, names) for _ in range(explore - 1)]
+    results = []
+    chunksize = max(1, len(candidates) // (4 * (workers or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(corpus, options)) as pool:
+        results += zip(pool.map(_score_in_worker, candidates, chunksize=chunksize), candidates)
+        if progress:
+            progress(len(results), min(results, key=lambda result: result[0]["cost"])[0])
+        per_round = (trials - explore) // rounds if rounds else 0
+        scale = 0.5
+        for _ in range(rounds):
+            if per_round < 1:
+                break
+            best = [profile for _, profile in sorted(results, key=lambda result: result[0]["cost"])[:keep]]
+            candidates = [sample_profile(rng, names, best[i % len(best)], scale) for i in range(per_round)]
+            results += zip(pool.map(_score_in_worker, candidates, chunksize=chunksize), candidates)
+            if progress:
+                progress(len(results), min(results, key=lambda result: result[0]["cost"])[0])
+            scale /= 2
+    results.sort(key=lambda result: result[0]["cost"])
+    return results
+
+
+# ======== Corpus ========
+def load_corpus(recording_paths, label_paths, gestures=None, make_filter=None):
+    """[(times, features, labels, scored gestures)] per recording."""
+    from landmark_recording import open_recording
+
+    corpus = []
+    for path, label_path in zip(recording_paths, label_paths):
+        recording = open_recording(path)
+        labels = load_labels(label_path)
+        scored = set(gestures) if gestures else {gesture for _, gesture in labels}
+        features = recording_features(recording, make_filter, right_hand=bool(scored & set(STEP_GESTURES["volume"])))
+        corpus.append((np.asarray(recording.timestamps, dtype=np.float64), features,
+                       [label for label in labels if label[1] in scored], scored))
+    return corpus
+
+
+def write_profile(path, profile, score, baseline, recordings, options):
+    document = {
+        "version": PROFILE_VERSION,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "params": {name: profile[name] for name in DEFAULT_PROFILE},
+        "score": score,
+        "baseline": baseline,
+        "objective": options,
+        "recordings": [os.path.basename(name) for name in recordings],
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+
+
+def format_score(title, score):
+    latency = "n/a" if score["latency_p50"] is None else \
+        f"p50 {score['latency_p50'] * 1000:.0f} ms, p95 {score['latency_p95'] * 1000:.0f} ms"
+    return (f"{title:9s} cost {score['cost']:.3f}  matched {score['matched']}/{score['labels']}, "
+            f"false triggers {score['false_triggers']}, missed {score['missed']}, latency {latency}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune gesture parameters on labelled landmark recordings.")
+    parser.add_argument("recordings", nargs="+", help="Landmark recordings (.hlrec)")
+    parser.add_argument("--labels", required=True,
+                        help="CSV of intended actions (time,gesture); one file per recording, comma-separated")
+    parser.add_argument("--out", default="gesture_profile.json", help="Where to write the tuned profile")
+    parser.add_argument("--trials", type=int, default=400, help="Candidates to score")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--false-trigger-cost", type=float, default=2.0,
+                        help="Seconds of latency one false trigger is worth")
+    parser.add_argument("--miss-cost", type=float, default=3.0, help="Seconds of latency one missed action is worth")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="How early (s) a fire may come before its label and still match")
+    parser.add_argument("--window", type=float, default=3.0, help="How late (s) a fire may come after its label")
+    parser.add_argument("--gestures", help="Comma-separated gestures to score (default: those in the labels)")
+    parser.add_argument("--hold-mode", choices=["timer", "evidence"], default="timer",
+                        help="Hold mode the stations run with")
+    parser.add_argument("--false-trigger-bound", type=float, default=0.01)
+    args = parser.parse_args(argv)
+    label_paths = args.labels.split(",")
+    if len(label_paths) != len(args.recordings):
+        parser.error("--labels needs one file per recording")
+
+    start = time.perf_counter()
+    gestures = args.gestures.split(",") if args.gestures else None
+    corpus = load_corpus(args.recordings, label_paths, gestures)
+    frames = sum(len(times) for times, _, _, _ in corpus)
+    options = {"false_cost": args.false_trigger_cost, "miss_cost": args.miss_cost, "tolerance": args.tolerance,
+               "window": args.window, "hold_mode": args.hold_mode, "false_trigger_bound": args.false_trigger_bound}
+    print(f"Loaded {len(corpus)} recording(s), {frames} frames, "
+          f"{sum(len(labels) for _, _, labels, _ in corpus)} labelled actions in {time.perf_counter() - start:.1f}s")
+
+    def progress(done, best):
+        print(f"  {done} candidates, best cost {best['cost']:.3f}")
+
+    start = time.perf_counter()
+    results = search(corpus, options, args.trials, args.workers, args.seed, progress=progress)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    baseline = next(score for score, profile in results if profile == DEFAULT_PROFILE)
+    score, profile = results[0]
+    print(f"Scored {len(results)} candidates in {elapsed:.1f}s ({len(results) * frames / elapsed:,.0f} frames/s)")
+    print(format_score("default", baseline))
+    print(format_score("tuned", score))
+    for name, value in profile.items():
+        if value != DEFAULT_PROFILE[name]:
+            print(f"  {name}: {DEFAULT_PROFILE[name]} -> {value}")
+    write_profile(args.out, profile, score, baseline, args.recordings, options)
+    print(f"Profile written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
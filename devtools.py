@@ -0,0 +1,461 @@
+"""Direct DevTools-protocol transport for player commands.
+
+WebDriver relays every execute_script and key press as an HTTP request to the
+driver process, which forwards it to the browser. This module holds one
+persistent DevTools WebSocket to the page instead: commands are plain
+`Runtime.evaluate` / `Input.dispatchKeyEvent` messages, several can be in
+flight at once (each reply is matched by id), and page events arrive on the
+same connection.
+
+Only the standard library is used: a minimal RFC 6455 client, a CDP session
+on top of it, and `DevToolsStandIn`, a local server that speaks enough of the
+protocol (target list, evaluate, key events, page events) to exercise the
+client without a browser:
+
+    python devtools.py [--commands 500]
+"""
+import argparse
+import base64
+import hashlib
+import itertools
+import json
+import os
+import re
+import socket
+import struct
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import Future
+from urllib.parse import urlparse
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OP_CONTINUATION, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+class DevToolsError(Exception):
+    pass
+
+
+# ======== WebSocket framing ========
+def _recv_exact(sock, n):
+    data = bytearray()
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise ConnectionError("WebSocket closed")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def encode_frame(opcode, payload, mask):
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 1 << 16:
+        header.append(mask_bit | 126)
+        header += struct.pack(">H", length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack(">Q", length)
+    if not mask:
+        return bytes(header) + payload
+    key = os.urandom(4)
+    masked = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+    return bytes(header) + key + masked
+
+
+def read_frame(sock):
+    """Returns (fin, opcode, payload) of one frame, unmasking if needed."""
+    first, second = _recv_exact(sock, 2)
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack(">H", _recv_exact(sock, 2))[0]
+    elif length == 127:
+        length = struct.unpack(">Q", _recv_exact(sock, 8))[0]
+    key = _recv_exact(sock, 4) if second & 0x80 else None
+    payload = _recv_exact(sock, length)
+    if key:
+        payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+    return bool(first & 0x80), first & 0x0F, payload
+
+
+class WebSocket:
+    """Blocking WebSocket endpoint; `send` is thread-safe, `recv` is for one reader."""
+    def __init__(self, sock, mask):
+        self.sock = sock
+        self.mask = mask
+        self.send_lock = threading.Lock()
+        self.closed = False
+
+    @classmethod
+    def connect(cls, url, timeout=5.0):
+        parsed = urlparse(url)
+        sock = socket.create_connection((parsed.hostname, parsed.port or 80), timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        key = base64.b64encode(os.urandom(16)).decode()
+        path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        sock.sendall((f"GET {path or '/'} HTTP/1.1\r\nHost: {parsed.netloc}\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+        response = b""
+        while b"\r\n\r\n" not in response:
+            chunk = sock.recv(1024)
+            if not chunk:
+                raise DevToolsError("Connection closed during WebSocket handshake")
+            response += chunk
+        head = response.split(b"\r\n\r\n", 1)[0].decode("latin-1")
+        expected = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        if " 101 " not in head.split("\r\n", 1)[0] or expected not in head:
+            raise DevToolsError(f"WebSocket handshake rejected: {head.splitlines()[0]}")
+        sock.settimeout(None)
+        return cls(sock, mask=True)
+
+    def send(self, text, opcode=OP_TEXT):
+        frame = encode_frame(opcode, text.encode() if isinstance(text, str) else text, self.mask)
+        with self.send_lock:
+            self.sock.sendall(frame)
+
+    def recv(self):
+        """Next text message, or None once the connection is closed."""
+        message = bytearray()
+        while True:
+            try:
+                fin, opcode, payload = read_frame(self.sock)
+            except (ConnectionError, OSError):
+                self.closed = True
+                return None
+            if opcode == OP_PING:
+                self.send(payload, OP_PONG)
+                continue
+            if opcode == OP_CLOSE:
+                self.closed = True
+                return None
+            if opcode in (OP_TEXT, OP_BINARY, OP_CONTINUATION):
+                message += payload
+                if fin:
+                    return message.decode()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            try:
+                self.send(b"", OP_CLOSE)
+            except OSError:
+                pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+# ======== DevTools session ========
+def list_page_targets(debugger_address, timeout=2.0):
+    """Open tabs of the browser at `debugger_address` as /json target dicts (id, url, title, ...)."""
+    with urllib.request.urlopen(f"http://{debugger_address}/json", timeout=timeout) as response:
+        targets = json.load(response)
+    return [t for t in targets if t.get("type") == "page" and t.get("webSocketDebuggerUrl")]
+
+
+def find_page_target(debugger_address, url_contains="youtube.com", timeout=2.0):
+    """WebSocket URL of the first page target whose URL contains `url_contains`."""
+    pages = list_page_targets(debugger_address, timeout)
+    for target in pages:
+        if url_contains in target.get("url", ""):
+            return target["webSocketDebuggerUrl"]
+    if pages:
+        return pages[0]["webSocketDebuggerUrl"]
+    raise DevToolsError(f"No page target at {debugger_address}")
+
+
+KEY_CODES = {"k": ("KeyK", 75), "n": ("KeyN", 78)}
+SHIFT = 8
+
+
+class DevToolsSession:
+    """CDP client over one WebSocket.
+
+    `send` returns a Future immediately, so callers can pipeline commands and
+    wait later; `call` waits for the reply. Event callbacks registered with
+    `on` run on the reader thread and must not block.
+    """
+    def __init__(self, ws_url, timeout=5.0):
+        self.ws_url = ws_url
+        self.timeout = timeout
+        self.ws = WebSocket.connect(ws_url, timeout)
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.pending_lock = threading.Lock()
+        self.listeners = {}
+        self.reader = threading.Thread(target=self._read_loop, name="devtools-reader", daemon=True)
+        self.reader.start()
+
+    @property
+    def connected(self):
+        return not self.ws.closed
+
+    def send(self, method, params=None):
+        future = Future()
+        message_id = next(self.ids)
+        with self.pending_lock:
+            if self.ws.closed:
+                # The reader has failed (or is failing) everything pending; nothing would answer this.
+                future.set_exception(DevToolsError(f"{method}: DevTools connection closed"))
+                return future
+            self.pending[message_id] = future
+        try:
+            self.ws.send(json.dumps({"id": message_id, "method": method, "params": params or {}}))
+        except OSError as e:
+            with self.pending_lock:
+                self.pending.pop(message_id, None)
+            future.set_exception(DevToolsError(f"{method}: {e}"))
+        return future
+
+    def call(self, method, params=None, timeout=None):
+        return self.send(method, params).result(timeout or self.timeout)
+
+    def on(self, event, callback):
+        self.listeners.setdefault(event, []).append(callback)
+
+    def evaluate_async(self, expression):
+        return self.send("Runtime.evaluate", {"expression": expression, "returnByValue": True})
+
+    def evaluate(self, expression, timeout=None):
+        reply = self.evaluate_async(expression).result(timeout or self.timeout)
+        if "exceptionDetails" in reply:
+            raise DevToolsError(reply["exceptionDetails"].get("text", "evaluation failed"))
+        return reply.get("result", {}).get("value")
+
+    def press_key(self, key, shift=False):
+        """Key down + up, pipelined; returns the key-up Future."""
+        code, virtual_key = KEY_CODES.get(key.lower(), (f"Key{key.upper()}", ord(key.upper())))
+        text = key.upper() if shift else key
+        params = {"key": text, "code": code, "windowsVirtualKeyCode": virtual_key,
+                  "modifiers": SHIFT if shift else 0}
+        self.send("Input.dispatchKeyEvent", dict(params, type="keyDown", text=text))
+        return self.send("Input.dispatchKeyEvent", dict(params, type="keyUp"))
+
+    def _read_loop(self):
+        while True:
+            message = self.ws.recv()
+            if message is None:
+                break
+            try:
+                data = json.loads(message)
+            except ValueError:
+                continue
+            if "id" in data:
+                with self.pending_lock:
+                    future = self.pending.pop(data["id"], None)
+                if future is None:
+                    continue
+                if "error" in data:
+                    future.set_exception(DevToolsError(data["error"].get("message", "CDP error")))
+                else:
+                    future.set_result(data.get("result", {}))
+            else:
+                for callback in self.listeners.get(data.get("method"), ()):
+                    try:
+                        callback(data.get("params", {}))
+                    except Exception as e:
+                        print(f"DevTools event handler error: {e}")
+        with self.pending_lock:
+            pending, self.pending = self.pending, {}
+        for future in pending.values():
+            future.set_exception(DevToolsError("DevTools connection closed"))
+
+    def close(self):
+        self.ws.close()
+        self.reader.join(timeout=1.0)
+
+
+# ======== Local stand-in ========
+class DevToolsStandIn:
+    """Local server speaking a small CDP subset against a fake player.
+
+    Serves GET /json with one page target and accepts WebSocket connections
+    on the same port. `Runtime.evaluate` understands the controller calls
+    (setYouTubeSpeed/setYouTubeVolume, video paused/volume/playbackRate and
+    the player-state query),
+    `Input.dispatchKeyEvent` toggles pause on "k" and loads the next video on
+    Shift+N, emitting `Page.frameNavigated` and `Page.loadEventFired`.
+    """
+    SET_CALL = re.compile(r"setYouTube(Speed|Volume)\(([-0-9.eE]+)\)")
+
+    def __init__(self, host="127.0.0.1", port=0, url="https://www.youtube.com/watch?v=standin"):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind((host, port))
+        self.server.listen(8)
+        self.address = "%s:%d" % self.server.getsockname()
+        self.state = {"url": url, "speed": 1.0, "volume": 1.0, "paused": False, "videos": 0}
+        self.state_lock = threading.Lock()
+        self.commands = 0
+        self.connections = set()
+        self.running = False
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self._accept_loop, name="devtools-standin", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self.server.close()
+
+    def drop_connections(self):
+        """Cut every WebSocket without a close frame, like a crashed browser."""
+        for conn in list(self.connections):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    @property
+    def ws_url(self):
+        return f"ws://{self.address}/devtools/page/STANDIN"
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = conn.recv(1024)
+            if not chunk:
+                conn.close()
+                return
+            request += chunk
+        head = request.split(b"\r\n\r\n", 1)[0].decode("latin-1")
+        path = head.split(" ")[1]
+        headers = {line.split(":", 1)[0].lower(): line.split(":", 1)[1].strip()
+                   for line in head.split("\r\n")[1:] if ":" in line}
+        if "sec-websocket-key" not in headers:
+            body = json.dumps([{"type": "page", "url": self.state["url"], "webSocketDebuggerUrl": self.ws_url}]).encode()
+            if not path.startswith("/json"):
+                conn.sendall(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+            else:
+                conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\n\r\n" % len(body) + body)
+            conn.close()
+            return
+        accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + WS_GUID).encode()).digest())
+        conn.sendall(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+        ws = WebSocket(conn, mask=False)
+        self.connections.add(conn)
+        try:
+            while True:
+                message = ws.recv()
+                if message is None:
+                    break
+                request = json.loads(message)
+                for reply in self.handle(request):
+                    ws.send(json.dumps(reply))
+        except OSError:
+            pass
+        finally:
+            self.connections.discard(conn)
+            ws.close()
+
+    def handle(self, request):
+        """Replies (and events) for one CDP request."""
+        method = request.get("method")
+        params = request.get("params", {})
+        with self.state_lock:
+            self.commands += 1
+            if method == "Runtime.evaluate":
+                return [{"id": request["id"], "result": self._evaluate(params.get("expression", ""))}]
+            if method == "Input.dispatchKeyEvent":
+                events = self._key(params)
+                return [{"id": request["id"], "result": {}}] + events
+            if method in ("Page.enable", "Runtime.enable"):
+                return [{"id": request["id"], "result": {}}]
+        return [{"id": request["id"], "error": {"code": -32601, "message": f"'{method}' wasn't found"}}]
+
+    def _evaluate(self, expression):
+        match = self.SET_CALL.search(expression)
+        if match:
+            value = float(match.group(2))
+            key = "speed" if match.group(1) == "Speed" else "volume"
+            valid = 0.25 <= value <= 2.0 if key == "speed" else 0.0 <= value <= 1.0
+            if valid:
+                self.state[key] = value
+            return {"result": {"type": "boolean", "value": valid}}
+        if "v.playbackRate" in expression:
+            value = {"speed": self.state["speed"], "volume": self.state["volume"], "paused": self.state["paused"]}
+            return {"result": {"type": "object", "value": value}}
+        for name, key in (("paused", "paused"), ("volume", "volume"), ("playbackRate", "speed")):
+            if expression.rstrip("; ").endswith(name):
+                value = self.state[key]
+                return {"result": {"type": type(value).__name__, "value": value}}
+        return {"result": {"type": "undefined"}}
+
+    def _key(self, params):
+        if params.get("type") != "keyDown":
+            return []
+        key = params.get("key", "").lower()
+        if key == "k":
+            self.state["paused"] = not self.state["paused"]
+        elif key == "n" and params.get("modifiers", 0) & SHIFT:
+            self.state["videos"] += 1
+            self.state["url"] = f"https://www.youtube.com/watch?v=standin{self.state['videos']}"
+            return [{"method": "Page.frameNavigated", "params": {"frame": {"id": "main", "url": self.state["url"]}}},
+                    {"method": "Page.loadEventFired", "params": {"timestamp": time.time()}}]
+        return []
+
+
+# ======== Self-check ========
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exercise the DevTools transport against the local stand-in.")
+    parser.add_argument("--commands", type=int, default=500)
+    parser.add_argument("--address", help="DevTools address HOST:PORT of a real browser instead of the stand-in")
+    args = parser.parse_args(argv)
+
+    stand_in = None
+    address = args.address
+    if address is None:
+        stand_in = DevToolsStandIn().start()
+        address = stand_in.address
+    session = DevToolsSession(find_page_target(address))
+    navigations = []
+    session.on("Page.frameNavigated", lambda params: navigations.append(params["frame"]["url"]))
+    session.call("Page.enable")
+
+    latencies = []
+    for i in range(args.commands):
+        start = time.perf_counter()
+        session.evaluate(f"window.setYouTubeSpeed({0.25 + (i % 8) * 0.25})")
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print(f"Sequential: {args.commands} evaluates, p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+
+    start = time.perf_counter()
+    futures = [session.evaluate_async(f"window.setYouTubeVolume({(i % 11) / 10})") for i in range(args.commands)]
+    for future in futures:
+        future.result(session.timeout)
+    elapsed = time.perf_counter() - start
+    print(f"Pipelined: {args.commands} evaluates in {elapsed * 1000:.1f} ms ({args.commands / elapsed:,.0f} commands/s)")
+
+    if stand_in is not None:
+        session.press_key("k").result(session.timeout)
+        session.press_key("n", shift=True).result(session.timeout)
+        time.sleep(0.05)
+        paused = session.evaluate("document.querySelector('video').paused")
+        print(f"Paused: {paused}, navigations: {navigations}")
+        stand_in.stop()
+    session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
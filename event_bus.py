@@ -0,0 +1,215 @@
+"""Gesture and control events for other local applications.
+
+`EventPublisher` listens on a local TCP port (or a Unix socket path) and
+sends every subscriber one JSON object per line:
+
+    {"topic": "gesture", "session": 0, "t": 1718000000.123, "name": "Pause", "kind": "fire", "held": 0.7, "confidence": 0.93}
+    {"topic": "speed", "session": 0, "t": ..., "value": 1.25, "confidence": 0.91}
+    {"topic": "volume", "session": 0, "t": ..., "value": 0.6, "confidence": 0.88}
+    {"topic": "hands", "session": 0, "t": ..., "left": true, "right": false, "left_id": 3, "right_id": null}
+
+`t` is the capture time of the frame that produced the event (time.time()
+clock). A subscriber may send `SUB topic [topic ...]\\n` at any time to
+receive only those topics (`SUB` alone means all again).
+
+`publish` only puts the event on a queue, and does nothing when nobody is
+subscribed. A sender thread encodes each event once and writes it to
+non-blocking sockets. A subscriber whose unsent backlog exceeds
+`max_backlog` bytes loses events (counted in `dropped`) until it catches up,
+so a slow reader never delays the frame path or other subscribers.
+
+    python event_bus.py 127.0.0.1:8765             # print all events
+    python event_bus.py 127.0.0.1:8765 gesture     # only gestures
+"""
+import json
+import os
+import queue
+import selectors
+import socket
+import sys
+import threading
+import time
+
+class Subscriber:
+    def __init__(self, sock, peer):
+        self.sock = sock
+        self.peer = peer
+        self.topics = None  # None = all
+        self.backlog = bytearray()
+        self.inbox = b""
+        self.sent = 0
+        self.dropped = 0
+
+
+class EventPublisher:
+    def __init__(self, address, max_backlog=256 * 1024, max_queue=10000):
+        self.max_backlog = max_backlog
+        self.max_queue = max_queue
+        self.overflow = 0
+        self.queue = queue.SimpleQueue()
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.running = True
+        self.selector = selectors.DefaultSelector()
+        self.unix_path = None
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.remove(address)
+            self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.unix_path = address
+        else:
+            self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(address)
+        self.server.listen()
+        self.server.settimeout(0.5)
+        self.address = self.server.getsockname()
+        self.threads = [threading.Thread(target=self._accept, name="event-accept", daemon=True),
+                        threading.Thread(target=self._send, name="event-send", daemon=True)]
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def publish(self, topic, session, t, **fields):
+        """Queue one event; never blocks. Returns False when nobody is subscribed."""
+        if not self.subscribers:
+            return False
+        if self.queue.qsize() >= self.max_queue:
+            # The sender thread fell behind; drop rather than grow.
+            self.overflow += 1
+            return False
+        self.queue.put((topic, session, t, fields))
+        return True
+
+    # ======== Threads ========
+    def _accept(self):
+        while self.running:
+            try:
+                sock, peer = self.server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            sock.setblocking(False)
+            if sock.family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            subscriber = Subscriber(sock, peer)
+            with self.lock:
+                self.selector.register(sock, selectors.EVENT_READ, subscriber)
+                self.subscribers = self.subscribers + [subscriber]
+
+    def _send(self):
+        while self.running:
+            try:
+                item = self.queue.get(timeout=0.05)
+            except queue.Empty:
+                item = None
+            self._read_requests()
+            if item is not None:
+                topic, session, t, fields = item
+                line = json.dumps({"topic": topic, "session": session, "t": round(t, 4), **fields},
+                                  separators=(",", ":")).encode() + b"\n"
+                for subscriber in self.subscribers:
+                    if subscriber.topics is not None and topic not in subscriber.topics:
+                        continue
+                    if len(subscriber.backlog) + len(line) > self.max_backlog:
+                        subscriber.dropped += 1
+                        continue
+                    subscriber.backlog += line
+            for subscriber in self.subscribers:
+                if subscriber.backlog:
+                    self._flush(subscriber)
+
+    def _flush(self, subscriber):
+        try:
+            sent = subscriber.sock.send(subscriber.backlog)
+        except BlockingIOError:
+            return
+        except OSError:
+            self._remove(subscriber)
+            return
+        del subscriber.backlog[:sent]
+        subscriber.sent += sent
+
+    def _read_requests(self):
+        with self.lock:
+            ready = self.selector.select(0) if self.subscribers else []
+        for key, _ in ready:
+            subscriber = key.data
+            try:
+                data = subscriber.sock.recv(4096)
+            except BlockingIOError:
+                continue
+            except OSError:
+                data = b""
+            if not data:
+                self._remove(subscriber)
+                continue
+            subscriber.inbox += data
+            *lines, subscriber.inbox = subscriber.inbox.split(b"\n")
+            for line in lines:
+                words = line.decode(errors="replace").split()
+                if words and words[0].upper() == "SUB":
+                    subscriber.topics = set(words[1:]) or None
+
+    def _remove(self, subscriber):
+        with self.lock:
+            if subscriber not in self.subscribers:
+                return
+            self.subscribers = [other for other in self.subscribers if other is not subscriber]
+            self.selector.unregister(subscriber.sock)
+        subscriber.sock.close()
+
+    def stop(self):
+        self.running = False
+        for thread in self.threads:
+            thread.join(timeout=1.0)
+        for subscriber in list(self.subscribers):
+            self._flush(subscriber)
+            self._remove(subscriber)
+        self.server.close()
+        if self.unix_path is not None and os.path.exists(self.unix_path):
+            os.remove(self.unix_path)
+
+    def summary(self):
+        if not self.subscribers:
+            return "no subscribers connected"
+        overflow = f"{self.overflow} dropped before sending; " if self.overflow else ""
+        return overflow + ", ".join(f"{subscriber.peer or 'unix'}: {subscriber.sent} bytes sent, "
+                                    f"{subscriber.dropped} dropped" for subscriber in self.subscribers)
+
+
+def parse_event_address(address):
+    """HOST:PORT or :PORT for TCP, anything else is a Unix socket path."""
+    host, _, port = address.rpartition(":")
+    if port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return address
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("usage: event_bus.py HOST:PORT|SOCKET_PATH [topic ...]", file=sys.stderr)
+        return 2
+    address = parse_event_address(argv[0])
+    family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.connect(address)
+        if argv[1:]:
+            sock.sendall(f"SUB {' '.join(argv[1:])}\n".encode())
+        stream = sock.makefile("rb")
+        try:
+            for line in stream:
+                event = json.loads(line)
+                age = (time.time() - event["t"]) * 1000
+                print(f"{line.decode().rstrip()}  (+{age:.1f} ms)")
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""Latency/jitter benchmark for the pinch-distance smoothing filters.
+
+Replays thumb-index distance traces through each filter in FILTERS, frame by
+frame like the render loop, and compares the output with a reference:
+
+- lag: delay (ms) at the peak of the cross-correlation between the output
+  and the reference, with sub-frame interpolation; negative means it leads,
+- jitter: RMS frame-to-frame change (x1000) of the output while the reference
+  has held still for SETTLE_FRAMES, so a filter's lag tail is not counted,
+- false steps: still frames per minute whose output change would pass the
+  relative speed-step threshold (gesture_engine.speed_step_threshold), i.e.
+  accidental speed changes,
+- overshoot: p99 and max of how far the output leaves the range the
+  reference covers within +-OVERSHOOT_WINDOW frames,
+- CPU: nanoseconds per update.
+
+Traces come from landmark recordings (each run of frames with the hand
+present is one trace; the reference is a centered Gaussian smoothing of the
+raw distance), or without recordings from a synthetic set of holds, quick
+pinches, ramps and sweeps with landmark noise and glitches, where the
+reference is the clean signal.
+
+    python filter_benchmark.py
+    python filter_benchmark.py station3_*.hlrec --hand both --json
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from gesture_engine import DEFAULT_PROFILE, pinch_distances, speed_step_threshold
+from smoothing import AdvancedSmoothFilter, ExponentialFilter, OneEuroFilter
+
+FILTERS = {
+    "raw": None,
+    "advanced": lambda: AdvancedSmoothFilter(alpha=0.3, responsiveness=0.7, min_alpha=0.1, max_alpha=0.6),
+    "advanced-predict": lambda: AdvancedSmoothFilter(alpha=0.3, responsiveness=0.7, min_alpha=0.1, max_alpha=0.6,
+                                                     prediction_factor=1.0),
+    "ema-0.3": lambda: ExponentialFilter(0.3),
+    "ema-0.5": lambda: ExponentialFilter(0.5),
+    "one-euro": lambda: OneEuroFilter(),
+}
+MAX_LAG = 15            # frames searched for the cross-correlation peak
+STILL_VELOCITY = 0.001  # reference change per frame below which the hand holds still
+SETTLE_FRAMES = 15      # still frames before jitter is measured
+OVERSHOOT_WINDOW = 10   # frames
+MIN_TRACE = 30          # shorter runs of frames are skipped
+
+
+# ======== Traces ========
+def gaussian_smooth(values, sigma=2.0):
+    """Centered (zero-lag) smoothing used as the reference for recorded traces."""
+    radius = int(3 * sigma)
+    kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+    kernel /= kernel.sum()
+    padded = np.pad(values, radius, mode="edge")
+    return np.convolve(padded, kernel, mode="valid")
+
+
+def recorded_traces(paths, hands=("left",)):
+    """[(raw, reference, frame period)] per run of frames with the hand present."""
+    from landmark_recording import open_recording
+
+    traces = []
+    for path in paths:
+        recording = open_recording(path)
+        frame_size = tuple(size or default for size, default in zip(recording.frame_size, (320, 240)))
+        timestamps = np.asarray(recording.timestamps, dtype=np.float64)
+        for hand in hands:
+            present, landmarks = recording.hand_arrays(hand)
+            distances = pinch_distances(landmarks, frame_size)
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], present.astype(np.int8), [0]))))
+            for start, end in zip(edges[::2], edges[1::2]):
+                if end - start < MIN_TRACE:
+                    continue
+                raw = distances[start:end]
+                period = float(np.median(np.diff(timestamps[start:end])))
+                traces.append((raw, gaussian_smooth(raw), period))
+    return traces
+
+
+def synthetic_traces(seconds=60.0, fps=30.0, seed=0):
+    """Clean pinch movements plus landmark noise and occasional glitches."""
+    rng = np.random.default_rng(seed)
+    traces = []
+    n = int(seconds * fps)
+    t = np.arange(n) / fps
+    # Holds with quick pinches between them
+    levels = rng.uniform(0.04, 0.25, size=int(seconds / 2) + 1)
+    clean = levels[(t // 2).astype(int)]
+    clean = gaussian_smooth(clean, 1.0)
+    traces.append(clean)
+    # Slow and fast ramps
+    traces.append(0.145 + 0.1 * np.sign(np.sin(2 * np.pi * t / 6)) * np.minimum(1, (t % 3) / 1.5))
+    # Sweeps at several speeds
+    traces.append(0.145 + 0.1 * np.sin(2 * np.pi * t * (0.2 + 0.6 * t / seconds)))
+    result = []
+    for clean in traces:
+        raw = clean + rng.normal(0, 0.002, n)
+        glitches = rng.random(n) < 0.005
+        raw[glitches] += rng.normal(0, 0.03, glitches.sum())
+        result.append((raw, clean, 1 / fps))
+    return result
+
+
+# ======== Metrics ========
+def run_filter(make_filter, raw):
+    if make_filter is None:
+        return raw.copy()
+    smoothing_filter = make_filter()
+    update = smoothing_filter.update
+    return np.fromiter((update(float(value)) for value in raw), dtype=np.float64, count=len(raw))
+
+
+def cross_correlation_lag(outputs, references, max_lag=MAX_LAG):
+    """Lag in frames (output behind reference; negative when it leads) at the summed cross-correlation peak."""
+    lags = np.arange(-max_lag, max_lag + 1)
+    scores = np.zeros(len(lags))
+    for output, reference in zip(outputs, references):
+        output = output - output.mean()
+        reference = reference - reference.mean()
+        n = len(output)
+        for i, lag in enumerate(lags):
+            if abs(lag) >= n:
+                continue
+            if lag >= 0:
+                scores[i] += np.dot(output[lag:], reference[:n - lag]) / (n - lag)
+            else:
+                scores[i] += np.dot(output[:n + lag], reference[-lag:]) / (n + lag)
+    peak = int(np.argmax(scores))
+    if 0 < peak < len(lags) - 1:
+        # Parabolic interpolation around the peak
+        left, center, right = scores[peak - 1:peak + 2]
+        denominator = left - 2 * center + right
+        if denominator:
+            return lags[peak] + 0.5 * (left - right) / denominator
+    return float(lags[peak])
+
+
+def settled(reference, frames=SETTLE_FRAMES):
+    """Per frame change: True where the reference has held still for `frames` frames."""
+    moving = (np.abs(np.diff(reference)) >= STILL_VELOCITY).astype(np.int32)
+    recent = np.convolve(moving, np.ones(frames, dtype=np.int32))[:len(moving)]
+    return recent == 0
+
+
+def overshoot(output, reference, window=OVERSHOOT_WINDOW):
+    """Per frame, how far the output leaves the reference's range within +-window frames."""
+    padded = np.pad(reference, window, mode="edge")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * window + 1)
+    upper = windows.max(axis=1)
+    lower = windows.min(axis=1)
+    return np.maximum(0.0, np.maximum(output - upper, lower - output))
+
+
+def cpu_cost(make_filter, values, repeats=3):
+    """Best-of-`repeats` nanoseconds per update."""
+    if make_filter is None:
+        return 0.0
+    best = np.inf
+    for _ in range(repeats):
+        smoothing_filter = make_filter()
+        update = smoothing_filter.update
+        start = time.perf_counter_ns()
+        for value in values:
+            update(value)
+        best = min(best, (time.perf_counter_ns() - start) / len(values))
+    return best
+
+
+def benchmark(traces, filters=None):
+    """{filter name: metrics} over all traces."""
+    filters = filters or FILTERS
+    period = float(np.median([trace_period for _, _, trace_period in traces]))
+    frames = sum(len(raw) for raw, _, _ in traces)
+    all_values = [float(value) for raw, _, _ in traces for value in raw]
+    report = {}
+    for name, make_filter in filters.items():
+        outputs = [run_filter(make_filter, raw) for raw, _, _ in traces]
+        references = [reference for _, reference, _ in traces]
+        changes = []
+        false_steps = 0
+        excess = []
+        for output, reference in zip(outputs, references):
+            change = np.diff(output)
+            still = settled(reference)
+            changes.append(change[still])
+            false_steps += int(np.count_nonzero(np.abs(change[still]) >
+                                                speed_step_threshold(change[still], DEFAULT_PROFILE)))
+            excess.append(overshoot(output, reference))
+        changes = np.concatenate(changes)
+        excess = np.concatenate(excess)
+        lag = cross_correlation_lag(outputs, references)
+        report[name] = {
+            "lag_ms": round(lag * period * 1000, 1),
+            "jitter": round(float(np.sqrt(np.mean(changes ** 2))) * 1000, 3) if len(changes) else None,
+            "false_steps_per_min": round(false_steps / (frames * period / 60), 2),
+            "overshoot_p99": round(float(np.percentile(excess, 99)), 4),
+            "overshoot_max": round(float(excess.max()), 4),
+            "cpu_ns": round(cpu_cost(make_filter, all_values), 0),
+        }
+    return report
+
+
+def format_report(report, title):
+    lines = [title,
+             f"{'filter':18s} {'lag ms':>7s} {'jitter':>7s} {'false/min':>9s} {'over p99':>9s} {'over max':>9s} {'ns/upd':>7s}"]
+    for name, row in report.items():
+        jitter = "n/a" if row["jitter"] is None else f"{row['jitter']:.3f}"
+        lines.append(f"{name:18s} {row['lag_ms']:7.1f} {jitter:>7s} {row['false_steps_per_min']:9.2f} "
+                     f"{row['overshoot_p99']:9.4f} {row['overshoot_max']:9.4f} {row['cpu_ns']:7.0f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare pinch-distance smoothing filters on lag, jitter and overshoot.")
+    parser.add_argument("recordings", nargs="*", help="Landmark recordings (.hlrec); synthetic traces if none")
+    parser.add_argument("--hand", choices=["left", "right", "both"], default="left",
+                        help="Which hand's pinch distance to use")
+    parser.add_argument("--filters", help=f"Comma-separated subset of: {', '.join(FILTERS)}")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of text")
+    args = parser.parse_args(argv)
+
+    filters = FILTERS
+    if args.filters:
+        unknown = [name for name in args.filters.split(",") if name not in FILTERS]
+        if unknown:
+            parser.error(f"unknown filters: {', '.join(unknown)}")
+        filters = {name: FILTERS[name] for name in args.filters.split(",")}
+    if args.recordings:
+        hands = ("left", "right") if args.hand == "both" else (args.hand,)
+        traces = recorded_traces(args.recordings, hands)
+        source = f"{len(traces)} traces from {len(args.recordings)} recording(s), reference: centered smoothing"
+    else:
+        traces = synthetic_traces()
+        source = f"{len(traces)} synthetic traces, reference: clean signal"
+    if not traces:
+        print(f"No traces of at least {MIN_TRACE} frames with the {args.hand} hand.", file=sys.stderr)
+        return 1
+    report = benchmark(traces, filters)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        frames = sum(len(raw) for raw, _, _ in traces)
+        print(format_report(report, f"{source}, {frames} frames"))
+        print("lag: cross-correlation delay; jitter: RMS change x1000 while still; "
+              "false/min: still-frame changes above the speed-step threshold; over: overshoot in distance units")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Garbage-collector pauses and frame times for the render loop.
+
+Every frame allocates dicts, tuples, MediaPipe results and numpy temporaries,
+so CPython's generational collector runs whenever its allocation counters
+say so, often in the middle of a frame. `GcScheduler` measures that and,
+in scheduled mode, moves the expensive part out of the frames:
+
+- stats: a gc.callbacks hook times every collection into a pause histogram
+  per generation, and `frame()` times each frame, split by whether a
+  collection ran during it. If the p99 frame time of frames without a
+  collection is well below the overall p99, the spikes come from GC.
+- scheduled: also freezes everything alive after startup (browser driver,
+  MediaPipe graphs, modules) into the permanent generation so collections no
+  longer walk it, raises the gen2 threshold so full collections never start
+  on their own, and runs them from `idle()` when no frame is in flight and
+  at least `full_interval` seconds have passed. After `max_deferral`
+  seconds a full collection runs at the next idle call even with frames in
+  flight, so cyclic garbage stays bounded. Young collections (gen0/gen1)
+  stay automatic; they only walk objects allocated since the last one.
+"""
+import gc
+import threading
+import time
+from contextlib import contextmanager
+
+from log_analytics import LogHistogram
+
+DEFERRED_GEN2_THRESHOLD = 1_000_000  # gen1 collections before an automatic full one, i.e. never
+
+
+class GcScheduler:
+    def __init__(self, scheduled=False, full_interval=5.0, max_deferral=60.0):
+        self.scheduled = scheduled
+        self.full_interval = full_interval
+        self.max_deferral = max_deferral
+        self.pauses = [LogHistogram(low=1e-6, high=10.0) for _ in range(3)]
+        self.frame_times = LogHistogram(low=1e-5, high=10.0)
+        self.clean_frame_times = LogHistogram(low=1e-5, high=10.0)
+        self.gc_frames = 0
+        self.collections = 0
+        self.idle_collections = 0
+        self.forced_collections = 0
+        self.frozen = 0
+        self.in_flight = 0
+        self.lock = threading.Lock()
+        self.last_full = time.monotonic()
+        self.saved_threshold = None
+        self._started = None
+
+    def enable(self):
+        """Start measuring; in scheduled mode also freeze startup objects and defer full collections."""
+        if self.scheduled:
+            self.saved_threshold = gc.get_threshold()
+            gc.collect()
+            gc.freeze()
+            self.frozen = gc.get_freeze_count()
+            gen0, gen1, _ = self.saved_threshold
+            gc.set_threshold(gen0, gen1, DEFERRED_GEN2_THRESHOLD)
+            self.last_full = time.monotonic()
+        gc.callbacks.append(self._on_gc)
+        return self
+
+    def disable(self):
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        if self.saved_threshold is not None:
+            gc.set_threshold(*self.saved_threshold)
+            gc.unfreeze()
+            self.saved_threshold = None
+
+    def _on_gc(self, phase, info):
+        # Runs on whichever thread triggered the collection, with the GIL held throughout.
+        if phase == "start":
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            self.pauses[info["generation"]].add(time.perf_counter() - self._started)
+            self.collections += 1
+            self._started = None
+
+    # ======== Frames ========
+    @contextmanager
+    def frame(self):
+        """Times one frame and notes whether a collection ran during it."""
+        with self.lock:
+            self.in_flight += 1
+        collections = self.collections
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.in_flight -= 1
+                self.frame_times.add(elapsed)
+                if self.collections != collections:
+                    self.gc_frames += 1
+                else:
+                    self.clean_frame_times.add(elapsed)
+
+    def idle(self):
+        """Called from the render loop between frames; runs a deferred full collection when due."""
+        if not self.scheduled:
+            return False
+        waited = time.monotonic() - self.last_full
+        if waited < self.full_interval:
+            return False
+        if self.in_flight and waited < self.max_deferral:
+            return False
+        if self.in_flight:
+            self.forced_collections += 1
+        else:
+            self.idle_collections += 1
+        gc.collect()
+        self.last_full = time.monotonic()
+        return True
+
+    # ======== Report ========
+    def summary(self):
+        lines = []
+        if self.scheduled:
+            lines.append(f"scheduled: {self.frozen} objects frozen, {self.idle_collections} full collections "
+                         f"in idle gaps, {self.forced_collections} forced after {self.max_deferral:.0f}s")
+        for generation, pauses in enumerate(self.pauses):
+            if pauses.count:
+                lines.append(f"gen{generation} pauses: {pauses.count} | p50 {_ms(pauses.percentile(50))} "
+                             f"p99 {_ms(pauses.percentile(99))} max {_ms(pauses.max)} total {_ms(pauses.total)}")
+        frames = self.frame_times
+        if frames.count:
+            lines.append(f"frames: {frames.count} | p50 {_ms(frames.percentile(50))} p99 {_ms(frames.percentile(99))} "
+                         f"max {_ms(frames.max)}")
+            clean = self.clean_frame_times
+            if clean.count:
+                lines.append(f"frames without a collection: {clean.count} | p99 {_ms(clean.percentile(99))} "
+                             f"max {_ms(clean.max)}; {self.gc_frames} frames overlapped a collection")
+        return "\n".join(lines) or "no frames or collections measured"
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:.2f} ms"
@@ -0,0 +1,590 @@
+"""Declarative hold gestures evaluated per frame or over whole recordings.
+
+A gesture is a `GestureRule`: a condition over per-frame landmark features,
+how long it has to hold, and a cooldown shared by its cooldown group. The same
+rules run incrementally in the render loop (`GestureEngine.update`) and
+vectorized over numpy feature arrays (`evaluate_batch`), and both produce the
+same "fire" and "cancel" events:
+
+- a rule starts holding on the first frame its condition is true,
+- it fires on the first frame where it has held for `hold` seconds and its
+  group's last fire is at least `cooldown` seconds back, then restarts holding
+  on the next frame,
+- it is cancelled on the first frame the condition is false while holding.
+
+A rule can also carry `Evidence`: while it holds, per-frame evidence (pose
+confidence times the margin past the threshold) is accumulated, and the rule
+fires early once the sum reaches log(1 / false_trigger_bound), treating the
+evidence as a log-likelihood ratio. Weak or ambiguous evidence never reaches
+the bound, so the plain hold timer still applies. Next has no evidence: both
+hands being present looks the same during two-handed steering, so it is only
+confirmed by its timer.
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+
+MIN_ACTION_INTERVAL = 2.5
+NEXT_GESTURE_DURATION = 1.0
+PAUSE_GESTURE_DURATION = 0.7
+PAUSE_THRESHOLD_OPEN = 0.15
+PAUSE_THRESHOLD_CLOSE = 0.09
+MIN_SPEED_CHANGE_INTERVAL = 0.015
+MIN_VOLUME_CHANGE_INTERVAL = 0.015
+VOLUME_CHANGE_THRESHOLD = 0.005
+# Speed steps need a pinch change above
+# clip(base + gain * (1 - |change| * 12), min, max).
+SPEED_THRESHOLD_BASE = 0.0025
+SPEED_THRESHOLD_GAIN = 0.002
+SPEED_THRESHOLD_MIN = 0.002
+SPEED_THRESHOLD_MAX = 0.005
+# Evidence rate = gain * strength - cost. Calibrated on soak_test's synthetic
+# workout (600 s) so the measured false-trigger rate of the pinch gestures
+# stays at or below the bound for bounds 0.1, 0.05 and 0.01; gain 20 / cost 2
+# gave 7-9% false Pause/Play triggers at bound 0.01.
+EVIDENCE_GAIN = 8.0
+EVIDENCE_COST = 4.0
+
+# Tunable gesture parameters (autotune.py writes profiles of these).
+DEFAULT_PROFILE = {
+    "threshold_close": PAUSE_THRESHOLD_CLOSE,
+    "threshold_open": PAUSE_THRESHOLD_OPEN,
+    "pause_duration": PAUSE_GESTURE_DURATION,
+    "next_duration": NEXT_GESTURE_DURATION,
+    "action_interval": MIN_ACTION_INTERVAL,
+    "speed_change_interval": MIN_SPEED_CHANGE_INTERVAL,
+    "volume_change_interval": MIN_VOLUME_CHANGE_INTERVAL,
+    "volume_change_threshold": VOLUME_CHANGE_THRESHOLD,
+    "speed_threshold_base": SPEED_THRESHOLD_BASE,
+    "speed_threshold_gain": SPEED_THRESHOLD_GAIN,
+    "speed_threshold_min": SPEED_THRESHOLD_MIN,
+    "speed_threshold_max": SPEED_THRESHOLD_MAX,
+}
+HOLD_PARAMETERS = ("threshold_close", "threshold_open", "pause_duration", "next_duration", "action_interval")
+
+GestureEvent = namedtuple("GestureEvent", "time name kind held")
+# kind: "fire" or "cancel"; held: seconds the condition had been true
+
+
+# ======== Conditions ========
+# Conditions only use numpy operators, so they evaluate a dict of scalars
+# (incremental) or a dict of arrays (batch) alike. NaN features are false.
+class Feature:
+    def __init__(self, name):
+        self.name = name
+
+    def __call__(self, features):
+        return np.asarray(features[self.name], dtype=bool)
+
+
+class Below:
+    def __init__(self, name, threshold):
+        self.name = name
+        self.threshold = threshold
+
+    def __call__(self, features):
+        return np.less(features[self.name], self.threshold)
+
+    def margin(self, features):
+        return np.subtract(self.threshold, features[self.name])
+
+
+class Above:
+    def __init__(self, name, threshold):
+        self.name = name
+        self.threshold = threshold
+
+    def __call__(self, features):
+        return np.greater(features[self.name], self.threshold)
+
+    def margin(self, features):
+        return np.subtract(features[self.name], self.threshold)
+
+
+class All:
+    def __init__(self, *conditions):
+        self.conditions = conditions
+
+    def __call__(self, features):
+        result = self.conditions[0](features)
+        for condition in self.conditions[1:]:
+            result = np.logical_and(result, condition(features))
+        return result
+
+
+class Evidence:
+    """Evidence rate per second for a held pose.
+
+    strength = min(confidence features) * clip(margin / margin_scale, 0, 1)
+    rate     = gain * strength - cost
+
+    Missing confidence (NaN) counts as zero strength, so the rate is -cost.
+    """
+    def __init__(self, confidence, margin=None, margin_scale=None, gain=EVIDENCE_GAIN, cost=EVIDENCE_COST):
+        self.confidence = confidence
+        self.margin = margin
+        self.margin_scale = margin_scale
+        self.gain = gain
+        self.cost = cost
+
+    def rate(self, features):
+        strength = features[self.confidence[0]]
+        for name in self.confidence[1:]:
+            strength = np.minimum(strength, features[name])
+        if self.margin is not None:
+            strength = strength * np.clip(self.margin(features) / self.margin_scale, 0.0, 1.0)
+        return self.gain * np.nan_to_num(strength) - self.cost
+
+
+class GestureRule:
+    def __init__(self, name, condition, hold, cooldown=0.0, group=None,
+                 evidence=None, false_trigger_bound=0.01, min_hold=0.15):
+        self.name = name
+        self.condition = condition
+        self.hold = hold
+        self.cooldown = cooldown
+        self.group = group or name
+        self.evidence = evidence
+        self.bound = math.log(1.0 / false_trigger_bound)
+        self.min_hold = min_hold
+
+
+def default_rules(next_duration=NEXT_GESTURE_DURATION, pause_duration=PAUSE_GESTURE_DURATION,
+                  threshold_close=PAUSE_THRESHOLD_CLOSE, threshold_open=PAUSE_THRESHOLD_OPEN,
+                  action_interval=MIN_ACTION_INTERVAL, hold_mode="timer", false_trigger_bound=0.01):
+    """The controller's hold gestures: both hands raised, left-hand pinch closed or open.
+
+    With hold_mode="evidence" the pinch rules may confirm before their hold
+    timer; Next always waits for its timer.
+    """
+    close = Below("left_distance", threshold_close)
+    open_ = Above("left_distance", threshold_open)
+    evidence = hold_mode == "evidence"
+    return [
+        GestureRule("Next", All(Feature("left_present"), Feature("right_present")),
+                    next_duration, action_interval),
+        GestureRule("Pause", close, pause_duration, action_interval, group="pause",
+                    evidence=Evidence(("left_score",), close.margin, 0.03) if evidence else None,
+                    false_trigger_bound=false_trigger_bound),
+        GestureRule("Play", open_, pause_duration, action_interval, group="pause",
+                    evidence=Evidence(("left_score",), open_.margin, 0.05) if evidence else None,
+                    false_trigger_bound=false_trigger_bound),
+    ]
+
+
+def profile_rules(profile, **options):
+    """default_rules with the hold parameters of a profile."""
+    return default_rules(**{name: profile[name] for name in HOLD_PARAMETERS}, **options)
+
+
+def speed_step_threshold(distance_change, profile):
+    """Pinch change a relative speed step needs (scalar or array); smaller for fast pinches."""
+    threshold = profile["speed_threshold_base"] + profile["speed_threshold_gain"] * (1 - np.abs(distance_change) * 12)
+    return np.clip(threshold, profile["speed_threshold_min"], profile["speed_threshold_max"])
+
+
+def load_profile(path):
+    """Gesture parameters from a tuned profile, defaults for anything it leaves out."""
+    with open(path) as f:
+        params = json.load(f).get("params", {})
+    unknown = set(params) - set(DEFAULT_PROFILE)
+    if unknown:
+        raise ValueError(f"{path}: unknown parameters {', '.join(sorted(unknown))}")
+    profile = dict(DEFAULT_PROFILE)
+    profile.update((name, float(value)) for name, value in params.items())
+    if profile["threshold_close"] >= profile["threshold_open"]:
+        raise ValueError(f"{path}: threshold_close must be below threshold_open")
+    return profile
+
+
+# ======== Incremental Evaluation ========
+class GestureEngine:
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.hold_start = {rule.name: None for rule in self.rules}
+        self.evidence = {rule.name: 0.0 for rule in self.rules}
+        self.last_fire = {rule.group: -np.inf for rule in self.rules}
+        self.last_t = None
+
+    def update(self, t, features):
+        """Advance all rules by one frame; returns the events of this frame."""
+        events = []
+        dt = 0.0 if self.last_t is None else t - self.last_t
+        self.last_t = t
+        for rule in self.rules:
+            start = self.hold_start[rule.name]
+            if rule.condition(features):
+                if start is None:
+                    self.hold_start[rule.name] = t
+                    self.evidence[rule.name] = 0.0
+                    continue
+                held = t - start
+                ready = held >= rule.hold
+                if rule.evidence is not None:
+                    self.evidence[rule.name] += float(rule.evidence.rate(features)) * dt
+                    ready = ready or (held >= rule.min_hold and self.evidence[rule.name] >= rule.bound)
+                if ready and t - self.last_fire[rule.group] >= rule.cooldown:
+                    events.append(GestureEvent(t, rule.name, "fire", held))
+                    self.last_fire[rule.group] = t
+                    self.hold_start[rule.name] = None
+            elif start is not None:
+                events.append(GestureEvent(t, rule.name, "cancel", t - start))
+                self.hold_start[rule.name] = None
+        return events
+
+    def holding(self, t):
+        """(rule name, seconds left) for every rule that is currently holding."""
+        return [(rule.name, rule.hold - (t - self.hold_start[rule.name]))
+                for rule in self.rules if self.hold_start[rule.name] is not None]
+
+    def reset(self):
+        for name in self.hold_start:
+            self.hold_start[name] = None
+
+
+# ======== Batch Evaluation ========
+def evaluate_batch(rules, times, features):
+    """Evaluate rules over whole feature arrays; returns events sorted by time.
+
+    Conditions are computed for all frames at once and hold runs are found
+    with array operations; Python only loops once per emitted event.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    n = len(times)
+    if n == 0:
+        return []
+    events = []
+    groups = {}
+    for rule in rules:
+        groups.setdefault(rule.group, []).append(rule)
+    dt = np.diff(times, prepend=times[0])
+    for group_rules in groups.values():
+        runs = {}
+        evidence = {}
+        for rule in group_rules:
+            condition = np.broadcast_to(rule.condition(features), (n,))
+            padded = np.concatenate(([False], condition, [False]))
+            edges = np.flatnonzero(padded[1:] != padded[:-1])
+            runs[rule.name] = (edges[0::2], edges[1::2])
+            if rule.evidence is not None:
+                # Cumulative evidence; a hold's sum is a difference of two entries.
+                evidence[rule.name] = np.cumsum(np.broadcast_to(rule.evidence.rate(features), (n,)) * dt)
+        events.extend(_evaluate_group(group_rules, times, runs, evidence))
+    events.sort(key=lambda event: event.time)
+    return events
+
+
+def _evaluate_group(rules, times, runs, evidence):
+    """Event-driven replay of one cooldown group; one iteration per event."""
+    n = len(times)
+    events = []
+    last_fire = -np.inf
+    # Per rule: [index of the current run, frame the current hold started on]
+    state = []
+    for rule in rules:
+        starts, _ = runs[rule.name]
+        state.append([0, starts[0]] if len(starts) else None)
+
+    while True:
+        best = None
+        for position, rule in enumerate(rules):
+            if state[position] is None:
+                continue
+            run, hold_start = state[position]
+            end = runs[rule.name][1][run]
+            fire = _first_fire(times, rule, hold_start, end, last_fire)
+            if rule.name in evidence:
+                fire = _first_evidence_fire(times, rule, evidence[rule.name], hold_start, fire, last_fire)
+            candidate = (fire, position, "fire") if fire < end else (end, position, "cancel")
+            if best is None or candidate[:2] < best[:2]:
+                best = candidate
+        if best is None:
+            return events
+        index, position, kind = best
+        rule = rules[position]
+        starts, ends = runs[rule.name]
+        run, hold_start = state[position]
+        if kind == "fire":
+            events.append(GestureEvent(float(times[index]), rule.name, "fire", float(times[index] - times[hold_start])))
+            last_fire = times[index]
+            if index + 1 < ends[run]:
+                state[position] = [run, index + 1]
+                continue
+        elif index < n:
+            events.append(GestureEvent(float(times[index]), rule.name, "cancel", float(times[index] - times[hold_start])))
+        run += 1
+        state[position] = [run, starts[run]] if run < len(starts) else None
+
+
+def _first_fire(times, rule, hold_start, end, last_fire):
+    """First frame in (hold_start, end) where the rule may fire, or `end`."""
+    def ready(i):
+        return times[i] - times[hold_start] >= rule.hold and times[i] - last_fire >= rule.cooldown
+
+    index = max(hold_start + 1,
+                int(np.searchsorted(times, times[hold_start] + rule.hold)),
+                int(np.searchsorted(times, last_fire + rule.cooldown)) if np.isfinite(last_fire) else 0)
+    # searchsorted compares t >= start + hold; the live path compares
+    # t - start >= hold. Nudge across the rounding edge so both agree.
+    while index - 1 > hold_start and index - 1 < end and ready(index - 1):
+        index -= 1
+    while index < end and not ready(index):
+        index += 1
+    return min(index, end)
+
+
+def _first_evidence_fire(times, rule, cumulative, hold_start, timer_fire, last_fire):
+    """Earliest frame before `timer_fire` where accumulated evidence confirms the hold."""
+    window = slice(hold_start + 1, timer_fire)
+    if window.start >= window.stop:
+        return timer_fire
+    held = times[window] - times[hold_start]
+    ready = ((cumulative[window] - cumulative[hold_start] >= rule.bound) &
+             (held >= rule.min_hold) & (times[window] - last_fire >= rule.cooldown))
+    if not ready.any():
+        return timer_fire
+    return hold_start + 1 + int(np.argmax(ready))
+
+
+# ======== Features ========
+def pinch_distances(landmarks, frame_size):
+    """Thumb-index distance per frame, normalized by frame width.
+
+    Matches the live computation: landmarks are truncated to pixel
+    coordinates first. NaN landmarks give NaN distances.
+    """
+    width, height = frame_size
+    thumb = landmarks[:, 4, :2]
+    index = landmarks[:, 8, :2]
+    dx = np.trunc(thumb[:, 0] * width) - np.trunc(index[:, 0] * width)
+    dy = np.trunc(thumb[:, 1] * height) - np.trunc(index[:, 1] * height)
+    return np.hypot(dx, dy) / width
+
+
+def tracked_hands(recording, make_filter=None):
+    """Per-role hand arrays with roles assigned by HandTracker, as in the render loop.
+
+    Returns {side: (present, score, raw distance, smoothed distance)}. Roles
+    come from the tracker's voted handedness rather than MediaPipe's
+    per-frame label, and each track smooths with its own filter, so label
+    flips and returning hands behave exactly like live.
+
+    Only frames that can change a track go through `HandTracker.update`. Once
+    the tracker is settled, runs of steady frames (same labels, each hand
+    nearest its previous position; see `HandTracker.steady_frames`) continue
+    their tracks with `HandTracker.advance` and numpy slices, which gives the
+    same result. Frames without hands only age the tracks and are skipped.
+    """
+    from hand_tracker import HandTracker
+
+    frame_size = tuple(size or default for size, default in zip(recording.frame_size, (320, 240)))
+    tracker = HandTracker(make_filter=make_filter)
+    n = len(recording)
+    arrays = {side: (np.zeros(n, dtype=bool), np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan))
+              for side in ("left", "right")}
+    if n == 0:
+        return arrays
+    records = recording.records
+    timestamps = np.asarray(recording.timestamps, dtype=np.float64)
+    counts = np.asarray(records["n_hands"])
+    labels = np.asarray(records["handedness"])
+    scores = np.asarray(records["score"], dtype=np.float64)
+    landmarks = np.asarray(records["landmarks"])
+    raw = pinch_distances(landmarks.reshape(-1, *landmarks.shape[2:]), frame_size).reshape(scores.shape)
+    centroids = landmarks[..., :2].mean(axis=2)
+    p_right = np.where(labels == 1, scores, 1.0 - scores)
+    steady = tracker.steady_frames(timestamps, counts, labels, centroids, p_right)
+    run_ends = np.append(np.flatnonzero(~steady), n)
+    times = timestamps.tolist()
+
+    settled = False
+    tracks = []
+    i = 0
+    while i < n:
+        if counts[i] == 0:
+            i += 1
+            continue
+        if settled and steady[i]:
+            end = int(run_ends[np.searchsorted(run_ends, i)])
+            tracker.advance(tracks, times[i:end], centroids[i:end], p_right[i:end])
+            for slot, track in enumerate(tracks):
+                present, role_scores, role_raw, smoothed = arrays[track.side]
+                present[i:end] = True
+                role_scores[i:end] = scores[i:end, slot]
+                role_raw[i:end] = raw[i:end, slot]
+                update = track.filter.update
+                smoothed[i:end] = [update(distance) for distance in raw[i:end, slot].tolist()]
+            i = end
+            continue
+        hands = recording.hands(i)
+        tracks = tracker.update(times[i], hands)
+        settled = tracker.settled(tracks, hands)
+        # One hand per role; like the render loop, the last one wins.
+        by_role = {track.side: (track, slot) for slot, track in enumerate(tracks)}
+        for side, (track, slot) in by_role.items():
+            present, role_scores, role_raw, smoothed = arrays[side]
+            present[i] = True
+            role_scores[i] = scores[i, slot]
+            role_raw[i] = raw[i, slot]
+            smoothed[i] = track.filter.update(float(raw[i, slot]))
+        i += 1
+    return arrays
+
+
+def recording_features(recording, make_filter=None, right_hand=False):
+    """Feature arrays for `evaluate_batch` from a LandmarkRecording.
+
+    With `right_hand` the smoothed right-hand pinch distance is included too.
+    """
+    hands = tracked_hands(recording, make_filter)
+    left_present, left_score, left_raw, left_distance = hands["left"]
+    right_present, right_score, _, right_distance = hands["right"]
+    features = {
+        "left_present": left_present,
+        "right_present": right_present,
+        "left_score": left_score,
+        "right_score": right_score,
+        "left_distance_raw": left_raw,
+        "left_distance": left_distance,
+    }
+    if right_hand:
+        features["right_distance"] = right_distance
+    return features
+
+
+# ======== Offline Evaluation ========
+def load_labels(path):
+    """Ground-truth actions from a CSV with `time` and `gesture` columns.
+
+    `time` is when the user started the intended gesture, on the recording's
+    clock.
+    """
+    with open(path, newline="") as f:
+        return sorted((float(row["time"]), row["gesture"]) for row in csv.DictReader(f))
+
+
+def match_events(fires, references, window_before, window_after):
+    """Pair fires with reference times of the same gesture, each used once.
+
+    A fire at t matches a reference r when r - window_before <= t <=
+    r + window_after. Returns (matched pairs, unmatched fires, unmatched refs).
+    """
+    remaining = list(references)
+    matched = []
+    unmatched = []
+    for event in fires:
+        for i, (ref_time, gesture) in enumerate(remaining):
+            if gesture == event.name and ref_time - window_before <= event.time <= ref_time + window_after:
+                matched.append((event, ref_time))
+                del remaining[i]
+                break
+        else:
+            unmatched.append(event)
+    return matched, unmatched, remaining
+
+
+def _percentiles(values):
+    if not values:
+        return "n/a"
+    values = np.asarray(values) * 1000
+    return f"mean {values.mean():.0f} ms, p50 {np.percentile(values, 50):.0f} ms, p95 {np.percentile(values, 95):.0f} ms"
+
+
+def compare_hold_modes(times, features, labels=None, false_trigger_bound=0.01, tolerance=0.3, **thresholds):
+    """Time-to-action and false triggers of evidence vs. timer holds.
+
+    With labels, a fire is false when it matches no labelled action. Without
+    labels the timer fires are the reference: an evidence fire is false when
+    the timer would not have fired the same gesture within one hold period.
+    """
+    timer_rules = default_rules(**thresholds)
+    evidence_rules = default_rules(hold_mode="evidence", false_trigger_bound=false_trigger_bound, **thresholds)
+    holds = {rule.name: rule.hold for rule in timer_rules}
+    longest_hold = max(holds.values())
+    report = {}
+    timer_fires = [e for e in evaluate_batch(timer_rules, times, features) if e.kind == "fire"]
+    evidence_fires = [e for e in evaluate_batch(evidence_rules, times, features) if e.kind == "fire"]
+    for mode, fires in (("timer", timer_fires), ("evidence", evidence_fires)):
+        if labels is not None:
+            matched, false, missed = match_events(fires, labels, tolerance, longest_hold + 2.0)
+            time_to_action = [event.time - ref_time for event, ref_time in matched]
+        elif mode == "evidence":
+            references = [(event.time, event.name) for event in timer_fires]
+            matched, false, missed = match_events(fires, references, longest_hold + tolerance, tolerance)
+            time_to_action = [event.held for event in fires]
+        else:
+            matched, false, missed = fires, [], []
+            time_to_action = [event.held for event in fires]
+        report[mode] = {
+            "fires": len(fires),
+            "false_triggers": len(false),
+            "false_trigger_rate": len(false) / len(fires) if fires else 0.0,
+            "missed": len(missed),
+            "time_to_action": time_to_action,
+        }
+    return report
+
+
+def main(argv=None):
+    from landmark_recording import open_recording
+
+    parser = argparse.ArgumentParser(description="Evaluate hold gestures over landmark recordings.")
+    parser.add_argument("recordings", nargs="+", help="Landmark recordings (.hlrec)")
+    parser.add_argument("--hold-mode", choices=["timer", "evidence"], default="timer")
+    parser.add_argument("--false-trigger-bound", type=float, default=0.01,
+                        help="Target false-trigger probability for evidence holds")
+    parser.add_argument("--compare", action="store_true",
+                        help="Report time-to-action and false-trigger rate of evidence vs. timer holds")
+    parser.add_argument("--labels", help="CSV of intended actions (time,gesture); one file per recording, comma-separated")
+    args = parser.parse_args(argv)
+    label_paths = args.labels.split(",") if args.labels else [None] * len(args.recordings)
+    if len(label_paths) != len(args.recordings):
+        parser.error("--labels needs one file per recording")
+
+    rules = default_rules(hold_mode=args.hold_mode, false_trigger_bound=args.false_trigger_bound)
+    totals = {"timer": {}, "evidence": {}}
+    total_frames = 0
+    start = time.perf_counter()
+    for path, label_path in zip(args.recordings, label_paths):
+        recording = open_recording(path)
+        features = recording_features(recording)
+        total_frames += len(recording)
+        if args.compare:
+            labels = load_labels(label_path) if label_path else None
+            report = compare_hold_modes(recording.timestamps, features, labels, args.false_trigger_bound)
+            for mode, result in report.items():
+                for key, value in result.items():
+                    if key == "time_to_action":
+                        totals[mode].setdefault(key, []).extend(value)
+                    elif key != "false_trigger_rate":
+                        totals[mode][key] = totals[mode].get(key, 0) + value
+            continue
+        events = evaluate_batch(rules, recording.timestamps, features)
+        fired = {}
+        cancelled = {}
+        for event in events:
+            counts = fired if event.kind == "fire" else cancelled
+            counts[event.name] = counts.get(event.name, 0) + 1
+        print(f"{path}: {len(recording)} frames, fired {fired or '{}'}, cancelled {cancelled or '{}'}")
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    if args.compare:
+        reference = "labels" if args.labels else "timer holds"
+        print(f"Hold confirmation vs. {reference}, false-trigger bound {args.false_trigger_bound}:")
+        for mode, result in totals.items():
+            fires = result.get("fires", 0)
+            rate = result.get("false_triggers", 0) / fires if fires else 0.0
+            print(f"  {mode:8s} fires {fires}, false triggers {result.get('false_triggers', 0)} ({rate:.1%}), "
+                  f"missed {result.get('missed', 0)}, time-to-action {_percentiles(result.get('time_to_action', []))}")
+    print(f"Evaluated {total_frames} frames in {elapsed:.3f}s ({total_frames / elapsed:,.0f} frames/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
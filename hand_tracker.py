@@ -0,0 +1,159 @@
+"""Stable hand identities across frames.
+
+MediaPipe labels each detection "Left" or "Right" per frame, and the label
+flips now and then, most often when a hand is near the frame edge or briefly
+lost. The controller gives the two hands different jobs (left: speed, right:
+volume), so a flip feeds one hand's pinch distance into the other hand's
+filter and the next frame sees a large spurious distance change.
+
+`HandTracker` matches detections to tracks by landmark centroid, nearest first
+within `max_jump`, and keeps each track's role (left/right) as a vote: an
+exponential average of P(right) from the per-frame labels and scores, with a
+margin around 0.5 before the role switches. A track unseen for `max_missed`
+seconds ends, so a hand that comes back starts with fresh state. Each track
+carries its own smoothing filter, previous distance and predictor.
+"""
+import numpy as np
+
+from smoothing import AdvancedSmoothFilter
+
+
+def default_filter():
+    return AdvancedSmoothFilter(alpha=0.3, responsiveness=0.7, min_alpha=0.1, max_alpha=0.6)
+
+
+class HandTrack:
+    def __init__(self, track_id, t, centroid, p_right, make_filter, make_predictor=None):
+        self.id = track_id
+        self.centroid = centroid
+        self.last_seen = t
+        self.p_right = p_right
+        self.side = "right" if p_right >= 0.5 else "left"
+        self.frames = 0
+        self.filter = make_filter()
+        self.make_predictor = make_predictor
+        self.predictor = make_predictor() if make_predictor else None
+        self.prev_distance = None
+
+    def reset_control(self):
+        """Forget control state, e.g. when the track changes role."""
+        self.prev_distance = None
+        if self.predictor is not None:
+            self.predictor.reset()
+
+
+class HandTracker:
+    def __init__(self, max_jump=0.25, max_missed=0.3, vote_alpha=0.2, switch_margin=0.2,
+                 make_filter=None, make_predictor=None):
+        self.max_jump = max_jump
+        self.max_missed = max_missed
+        self.vote_alpha = vote_alpha
+        self.switch_margin = switch_margin
+        self.make_filter = make_filter or default_filter
+        self.make_predictor = make_predictor
+        self.tracks = []
+        self.next_id = 1
+        self.role_switches = 0
+        self.label_flips = 0
+
+    def update(self, t, hands):
+        """Assign `hands` [(side, score, landmarks), ...] to tracks; returns one track per hand, in order."""
+        self.tracks = [track for track in self.tracks if t - track.last_seen <= self.max_missed]
+        centroids = [np.asarray(points)[:, :2].mean(axis=0) for _, _, points in hands]
+        pairs = sorted((float(np.hypot(*(centroid - track.centroid))), i, j)
+                       for i, centroid in enumerate(centroids) for j, track in enumerate(self.tracks))
+        assigned = [None] * len(hands)
+        taken = set()
+        for distance, i, j in pairs:
+            if distance > self.max_jump:
+                break
+            if assigned[i] is None and j not in taken:
+                assigned[i] = self.tracks[j]
+                taken.add(j)
+
+        for i, (side, score, _) in enumerate(hands):
+            p_right = score if side == "right" else 1.0 - score
+            track = assigned[i]
+            if track is None:
+                track = HandTrack(self.next_id, t, centroids[i], p_right, self.make_filter, self.make_predictor)
+                self.next_id += 1
+                self.tracks.append(track)
+                assigned[i] = track
+            else:
+                if side != track.side:
+                    self.label_flips += 1
+                track.centroid = centroids[i]
+                track.last_seen = t
+                track.p_right += self.vote_alpha * (p_right - track.p_right)
+                if track.side == "left" and track.p_right > 0.5 + self.switch_margin:
+                    self._switch(track, "right")
+                elif track.side == "right" and track.p_right < 0.5 - self.switch_margin:
+                    self._switch(track, "left")
+            track.frames += 1
+
+        # Two hands voted the same role: the weaker vote takes the other one.
+        if len(assigned) == 2 and assigned[0].side == assigned[1].side:
+            weaker = min(assigned, key=lambda track: abs(track.p_right - 0.5))
+            self._switch(weaker, "left" if weaker.side == "right" else "right")
+        return assigned
+
+    # ======== Offline replay ========
+    def settled(self, tracks, hands):
+        """True when `tracks`, just returned by `update` for `hands`, are the only live
+        tracks and each one's role agrees with its label and its vote.
+
+        From a settled state, frames that pass `steady_frames` cannot change any
+        role, so they can go through `advance` instead of `update`.
+        """
+        if len(tracks) != len(self.tracks) or len({track.side for track in tracks}) != len(tracks):
+            return False
+        for (side, _, _), track in zip(hands, tracks):
+            if side != track.side:
+                return False
+            if side == "right" and track.p_right < 0.5 - self.switch_margin:
+                return False
+            if side == "left" and track.p_right > 0.5 + self.switch_margin:
+                return False
+        return True
+
+    def steady_frames(self, timestamps, counts, labels, centroids, p_right):
+        """Per-frame mask of frames that continue the previous frame's tracks unchanged.
+
+        `counts` (N,), `labels` (N, 2) with 1 = right, `centroids` (N, 2, 2) and
+        `p_right` (N, 2) describe each frame's hand slots. A frame is steady when
+        it has the same number of hands with the same labels as the previous one,
+        each closest to its own previous position within `max_jump`, no later
+        than `max_missed`, and each label's vote on its own side of the switch
+        margin.
+        """
+        steady = np.zeros(len(counts), dtype=bool)
+        if len(counts) < 2:
+            return steady
+        count = counts[1:]
+        jumps = np.hypot(*np.moveaxis(centroids[1:, :, None] - centroids[:-1, None, :], -1, 0))
+        diagonal = jumps[:, [0, 1], [0, 1]]
+        crossed = jumps[:, [0, 1], [1, 0]]
+        valid = np.arange(2)[None, :] < count[:, None]
+        votes = np.where(labels[1:] == 1, p_right[1:] >= 0.5 - self.switch_margin,
+                         p_right[1:] <= 0.5 + self.switch_margin)
+        one = (count == 1) & (diagonal[:, 0] <= self.max_jump)
+        two = (count == 2) & (diagonal.min(axis=1) < crossed.min(axis=1)) & (diagonal.max(axis=1) <= self.max_jump)
+        steady[1:] = ((one | two) & (count == counts[:-1]) & (np.diff(timestamps) <= self.max_missed) &
+                      ((labels[1:] == labels[:-1]) | ~valid).all(axis=1) & (votes | ~valid).all(axis=1))
+        return steady
+
+    def advance(self, tracks, timestamps, centroids, p_right):
+        """Continue `tracks` through a run of steady frames, as `update` on each would."""
+        for slot, track in enumerate(tracks):
+            vote = track.p_right
+            for value in p_right[:, slot].tolist():
+                vote += self.vote_alpha * (value - vote)
+            track.p_right = vote
+            track.centroid = centroids[-1, slot].copy()
+            track.last_seen = timestamps[-1]
+            track.frames += len(timestamps)
+
+    def _switch(self, track, side):
+        track.side = side
+        track.reset_control()
+        self.role_switches += 1
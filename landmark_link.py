@@ -0,0 +1,288 @@
+"""Compact binary landmark link between inference nodes and the controller.
+
+An inference node runs capture + hand inference and sends one UDP datagram per
+processed frame. No images cross the link, only landmarks:
+
+    header  <2sBBHIIdHHB  magic, version, flags, source id, sender epoch,
+                          sequence number, sender timestamp (time.time()),
+                          frame width/height, number of hands
+    hand    <BH126s       handedness (0 = left, 1 = right), score as float16,
+                          21 x 3 landmarks as little-endian float16
+
+The epoch is a random number chosen when a sender starts, so the receiver
+can tell a restarted node (sequence numbers from 0 again) from duplicates.
+Two hands fit in 285 bytes. The receiver keeps one reorder buffer per source,
+counts lost, late and duplicate packets and sender restarts, and measures link latency from the
+sender timestamp (one-way latency assumes NTP-synced clocks; the jitter figure
+is relative to the fastest packet seen and does not depend on clock offset).
+"""
+import random
+import socket
+import struct
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+MAGIC = b"HL"
+VERSION = 2
+HEADER = struct.Struct("<2sBBHIIdHHB")
+HAND = struct.Struct("<BH126s")
+NUM_LANDMARKS = 21
+MAX_HANDS = 4
+SEQ_MODULO = 1 << 32
+
+LandmarkPacket = namedtuple("LandmarkPacket", "source_id seq timestamp frame_size hands epoch")
+# hands: list of (hand_side, score, landmarks float32 array of shape (21, 3))
+
+
+def encode_packet(seq, timestamp, hands, source_id=0, frame_size=(0, 0), epoch=0):
+    if len(hands) > MAX_HANDS:
+        hands = hands[:MAX_HANDS]
+    parts = [HEADER.pack(MAGIC, VERSION, 0, source_id, epoch, seq % SEQ_MODULO, timestamp,
+                         frame_size[0], frame_size[1], len(hands))]
+    for hand_side, score, landmarks in hands:
+        points = np.asarray(landmarks, dtype="<f2").reshape(NUM_LANDMARKS * 3)
+        score_bits = np.array(score, dtype="<f2").view("<u2")
+        parts.append(HAND.pack(1 if hand_side == "right" else 0, int(score_bits), points.tobytes()))
+    return b"".join(parts)
+
+
+def decode_packet(data):
+    if len(data) < HEADER.size:
+        raise ValueError(f"Packet too short: {len(data)} bytes")
+    magic, version, _flags, source_id, epoch, seq, timestamp, width, height, n_hands = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Unknown packet magic/version: {magic!r}/{version}")
+    if len(data) != HEADER.size + n_hands * HAND.size:
+        raise ValueError(f"Packet length {len(data)} does not match {n_hands} hand(s)")
+    hands = []
+    offset = HEADER.size
+    for _ in range(n_hands):
+        side, score_bits, raw = HAND.unpack_from(data, offset)
+        offset += HAND.size
+        score = float(np.array(score_bits, dtype="<u2").view("<f2"))
+        landmarks = np.frombuffer(raw, dtype="<f2").astype(np.float32).reshape(NUM_LANDMARKS, 3)
+        hands.append(("right" if side else "left", score, landmarks))
+    return LandmarkPacket(source_id, seq, timestamp, (width, height), hands, epoch)
+
+
+def parse_address(address, default_host="127.0.0.1"):
+    host, _, port = address.rpartition(":")
+    return (host or default_host, int(port))
+
+
+class LinkStats:
+    """Counters and latency samples for one source."""
+    def __init__(self, window=500):
+        self.received = 0
+        self.delivered = 0
+        self.lost = 0
+        self.late = 0
+        self.duplicates = 0
+        self.restarts = 0
+        self.latencies = deque(maxlen=window)
+        self.min_latency = None
+
+    def add_latency(self, latency):
+        self.latencies.append(latency)
+        if self.min_latency is None or latency < self.min_latency:
+            self.min_latency = latency
+
+    def summary(self):
+        expected = self.delivered + self.lost
+        result = {
+            "received": self.received,
+            "delivered": self.delivered,
+            "lost": self.lost,
+            "late": self.late,
+            "duplicates": self.duplicates,
+            "restarts": self.restarts,
+            "loss_rate": self.lost / expected if expected else 0.0,
+        }
+        if self.latencies:
+            samples = np.array(self.latencies)
+            result["latency_ms"] = {
+                "mean": float(samples.mean() * 1000),
+                "p50": float(np.percentile(samples, 50) * 1000),
+                "p95": float(np.percentile(samples, 95) * 1000),
+            }
+            result["jitter_ms"] = float((samples - self.min_latency).mean() * 1000)
+        return result
+
+
+class ReorderBuffer:
+    """Releases packets of one source in sequence order.
+
+    Packets are held for at most `max_delay` seconds waiting for a missing
+    predecessor; after that the gap is counted as lost and delivery moves on.
+    With `max_delay=0` every packet newer than the last delivered one is
+    released immediately (latest wins) and anything older is dropped as late.
+    A packet with a new sender epoch starts over from its sequence number.
+    """
+    RESTART_DISTANCE = 1000
+
+    def __init__(self, stats, max_delay=0.0):
+        self.stats = stats
+        self.max_delay = max_delay
+        self.next_seq = None
+        self.epoch = None
+        self.pending = {}
+        self.skipped = set()
+        self.skipped_order = deque()
+
+    def push(self, packet, arrival):
+        released = []
+        seq = packet.seq
+        if self.epoch is not None and packet.epoch != self.epoch:
+            # The sender restarted; whatever it sent before is gone.
+            self.stats.restarts += 1
+            self.pending.clear()
+            self.skipped.clear()
+            self.skipped_order.clear()
+            self.next_seq = None
+        self.epoch = packet.epoch
+        if self.next_seq is not None:
+            behind = (self.next_seq - seq) % SEQ_MODULO
+            if 0 < behind <= self.RESTART_DISTANCE:
+                # Behind the delivery point: either a packet we already gave
+                # up on (late) or one we delivered before (duplicate).
+                if seq in self.skipped:
+                    self.skipped.discard(seq)
+                    self.stats.late += 1
+                    self.stats.lost -= 1
+                else:
+                    self.stats.duplicates += 1
+                return released
+            if behind and behind < SEQ_MODULO // 2:
+                # Far behind: the sequence numbers restarted within one epoch.
+                self.pending.clear()
+                self.next_seq = seq
+            elif seq in self.pending:
+                self.stats.duplicates += 1
+                return released
+        else:
+            self.next_seq = seq
+        self.pending[seq] = (packet, arrival)
+        self._drain(arrival, released)
+        return released
+
+    def flush(self, now):
+        released = []
+        self._drain(now, released)
+        return released
+
+    def _drain(self, now, released):
+        while self.pending:
+            if self.next_seq in self.pending:
+                packet, _ = self.pending.pop(self.next_seq)
+                released.append(packet)
+                self.stats.delivered += 1
+                self.next_seq = (self.next_seq + 1) % SEQ_MODULO
+                continue
+            oldest_seq = min(self.pending, key=lambda s: (s - self.next_seq) % SEQ_MODULO)
+            _, arrival = self.pending[oldest_seq]
+            if now - arrival < self.max_delay:
+                return
+            gap = (oldest_seq - self.next_seq) % SEQ_MODULO
+            self.stats.lost += gap
+            for missing in range(self.next_seq, self.next_seq + min(gap, self.RESTART_DISTANCE)):
+                self._remember_skipped(missing % SEQ_MODULO)
+            self.next_seq = oldest_seq
+
+    def _remember_skipped(self, seq):
+        self.skipped.add(seq)
+        self.skipped_order.append(seq)
+        if len(self.skipped_order) > self.RESTART_DISTANCE:
+            self.skipped.discard(self.skipped_order.popleft())
+
+
+class LandmarkSender:
+    def __init__(self, address, source_id=0):
+        self.address = address
+        self.source_id = source_id
+        self.seq = 0
+        self.epoch = random.getrandbits(32)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(self, hands, timestamp=None, frame_size=(0, 0)):
+        packet = encode_packet(self.seq, time.time() if timestamp is None else timestamp,
+                               hands, self.source_id, frame_size, self.epoch)
+        self.seq = (self.seq + 1) % SEQ_MODULO
+        try:
+            self.sock.sendto(packet, self.address)
+        except OSError as e:
+            print(f"Landmark link send error: {e}")
+
+    def close(self):
+        self.sock.close()
+
+
+class LandmarkReceiver:
+    """Receives landmark packets on a UDP socket and hands them to `on_packet`.
+
+    `on_packet(packet, latency)` is called from the receiver thread, in
+    sequence order per source, so it must not block for long.
+    """
+    def __init__(self, address, on_packet, max_delay=0.0):
+        self.on_packet = on_packet
+        self.max_delay = max_delay
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(address)
+        self.sock.settimeout(0.05)
+        self.address = self.sock.getsockname()
+        self.stats = {}
+        self.buffers = {}
+        self.bad_packets = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="landmark-receiver", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        self.sock.close()
+
+    def _buffer(self, source_id):
+        buffer = self.buffers.get(source_id)
+        if buffer is None:
+            stats = self.stats[source_id] = LinkStats()
+            buffer = self.buffers[source_id] = ReorderBuffer(stats, self.max_delay)
+        return buffer
+
+    def _run(self):
+        while self.running:
+            try:
+                data, _ = self.sock.recvfrom(2048)
+            except socket.timeout:
+                now = time.time()
+                for buffer in self.buffers.values():
+                    self._deliver(buffer.flush(now), now)
+                continue
+            except OSError:
+                break
+            now = time.time()
+            try:
+                packet = decode_packet(data)
+            except ValueError:
+                self.bad_packets += 1
+                continue
+            buffer = self._buffer(packet.source_id)
+            buffer.stats.received += 1
+            self._deliver(buffer.push(packet, now), now)
+
+    def _deliver(self, packets, now):
+        for packet in packets:
+            latency = now - packet.timestamp
+            self.stats[packet.source_id].add_latency(latency)
+            try:
+                self.on_packet(packet, latency)
+            except Exception as e:
+                print(f"Landmark link handler error: {e}")
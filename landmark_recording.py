@@ -0,0 +1,151 @@
+"""Binary landmark recordings for replay and offline evaluation.
+
+A recording is a 64-byte header followed by fixed-size little-endian records,
+one per processed frame, so the whole file can be opened with np.memmap and
+sliced like an array without parsing:
+
+    timestamp   float64          capture time (time.time())
+    n_hands     uint8            number of valid hand slots
+    handedness  uint8[2]         0 = left, 1 = right
+    score       float32[2]       handedness confidence
+    landmarks   float32[2,21,3]  normalized MediaPipe coordinates
+
+Unused hand slots are zero-filled.
+"""
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"HLREC\x00\x00\x01"
+HEADER = struct.Struct("<8sIIHH44x")
+MAX_HANDS = 2
+NUM_LANDMARKS = 21
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("n_hands", "u1"),
+    ("handedness", "u1", (MAX_HANDS,)),
+    ("score", "<f4", (MAX_HANDS,)),
+    ("landmarks", "<f4", (MAX_HANDS, NUM_LANDMARKS, 3)),
+])
+FORMAT_VERSION = 1
+
+
+class LandmarkRecorder:
+    """Appends hand-processor output to a recording file.
+
+    Records are collected in a preallocated block and written when the block
+    is full, so `write` is a few array assignments on the frame path.
+    """
+    def __init__(self, path, frame_size=(0, 0), block_size=256):
+        self.path = path
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD_DTYPE.itemsize, frame_size[0], frame_size[1]))
+        self.frame_size = frame_size
+        self.block = np.zeros(block_size, dtype=RECORD_DTYPE)
+        self.count = 0
+        self.total = 0
+
+    def write(self, timestamp, hands_found, frame_size=None):
+        if frame_size is not None and frame_size != self.frame_size and self.total == 0 and self.count == 0:
+            self._rewrite_frame_size(frame_size)
+        record = self.block[self.count]
+        record["timestamp"] = timestamp
+        n_hands = min(len(hands_found), MAX_HANDS)
+        record["n_hands"] = n_hands
+        for slot in range(n_hands):
+            hand_side, score, landmarks = hands_found[slot]
+            record["handedness"][slot] = 1 if hand_side == "right" else 0
+            record["score"][slot] = score
+            record["landmarks"][slot] = landmarks
+        for slot in range(n_hands, MAX_HANDS):
+            record["handedness"][slot] = 0
+            record["score"][slot] = 0
+            record["landmarks"][slot] = 0
+        self.count += 1
+        if self.count == len(self.block):
+            self.flush()
+
+    def _rewrite_frame_size(self, frame_size):
+        self.frame_size = frame_size
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD_DTYPE.itemsize, frame_size[0], frame_size[1]))
+
+    def flush(self):
+        if self.count:
+            self.file.write(self.block[:self.count].tobytes())
+            self.total += self.count
+            self.count = 0
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+class LandmarkRecording:
+    """Read-only, memory-mapped view of a recording file."""
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path}: not a landmark recording (file too short)")
+        magic, version, record_size, width, height = HEADER.unpack(header)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path}: not a landmark recording (bad magic or version {version})")
+        if record_size != RECORD_DTYPE.itemsize:
+            raise ValueError(f"{path}: record size {record_size} does not match {RECORD_DTYPE.itemsize}")
+        self.frame_size = (width, height)
+        # A recorder that was killed mid-write can leave a partial last record.
+        count = (os.path.getsize(path) - HEADER.size) // RECORD_DTYPE.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def timestamps(self):
+        return self.records["timestamp"]
+
+    def hands(self, index):
+        """Hands of one record as [(hand_side, score, landmarks)]."""
+        record = self.records[index]
+        return [("right" if record["handedness"][slot] else "left",
+                 float(record["score"][slot]),
+                 np.array(record["landmarks"][slot]))
+                for slot in range(record["n_hands"])]
+
+    def hand_arrays(self, hand_side):
+        """Per-frame landmarks of one hand side as (present, landmarks).
+
+        `present` is a bool array of shape (N,), `landmarks` is (N, 21, 3) with
+        NaN where the hand is missing. Meant for vectorized evaluation.
+        """
+        side = 1 if hand_side == "right" else 0
+        slots = np.arange(MAX_HANDS)
+        valid = slots[None, :] < self.records["n_hands"][:, None]
+        match = valid & (self.records["handedness"] == side)
+        present = match.any(axis=1)
+        first_slot = match.argmax(axis=1)
+        landmarks = self.records["landmarks"][np.arange(len(self)), first_slot].astype(np.float32)
+        landmarks[~present] = np.nan
+        return present, landmarks
+
+    def hand_scores(self, hand_side):
+        """Per-frame handedness score of one hand side, NaN where it is missing."""
+        side = 1 if hand_side == "right" else 0
+        slots = np.arange(MAX_HANDS)
+        valid = slots[None, :] < self.records["n_hands"][:, None]
+        match = valid & (self.records["handedness"] == side)
+        scores = self.records["score"][np.arange(len(self)), match.argmax(axis=1)].astype(np.float64)
+        scores[~match.any(axis=1)] = np.nan
+        return scores
+
+
+def open_recording(path):
+    return LandmarkRecording(path)
@@ -0,0 +1,114 @@
+"""Pipeline-latency compensation for speed/volume control.
+
+By the time a browser command takes effect the hand has moved on: the frame
+was captured one pipeline delay ago (capture -> inference -> control) and the
+command still has to make its Selenium round-trip. `LatencyEstimator` tracks
+both delays online, `Extrapolator` projects the smoothed pinch distance
+forward by their sum before the control decision, and `CorrectionMeter`
+counts the corrections users make afterwards (overshoot / undershoot).
+"""
+import math
+
+
+class LatencyEstimator:
+    """Exponential moving averages of per-stage latencies, in seconds."""
+    def __init__(self, alpha=0.2):
+        self.alpha = alpha
+        self.stages = {}
+
+    def observe(self, stage, seconds):
+        if seconds < 0 or not math.isfinite(seconds):
+            return
+        previous = self.stages.get(stage)
+        self.stages[stage] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+
+    def total(self):
+        return sum(self.stages.values())
+
+    def summary(self):
+        return {stage: round(value * 1000, 1) for stage, value in self.stages.items()}
+
+
+class Extrapolator:
+    """Projects a signal `horizon` seconds ahead from its recent velocity.
+
+    The velocity (units per second) is an exponential average of successive
+    differences, so the projection depends on real time rather than frame
+    count. The shift is capped at `max_deviation`, the horizon at
+    `max_horizon`, and gaps longer than `max_gap` restart the estimate.
+    """
+    def __init__(self, velocity_alpha=0.5, max_horizon=0.4, max_deviation=0.12, max_gap=0.25):
+        self.velocity_alpha = velocity_alpha
+        self.max_horizon = max_horizon
+        self.max_deviation = max_deviation
+        self.max_gap = max_gap
+        self.reset()
+
+    def reset(self):
+        self.last_t = None
+        self.last_value = None
+        self.velocity = 0.0
+
+    def update(self, t, value, horizon):
+        if value is None or not math.isfinite(value):
+            self.reset()
+            return value
+        if self.last_t is not None and 0 < t - self.last_t <= self.max_gap:
+            instant = (value - self.last_value) / (t - self.last_t)
+            self.velocity += self.velocity_alpha * (instant - self.velocity)
+        else:
+            self.velocity = 0.0
+        self.last_t = t
+        self.last_value = value
+        shift = self.velocity * min(max(horizon, 0.0), self.max_horizon)
+        return value + max(-self.max_deviation, min(self.max_deviation, shift))
+
+
+class CorrectionMeter:
+    """Counts overshoot and undershoot corrections in a stream of level changes.
+
+    Changes in one direction less than `settle_gap` seconds apart form one
+    move. A move followed within `correction_window` seconds by a change in
+    the opposite direction overshot its target; one followed by a change in
+    the same direction after the user paused undershot it.
+    """
+    def __init__(self, settle_gap=0.6, correction_window=2.0):
+        self.settle_gap = settle_gap
+        self.correction_window = correction_window
+        self.moves = 0
+        self.overshoots = 0
+        self.undershoots = 0
+        self.overshoot_amount = 0.0
+        self.undershoot_amount = 0.0
+        self.direction = 0
+        self.last_change = None
+
+    def record(self, t, old, new):
+        direction = (new > old) - (new < old)
+        if direction == 0:
+            return
+        gap = None if self.last_change is None else t - self.last_change
+        if gap is None or gap > self.correction_window:
+            self.moves += 1
+        elif direction != self.direction:
+            self.moves += 1
+            self.overshoots += 1
+            self.overshoot_amount += abs(new - old)
+        elif gap > self.settle_gap:
+            self.moves += 1
+            self.undershoots += 1
+            self.undershoot_amount += abs(new - old)
+        self.direction = direction
+        self.last_change = t
+
+    def summary(self):
+        moves = max(self.moves, 1)
+        return {
+            "moves": self.moves,
+            "overshoots": self.overshoots,
+            "undershoots": self.undershoots,
+            "overshoot_rate": round(self.overshoots / moves, 3),
+            "undershoot_rate": round(self.undershoots / moves, 3),
+            "mean_overshoot": round(self.overshoot_amount / self.overshoots, 3) if self.overshoots else 0.0,
+            "mean_undershoot": round(self.undershoot_amount / self.undershoots, 3) if self.undershoots else 0.0,
+        }
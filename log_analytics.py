@@ -0,0 +1,420 @@
+"""Streaming analytics over gesture logs.
+
+Reads one or more gesture logs (CSV or the columnar .gcol written with
+--log-binary, plain or .gz; e.g. a station's rotated logs, or logs from
+several stations) row by row, so memory stays constant however many weeks of
+logs are given. Columnar logs are read a block of typed arrays at a time. Latencies and FPS go into
+fixed-bin histograms and percentiles are read from those; the relative error
+is bounded by the bin width (about 2% for latency).
+
+Reported:
+- per gesture: rows, success rate, latency p50/p95/p99 of successful rows
+  that measured a latency,
+- FPS distribution (percentiles and 10-FPS bands),
+- detection ratio over time (mean "Hand Detection Accuracy" per time bucket),
+- degraded stretches: runs of consecutive rows below --min-fps or
+  --min-detection, no more than --max-gap seconds apart.
+
+    python log_analytics.py logs/gesture_log.csv
+    python log_analytics.py logs/station-*/gesture_log*.csv* --per-file --json
+    python log_analytics.py logs/gesture_log.gcol logs/gesture_log.*.gcol.gz
+"""
+import argparse
+import csv
+import gzip
+import heapq
+import json
+import math
+import os
+import sys
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+from session_log import read_blocks
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+LogRecord = namedtuple("LogRecord", "time session gesture success latency fps detection")
+# time: epoch seconds or None; session: id or None for logs written before session ids
+
+
+# ======== Histograms ========
+class LogHistogram:
+    """Counts of positive values in log-spaced bins between `low` and `high`."""
+    def __init__(self, low=1e-4, high=100.0, bins_per_decade=50):
+        self.low = low
+        self.scale = bins_per_decade / math.log(10)
+        self.bins = [0] * (int(math.ceil(math.log(high / low) * self.scale)) + 2)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value):
+        if value < self.low:
+            return 0
+        return min(len(self.bins) - 1, 1 + int(math.log(value / self.low) * self.scale))
+
+    def _indices(self, values):
+        scaled = np.log(np.maximum(values, self.low) / self.low) * self.scale
+        indices = np.minimum(len(self.bins) - 1, 1 + scaled.astype(np.int64))
+        return np.where(values < self.low, 0, indices)
+
+    def _value(self, index):
+        if index == 0:
+            return self.low
+        # Geometric centre of the bin.
+        return self.low * math.exp((index - 0.5) / self.scale)
+
+    def add(self, value):
+        self.bins[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def add_many(self, values):
+        """Adds a numpy array of values."""
+        if not len(values):
+            return
+        counts = np.bincount(self._indices(values), minlength=len(self.bins))
+        self.bins = [a + b for a, b in zip(self.bins, counts.tolist())]
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.bins):
+            seen += count
+            if seen >= rank and count:
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+
+class LinearHistogram(LogHistogram):
+    """Counts of values in `width`-sized bins from 0 to `high`."""
+    def __init__(self, width=1.0, high=240.0):
+        self.width = width
+        self.bins = [0] * (int(high / width) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value):
+        return min(len(self.bins) - 1, max(0, int(value / self.width)))
+
+    def _indices(self, values):
+        return np.clip((values / self.width).astype(np.int64), 0, len(self.bins) - 1)
+
+    def _value(self, index):
+        # Lower edge: exact for integer FPS with the default width.
+        return index * self.width
+
+    def bands(self, band_width):
+        """{"lo-hi": count} for non-empty bands of `band_width`."""
+        per_band = max(1, int(round(band_width / self.width)))
+        bands = {}
+        for start in range(0, len(self.bins), per_band):
+            count = sum(self.bins[start:start + per_band])
+            if count:
+                lo = start * self.width
+                bands[f"{lo:g}-{lo + band_width:g}"] = count
+        return bands
+
+
+# ======== Streaming ========
+def open_log(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", newline="")
+    return open(path, newline="")
+
+
+def is_columnar(path):
+    return path.endswith((".gcol", ".gcol.gz"))
+
+
+def read_records(path):
+    """Yields a LogRecord for every data row of a CSV log."""
+    with open_log(path) as f:
+        for row in csv.DictReader(f):
+            yield LogRecord(_timestamp(row.get("Timestamp")), row.get("Session"),
+                            row.get("Gesture") or "?", row.get("Success") == "True",
+                            _float(row.get("Latency")), _float(row.get("FPS")),
+                            _float(row.get("Hand Detection Accuracy")))
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _timestamp(value):
+    try:
+        return datetime.strptime(value, TIMESTAMP_FORMAT).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class LogSummary:
+    """Constant-memory aggregates over a stream of log rows."""
+    def __init__(self, bucket=3600, min_fps=20, min_detection=0.5, max_gap=60, max_stretches=20):
+        self.bucket = bucket
+        self.min_fps = min_fps
+        self.min_detection = min_detection
+        self.max_gap = max_gap
+        self.max_stretches = max_stretches
+        self.rows = 0
+        self.skipped = 0
+        self.first = None
+        self.last = None
+        self.sessions = set()
+        self.gestures = {}
+        self.fps = LinearHistogram()
+        self.detection = {}
+        self.stretches = []  # min-heap of the longest (duration, start, end, rows, fps_sum)
+        self.stretch_count = 0
+        self.degraded_rows = 0
+        self.current = None
+        self.previous_time = None
+
+    def add(self, record):
+        t = record.time
+        if t is None:
+            self.skipped += 1
+            return
+        self.rows += 1
+        self.first = t if self.first is None else min(self.first, t)
+        self.last = t if self.last is None else max(self.last, t)
+        if record.session is not None:
+            self.sessions.add(record.session)
+
+        stats = self.gestures.get(record.gesture)
+        if stats is None:
+            stats = self.gestures[record.gesture] = {"rows": 0, "success": 0, "latency": LogHistogram()}
+        stats["rows"] += 1
+        if record.success:
+            stats["success"] += 1
+            # Relative commands are sent asynchronously and log 0.000.
+            if record.latency:
+                stats["latency"].add(record.latency)
+
+        fps = record.fps
+        if fps is not None:
+            self.fps.add(fps)
+        detection = record.detection
+        if detection is not None:
+            key = int(t // self.bucket) * self.bucket
+            total, count = self.detection.get(key, (0.0, 0))
+            self.detection[key] = (total + detection, count + 1)
+
+        degraded = (fps is not None and fps < self.min_fps) or \
+                   (detection is not None and detection < self.min_detection)
+        self._track_stretch(t, degraded, fps)
+
+    def add_block(self, session, columns):
+        """Adds one block of a columnar log (see session_log.read_blocks) at once."""
+        times = columns["Timestamp"]
+        if not len(times):
+            return
+        self.rows += len(times)
+        self.first = min(self.first, float(times.min())) if self.first is not None else float(times.min())
+        self.last = max(self.last, float(times.max())) if self.last is not None else float(times.max())
+        self.sessions.add(session)
+
+        gestures = columns["Gesture"]
+        success = columns["Success"].astype(bool)
+        latency = columns["Latency"].astype(np.float64)
+        for name in np.unique(gestures).tolist():
+            mask = gestures == name
+            stats = self.gestures.get(name)
+            if stats is None:
+                stats = self.gestures[name] = {"rows": 0, "success": 0, "latency": LogHistogram()}
+            stats["rows"] += int(mask.sum())
+            stats["success"] += int((mask & success).sum())
+            stats["latency"].add_many(latency[mask & success & (latency != 0)])
+
+        fps = columns["FPS"].astype(np.float64)
+        detection = columns["Hand Detection Accuracy"].astype(np.float64)
+        self.fps.add_many(fps)
+        keys, inverse = np.unique((times // self.bucket) * self.bucket, return_inverse=True)
+        sums = np.bincount(inverse, weights=detection)
+        counts = np.bincount(inverse)
+        for key, total, count in zip(keys.tolist(), sums.tolist(), counts.tolist()):
+            previous_total, previous_count = self.detection.get(int(key), (0.0, 0))
+            self.detection[int(key)] = (previous_total + total, previous_count + count)
+
+        degraded = (fps < self.min_fps) | (detection < self.min_detection)
+        for t, is_degraded, value in zip(times.tolist(), degraded.tolist(), fps.tolist()):
+            self._track_stretch(t, is_degraded, value)
+
+    def _track_stretch(self, t, degraded, fps):
+        gap = self.previous_time is not None and t - self.previous_time > self.max_gap
+        self.previous_time = t
+        if self.current is not None and (not degraded or gap):
+            self._close_stretch()
+        if degraded:
+            self.degraded_rows += 1
+            if self.current is None:
+                self.current = [t, t, 0, 0.0]
+            self.current[1] = t
+            self.current[2] += 1
+            self.current[3] += fps or 0.0
+
+    def _close_stretch(self):
+        start, end, rows, fps_sum = self.current
+        self.current = None
+        self.stretch_count += 1
+        item = (end - start, start, end, rows, fps_sum)
+        if len(self.stretches) < self.max_stretches:
+            heapq.heappush(self.stretches, item)
+        else:
+            heapq.heappushpop(self.stretches, item)
+
+    def finish(self):
+        if self.current is not None:
+            self._close_stretch()
+        self.previous_time = None
+        return self
+
+    def report(self):
+        def ms(value):
+            return None if value is None else round(value * 1000, 2)
+
+        gestures = {}
+        for name, stats in sorted(self.gestures.items()):
+            latency = stats["latency"]
+            gestures[name] = {
+                "rows": stats["rows"],
+                "success": stats["success"],
+                "success_rate": round(stats["success"] / stats["rows"], 3),
+                "latency_samples": latency.count,
+                "latency_ms": {"p50": ms(latency.percentile(50)), "p95": ms(latency.percentile(95)),
+                               "p99": ms(latency.percentile(99))},
+            }
+        fps = {
+            "samples": self.fps.count,
+            "mean": None if not self.fps.count else round(self.fps.mean(), 1),
+            "p5": self.fps.percentile(5),
+            "p50": self.fps.percentile(50),
+            "p95": self.fps.percentile(95),
+            "bands": self.fps.bands(10),
+        }
+        detection = [{"start": _format_time(key), "mean": round(total / count, 3), "rows": count}
+                     for key, (total, count) in sorted(self.detection.items())]
+        stretches = [{"start": _format_time(start), "end": _format_time(end), "seconds": round(duration, 1),
+                      "rows": rows, "mean_fps": round(fps_sum / rows, 1)}
+                     for duration, start, end, rows, fps_sum in sorted(self.stretches, reverse=True)]
+        return {
+            "rows": self.rows,
+            "skipped_rows": self.skipped,
+            "sessions": len(self.sessions),
+            "first": None if self.first is None else _format_time(self.first),
+            "last": None if self.last is None else _format_time(self.last),
+            "gestures": gestures,
+            "fps": fps,
+            "detection_ratio": detection,
+            "degraded": {"min_fps": self.min_fps, "min_detection": self.min_detection,
+                         "rows": self.degraded_rows, "stretches": self.stretch_count, "longest": stretches},
+        }
+
+
+def _format_time(t):
+    return datetime.fromtimestamp(t).strftime(TIMESTAMP_FORMAT)
+
+
+def summarize(paths, per_file=False, **options):
+    """Streams `paths` into {"all": report} plus one report per file with `per_file`."""
+    total = LogSummary(**options)
+    files = {}
+    for path in paths:
+        # Stretches do not continue across files (stations or restarts).
+        total.finish()
+        summaries = [total]
+        if per_file:
+            summaries.append(files.setdefault(path, LogSummary(**options)))
+        if is_columnar(path):
+            for session, columns in read_blocks(path):
+                for summary in summaries:
+                    summary.add_block(session, columns)
+        else:
+            for record in read_records(path):
+                for summary in summaries:
+                    summary.add(record)
+    reports = {"all": total.finish().report()}
+    for path, summary in files.items():
+        reports[path] = summary.finish().report()
+    return reports
+
+
+# ======== Output ========
+def format_report(title, report):
+    lines = [f"== {title}: {report['rows']} rows, {report['first']} .. {report['last']}"]
+    if report["sessions"]:
+        lines.append(f"   {report['sessions']} sessions")
+    if report["skipped_rows"]:
+        lines.append(f"   ({report['skipped_rows']} rows without a timestamp skipped)")
+    lines.append(f"{'Gesture':14s} {'rows':>6s} {'success':>8s} {'n':>5s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}")
+    for name, stats in report["gestures"].items():
+        latency = stats["latency_ms"]
+        cells = [f"{latency[q]:8.2f}" if latency[q] is not None else f"{'-':>8s}" for q in ("p50", "p95", "p99")]
+        lines.append(f"{name:14s} {stats['rows']:6d} {stats['success_rate']:8.1%} {stats['latency_samples']:5d} "
+                     + " ".join(cells))
+    fps = report["fps"]
+    if fps["samples"]:
+        lines.append(f"FPS: mean {fps['mean']}, p5 {fps['p5']:g}, p50 {fps['p50']:g}, p95 {fps['p95']:g}")
+        lines.append("     " + ", ".join(f"{band}: {count}" for band, count in fps["bands"].items()))
+    if report["detection_ratio"]:
+        lines.append("Detection ratio:")
+        for bucket in report["detection_ratio"]:
+            lines.append(f"  {bucket['start']}  {bucket['mean']:.3f}  ({bucket['rows']} rows)")
+    degraded = report["degraded"]
+    lines.append(f"Degraded (FPS < {degraded['min_fps']:g} or detection < {degraded['min_detection']:g}): "
+                 f"{degraded['rows']} rows in {degraded['stretches']} stretches")
+    for stretch in degraded["longest"]:
+        lines.append(f"  {stretch['start']} .. {stretch['end']}  {stretch['seconds']:g}s, "
+                     f"{stretch['rows']} rows, mean FPS {stretch['mean_fps']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize gesture logs in constant memory.")
+    parser.add_argument("logs", nargs="*", default=["logs/gesture_log.csv"], help="CSV or columnar (.gcol) logs, optionally .gz")
+    parser.add_argument("--per-file", action="store_true", help="Also report each file on its own")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of text")
+    parser.add_argument("--bucket", type=float, default=3600, help="Detection ratio bucket in seconds")
+    parser.add_argument("--min-fps", type=float, default=20, help="Rows below this FPS are degraded")
+    parser.add_argument("--min-detection", type=float, default=0.5,
+                        help="Rows below this hand detection ratio are degraded")
+    parser.add_argument("--max-gap", type=float, default=60,
+                        help="Seconds between degraded rows that still count as one stretch")
+    parser.add_argument("--stretches", type=int, default=20, help="How many of the longest stretches to list")
+    args = parser.parse_args(argv)
+
+    missing = [path for path in args.logs if not os.path.exists(path)]
+    if missing:
+        print(f"Log not found: {', '.join(missing)}", file=sys.stderr)
+        return 1
+    reports = summarize(args.logs, args.per_file, bucket=args.bucket, min_fps=args.min_fps,
+                        min_detection=args.min_detection, max_gap=args.max_gap, max_stretches=args.stretches)
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        print("\n\n".join(format_report(title, report) for title, report in reports.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
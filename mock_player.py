@@ -0,0 +1,353 @@
+"""Offline fixture and load generator for the browser command path.
+
+- `serve_mock_player` serves mock_player.html, a YouTube stand-in page with a
+  <video> element and the window.aiHandController contract, on localhost.
+- `FakeDriver` is a WebDriver look-alike backed by `MockPlayer`, a model of
+  that page: execute_script understands the controller's calls and W3C key
+  actions (k, Shift+N) are applied to the model. A configurable round-trip
+  delay stands in for WebDriver's HTTP hop. `MockPlayer.reload` and
+  `FakeDriver.crashed` simulate a page load and a dead browser for the
+  browser monitor.
+- `run_load` fires gesture-shaped command bursts through the controller's own
+  queue_player_value / perform_pause_action on the shared command executor
+  and reports commands/s, commands dropped unsent because a newer value
+  replaced them, commands sent per requested value change (below 1 when
+  coalescing dropped intermediate values, above 1 when a repeated value was
+  sent again), p99 apply latency and bursts that ended on
+  a stale value because an older command finished last.
+
+Nothing needs network access:
+
+    python mock_player.py                        # fake driver, 20 ms round trip
+    python mock_player.py --driver-latency 0     # pure controller overhead
+    python mock_player.py --real-browser         # mock page in Brave/Chrome
+    python mock_player.py --serve                # only serve the page
+"""
+import argparse
+import functools
+import http.server
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_player.html")
+SHIFT_KEY = "\ue008"  # selenium Keys.SHIFT
+
+
+# ======== Page server ========
+def serve_mock_player(host="127.0.0.1", port=0):
+    """Serves the mock page in a daemon thread; returns (server, url)."""
+    handler = functools.partial(_QuietHandler, directory=os.path.dirname(PAGE))
+    server = http.server.ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="mock-player-http", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/{os.path.basename(PAGE)}"
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+# ======== Player model and fake driver ========
+class MockPlayer:
+    """Python model of mock_player.html as seen through execute_script."""
+    SET_CALL = re.compile(r"setYouTube(Speed|Volume)\(([-0-9.eE]+)\)")
+
+    def __init__(self, history=None):
+        self.speed = 1.0
+        self.volume = 1.0
+        self.paused = False
+        self.video_index = 0
+        self.navigations = 0
+        # The page defines the controller contract itself; reload() drops it
+        # until the controller script is injected again.
+        self.controller = True
+        self.lock = threading.Lock()
+        # `history` bounds the change list for long runs; `changes` counts all.
+        self.applied = deque(maxlen=history) if history else []
+        self.changes = 0
+
+    def _apply(self, kind, value):
+        self.applied.append((time.perf_counter(), kind, value))
+        self.changes += 1
+
+    def evaluate(self, script):
+        with self.lock:
+            if "ai-speed-controller" in script:
+                self.controller = True
+                return True
+            if "drainTelemetry" in script:
+                return {"timeOrigin": 0, "entries": []}
+            if "navigations" in script:
+                return {"ready": self.controller, "navigations": self.navigations if self.controller else 0,
+                        "href": f"mock://video/{self.video_index}", "speed": self.speed, "volume": self.volume}
+            match = self.SET_CALL.search(script)
+            if match:
+                if not self.controller:
+                    raise RuntimeError(f"javascript error: window.setYouTube{match.group(1)} is not a function")
+                value = float(match.group(2))
+                if match.group(1) == "Speed":
+                    if not 0.25 <= value <= 2.0:
+                        return False
+                    if abs(value - self.speed) > 0.01:
+                        self.speed = value
+                        self._apply("speed", value)
+                else:
+                    if not 0.0 <= value <= 1.0:
+                        return False
+                    if abs(value - self.volume) > 0.01:
+                        self.volume = value
+                        self._apply("volume", value)
+                return True
+            if "v.playbackRate" in script:
+                return {"speed": self.speed, "volume": self.volume, "paused": self.paused}
+            for name, value in (("paused", self.paused), ("playbackRate", self.speed), ("volume", self.volume)):
+                if re.search(rf"\.{name}\s*(;|:|$)", script.strip()):
+                    return value
+            return None
+
+    def key(self, key, shift=False):
+        with self.lock:
+            if key == "k":
+                self.paused = not self.paused
+                self._apply("paused", self.paused)
+            elif key.lower() == "n" and shift:
+                self.video_index += 1
+                self.navigations += 1
+                self._apply("next", self.video_index)
+
+    def reload(self):
+        """A full page load: the injected controller is gone."""
+        with self.lock:
+            self.controller = False
+
+
+class FakeDriver:
+    """Enough of a Selenium WebDriver for the controller to run against MockPlayer."""
+    def __init__(self, player=None, latency=0.02, jitter=0.01, seed=0):
+        self.player = player or MockPlayer()
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.capabilities = {"browserName": "mock"}
+        self.current_url = None
+        self.calls = 0
+        self.crashed = False
+
+    def _round_trip(self):
+        self.calls += 1
+        if self.crashed:
+            raise ConnectionRefusedError("browser session is gone")
+        if self.latency or self.jitter:
+            with self.random_lock:
+                delay = self.latency + self.random.uniform(0, self.jitter)
+            time.sleep(delay)
+
+    @property
+    def title(self):
+        self._round_trip()
+        return f"Mock Player {self.player.video_index} - Hand Controller"
+
+    def get(self, url):
+        self._round_trip()
+        self.current_url = url
+
+    def execute_script(self, script, *args):
+        self._round_trip()
+        return self.player.evaluate(script)
+
+    def execute(self, command, params=None):
+        """W3C actions as sent by ActionChains.perform()."""
+        self._round_trip()
+        for source in (params or {}).get("actions", []):
+            if source.get("type") != "key":
+                continue
+            shift = False
+            for action in source.get("actions", []):
+                value = action.get("value")
+                if value == SHIFT_KEY:
+                    shift = action["type"] == "keyDown"
+                elif action.get("type") == "keyDown" and value:
+                    self.player.key(value, shift)
+        return {"value": None}
+
+    def quit(self):
+        pass
+
+
+# ======== Load generator ========
+def gesture_bursts(count, seed=0, speed_levels=None, volume_levels=None):
+    """Yields bursts as lists of (kind, value), one command per frame.
+
+    Pinch sweeps walk one level every 1-3 frames and repeat the current level
+    in between, like the relative controller; about one burst in eight is a
+    pause/play toggle.
+    """
+    rng = random.Random(seed)
+    speed_levels = speed_levels or [0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 1.75, 2.0]
+    volume_levels = volume_levels or [round(i * 0.1, 1) for i in range(11)]
+    for _ in range(count):
+        if rng.random() < 0.125:
+            yield [("pause", None)]
+            continue
+        kind, levels = ("speed", speed_levels) if rng.random() < 0.5 else ("volume", volume_levels)
+        start = rng.randrange(len(levels))
+        end = rng.randrange(len(levels))
+        step = 1 if end >= start else -1
+        burst = []
+        for index in range(start, end + step, step):
+            burst.extend([(kind, levels[index])] * rng.randint(1, 3))
+        yield burst
+
+
+def applied_changes(session):
+    """Number of changes the player has applied so far."""
+    if isinstance(session.driver, FakeDriver):
+        return session.driver.player.changes
+    from youtube_controlv1 import run_page_script
+    return run_page_script(session, "window.mockPlayer.applied.length")
+
+
+def run_load(session, bursts, frame_interval=1 / 30, burst_gap=0.3):
+    import youtube_controlv1 as controller
+
+    latencies = []
+    latency_lock = threading.Lock()
+    futures = []
+    stale = 0
+
+    superseded = 0
+
+    def timed(func, issued, *args):
+        func(*args)
+        with latency_lock:
+            latencies.append(time.perf_counter() - issued)
+
+    def sent(issued, future):
+        nonlocal superseded
+        with latency_lock:
+            if future.result() is None:
+                superseded += 1
+            else:
+                latencies.append(time.perf_counter() - issued)
+
+    applied_before = applied_changes(session)
+    issued = 0
+    requested_changes = 0
+    last_requested = {}
+    start = time.perf_counter()
+    for burst in bursts:
+        burst_futures = []
+        for kind, value in burst:
+            now = time.perf_counter()
+            # A pause toggles every time; speed/volume only change on a new value.
+            if kind == "pause" or last_requested.get(kind) != value:
+                requested_changes += 1
+                last_requested[kind] = value
+            if kind in ("speed", "volume"):
+                future = controller.queue_player_value(session, kind, value)
+                future.add_done_callback(functools.partial(sent, now))
+                burst_futures.append(future)
+            else:
+                burst_futures.append(controller.async_action(timed, controller.perform_pause_action, now, session))
+            issued += 1
+            time.sleep(frame_interval)
+        time.sleep(burst_gap)
+        for future in burst_futures:
+            future.result()
+        futures.extend(burst_futures)
+        # No frame path here: the load thread owns the session state.
+        session.store.apply_pending()
+        session.store.publish()
+        kind, value = burst[-1]
+        if kind != "pause":
+            # An older command that finished last would leave the player on a
+            # value the user moved past.
+            state = session.backend.query_state()
+            actual = state.speed if kind == "speed" else state.volume
+            if abs(actual - value) > 0.01:
+                stale += 1
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "issued": issued,
+        "completed": len(latencies),
+        "superseded": superseded,
+        "elapsed_s": round(elapsed, 2),
+        "commands_per_s": round(len(latencies) / elapsed, 1),
+    }
+    if latencies:
+        samples = np.array(latencies) * 1000
+        report["apply_latency_ms"] = {
+            "p50": round(float(np.percentile(samples, 50)), 2),
+            "p95": round(float(np.percentile(samples, 95)), 2),
+            "p99": round(float(np.percentile(samples, 99)), 2),
+            "max": round(float(samples.max()), 2),
+        }
+    session.store.apply_pending()
+    applied = applied_changes(session) - applied_before
+    report["applied_changes"] = applied
+    sent_commands = issued - superseded
+    report["requested_changes"] = requested_changes
+    report["sent_per_requested_change"] = round(sent_commands / requested_changes, 3) if requested_changes else 0.0
+    report["stale_final_bursts"] = stale
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the browser command path against a mock player.")
+    parser.add_argument("--serve", action="store_true", help="Only serve the mock page and print its URL")
+    parser.add_argument("--real-browser", action="store_true", help="Drive the mock page in Brave/Chrome via Selenium")
+    parser.add_argument("--browser", choices=["brave", "chrome"], default="brave")
+    parser.add_argument("--transport", choices=["webdriver", "devtools"], default="webdriver")
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--fps", type=float, default=30.0, help="Command rate within a burst (frames per second)")
+    parser.add_argument("--driver-latency", type=float, default=0.02, help="Fake driver round trip in seconds")
+    parser.add_argument("--driver-jitter", type=float, default=0.01, help="Extra uniform random round trip in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server, url = serve_mock_player()
+    if args.serve:
+        print(f"Mock player at {url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.shutdown()
+        return 0
+
+    import youtube_controlv1 as controller
+
+    session = controller.ControllerSession(video_url=url, browser_type=args.browser, transport=args.transport)
+    session.log_file = os.path.join(tempfile.mkdtemp(prefix="mock-player-"), "gesture_log.csv")
+    controller.init_gesture_log(session)
+    if args.real_browser:
+        if not controller.setup_selenium(session):
+            return 1
+    else:
+        session.driver = FakeDriver(latency=args.driver_latency, jitter=args.driver_jitter, seed=args.seed)
+        session.driver.get(url)
+        session.backend = controller.SeleniumBackend(session)
+        session.selenium_active = True
+        session.store.publish()
+
+    report = run_load(session, list(gesture_bursts(args.bursts, args.seed)), 1 / args.fps)
+    for key, value in report.items():
+        print(f"{key}: {value}")
+    controller.flush_gesture_log(session)
+    session.backend.close()
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
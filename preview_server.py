@@ -0,0 +1,199 @@
+"""MJPEG preview of the annotated frames over HTTP.
+
+For kiosks without a monitor: the render loop hands each annotated frame to
+`PreviewServer.publish`, and any browser can watch the stations at
+
+    /                 all sessions on one page
+    /stream/<index>   multipart/x-mixed-replace MJPEG stream of one session
+    /snapshot/<index> the latest JPEG
+
+`publish` never blocks. It returns at once when nobody watches that session
+or the last encode was less than 1 / max_fps ago, and otherwise hands the
+frame to a small encoder pool (one encode in flight per session; frames
+arriving meanwhile are skipped). Each viewer gets the newest JPEG when it is
+ready for one, so a slow viewer sees fewer frames but never holds up the
+others or the encoder.
+"""
+import http.server
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+BOUNDARY = "frame"
+VIEWER_TIMEOUT = 5.0  # seconds without a new frame before a stream writes a keep-alive to check the connection
+
+
+class PreviewChannel:
+    """Latest JPEG of one session and its viewers."""
+    def __init__(self, name):
+        self.name = name
+        self.jpeg = None
+        self.sequence = 0
+        self.viewers = 0
+        self.encoding = False
+        self.last_encode = 0.0
+        self.encoded = 0
+        self.condition = threading.Condition()
+
+    def attach(self):
+        with self.condition:
+            self.viewers += 1
+
+    def detach(self):
+        with self.condition:
+            self.viewers -= 1
+
+    def put(self, jpeg):
+        with self.condition:
+            self.jpeg = jpeg
+            self.sequence += 1
+            self.encoded += 1
+            self.encoding = False
+            self.condition.notify_all()
+
+    def wait(self, sequence, timeout):
+        """Newest (sequence, jpeg) after `sequence`, or the current one on timeout."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.sequence != sequence, timeout)
+            return self.sequence, self.jpeg
+
+
+class PreviewServer:
+    def __init__(self, address, names, max_fps=10.0, quality=70, workers=2):
+        self.channels = [PreviewChannel(name) for name in names]
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.quality = quality
+        self.encoder = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="preview-encode")
+        self.running = True
+        handler = type("PreviewHandler", (_PreviewHandler,), {"preview": self})
+        self.server = http.server.ThreadingHTTPServer(address, handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="preview-http", daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def publish(self, index, frame):
+        """Offer an annotated frame; encodes only when watched and due. Never blocks."""
+        channel = self.channels[index]
+        if not channel.viewers or channel.encoding:
+            return False
+        now = time.monotonic()
+        if now - channel.last_encode < self.min_interval:
+            return False
+        channel.encoding = True
+        channel.last_encode = now
+        self.encoder.submit(self._encode, channel, frame)
+        return True
+
+    def _encode(self, channel, frame):
+        try:
+            ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if ok:
+                channel.put(jpeg.tobytes())
+        except Exception as e:
+            print(f"Preview encode error ({channel.name}): {e}")
+        finally:
+            # Also after a failed encode, or the channel would never encode again.
+            channel.encoding = False
+
+    def stop(self):
+        self.running = False
+        for channel in self.channels:
+            with channel.condition:
+                channel.condition.notify_all()
+        self.server.shutdown()
+        self.server.server_close()
+        self.encoder.shutdown(wait=False, cancel_futures=True)
+
+    def summary(self):
+        return ", ".join(f"{channel.name}: {channel.encoded} frames encoded" for channel in self.channels)
+
+
+class _PreviewHandler(http.server.BaseHTTPRequestHandler):
+    preview = None
+    ROUTE = re.compile(r"^/(stream|snapshot)/(\d+)(?:\.jpg)?$")
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path in ("/", "/index.html"):
+            self._index()
+            return
+        match = self.ROUTE.match(self.path)
+        if not match or int(match.group(2)) >= len(self.preview.channels):
+            self.send_error(404)
+            return
+        channel = self.preview.channels[int(match.group(2))]
+        if match.group(1) == "snapshot":
+            self._snapshot(channel)
+        else:
+            self._stream(channel)
+
+    def _index(self):
+        images = "".join(f'<figure><img src="/stream/{i}"><figcaption>{channel.name}</figcaption></figure>'
+                         for i, channel in enumerate(self.preview.channels))
+        body = ("<!doctype html><title>Hand controller preview</title>"
+                "<style>body{background:#111;color:#ddd;font-family:sans-serif}figure{display:inline-block}"
+                f"img{{max-width:640px}}</style>{images}").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _snapshot(self, channel):
+        # A snapshot is a short visit: it waits for a fresh frame to be encoded.
+        channel.attach()
+        try:
+            _, jpeg = channel.wait(channel.sequence, VIEWER_TIMEOUT)
+        finally:
+            channel.detach()
+        if jpeg is None:
+            self.send_error(503, "No frame yet")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(jpeg)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(jpeg)
+
+    def _stream(self, channel):
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        channel.attach()
+        sequence = -1
+        try:
+            while self.preview.running:
+                new_sequence, jpeg = channel.wait(sequence, VIEWER_TIMEOUT)
+                if new_sequence == sequence:
+                    # Timed out. Write anyway (the last frame again, or a blank line of
+                    # preamble before the first one): to a viewer that went away the
+                    # write fails, and the viewer is detached.
+                    self.wfile.write(_part(jpeg) if jpeg is not None else b"\r\n")
+                    continue
+                sequence = new_sequence
+                if jpeg is not None:
+                    self.wfile.write(_part(jpeg))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            channel.detach()
+
+
+def _part(jpeg):
+    return (f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+            f"Content-Length: {len(jpeg)}\r\n\r\n").encode() + jpeg + b"\r\n"
@@ -0,0 +1,248 @@
+"""Gesture logs for long-running sessions.
+
+`SessionLog` appends rows to logs/gesture_log.csv across restarts, tagging each row
+with the session id, and rotates the file once it reaches `max_bytes` or its
+first row is `max_age` seconds old. A rotated file is renamed to
+`gesture_log.<YYYYmmdd-HHMMSSmmm>.csv` and gzipped on a background thread; only
+the newest `keep` rotated files are kept, so disk use stays bounded. A file in
+an older column layout is rotated away on start instead of appended to.
+
+With `binary=True` the same rows are also written to a columnar file
+(`gesture_log.gcol`) that rotates with the CSV. It is a 16-byte header
+followed by blocks, one per flush:
+
+    block header   "<4sII"   b"BLK\\0", rows, length of the block metadata
+    metadata       JSON      {"session": id, "strings": {column: [values]}}
+    columns        arrays    one little-endian array per COLUMNS entry
+
+Text columns hold uint16 indexes into the block's string table. `read_blocks`
+yields each block as a dict of numpy arrays without parsing any text.
+"""
+import csv
+import glob
+import gzip
+import json
+import os
+import shutil
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+CSV_HEADER = ["Timestamp", "Gesture", "Success", "Latency", "FPS", "Action Status", "Selenium Latency",
+              "Hand Detection Accuracy", "Frame Processing Rate", "Distance Stability", "Frame Processing Time",
+              "Gesture Success Rate", "Session"]
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Row layout used by log_gesture_result, in CSV_HEADER order (without Session).
+COLUMNS = [
+    ("Timestamp", "<f8"),
+    ("Gesture", "<u2"),
+    ("Success", "u1"),
+    ("Latency", "<f4"),
+    ("FPS", "<f4"),
+    ("Action Status", "<u2"),
+    ("Selenium Latency", "<f4"),
+    ("Hand Detection Accuracy", "<f4"),
+    ("Frame Processing Rate", "<f4"),
+    ("Distance Stability", "<f4"),
+    ("Frame Processing Time", "<f4"),
+    ("Gesture Success Rate", "<f4"),
+]
+STRING_COLUMNS = ("Gesture", "Action Status")
+MAGIC = b"GLCOL\x00\x00\x01"
+FILE_HEADER = struct.Struct("<8sI4x")
+BLOCK_HEADER = struct.Struct("<4sII")
+BLOCK_MAGIC = b"BLK\x00"
+FORMAT_VERSION = 1
+
+# Rotated files of every session are compressed one at a time.
+compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-compress")
+
+
+def new_session_id(index=0):
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{index}"
+
+
+def format_row(row, session_id):
+    (timestamp, gesture, success, latency, fps, action_status, selenium_latency, hand_detection_accuracy,
+     frame_processing_rate, distance_stability, frame_processing_time, gesture_success_rate) = row
+    return [
+        time.strftime(TIMESTAMP_FORMAT, time.localtime(timestamp)),
+        gesture,
+        success,
+        f"{latency:.3f}",
+        fps,
+        action_status,
+        f"{selenium_latency:.3f}",
+        f"{hand_detection_accuracy:.3f}",
+        f"{frame_processing_rate:.3f}",
+        f"{distance_stability:.6f}",
+        f"{frame_processing_time:.6f}",
+        f"{gesture_success_rate:.3f}",
+        session_id,
+    ]
+
+
+# ======== Columnar file ========
+def encode_block(rows, session_id):
+    columns = list(zip(*rows))
+    strings = {}
+    arrays = []
+    for (name, dtype), values in zip(COLUMNS, columns):
+        if name in STRING_COLUMNS:
+            table = {}
+            codes = [table.setdefault(str(value), len(table)) for value in values]
+            strings[name] = list(table)
+            values = codes
+        arrays.append(np.asarray(values, dtype=dtype).tobytes())
+    metadata = json.dumps({"session": session_id, "strings": strings}).encode()
+    return BLOCK_HEADER.pack(BLOCK_MAGIC, len(rows), len(metadata)) + metadata + b"".join(arrays)
+
+
+def open_columnar(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def read_blocks(path):
+    """Yields (session id, {column: array}) per block; text columns are decoded to object arrays."""
+    with open_columnar(path) as f:
+        magic, version = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a columnar gesture log")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported format version {version}")
+        while True:
+            header = f.read(BLOCK_HEADER.size)
+            if len(header) < BLOCK_HEADER.size:
+                return
+            block_magic, rows, metadata_length = BLOCK_HEADER.unpack(header)
+            if block_magic != BLOCK_MAGIC:
+                raise ValueError(f"{path}: corrupt block")
+            metadata = json.loads(f.read(metadata_length))
+            columns = {}
+            for name, dtype in COLUMNS:
+                dtype = np.dtype(dtype)
+                data = f.read(rows * dtype.itemsize)
+                if len(data) < rows * dtype.itemsize:
+                    # Truncated by a crash mid-write; earlier blocks are intact.
+                    return
+                values = np.frombuffer(data, dtype=dtype)
+                if name in STRING_COLUMNS:
+                    values = np.asarray(metadata["strings"][name], dtype=object)[values]
+                columns[name] = values
+            yield metadata["session"], columns
+
+
+# ======== Session log ========
+class SessionLog:
+    """Appends gesture rows to a CSV (and optionally a columnar) log with rotation."""
+    def __init__(self, path, session_id, max_bytes=20 * 1024 * 1024, max_age=0, keep=20, binary=False):
+        self.path = path
+        self.session_id = session_id
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.keep = keep
+        self.binary_path = os.path.splitext(path)[0] + ".gcol" if binary else None
+        self.pending = []
+        self.opened_at = time.time()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._start_csv()
+        if self.binary_path is not None:
+            self._start_binary()
+
+    def _start_csv(self):
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, newline="") as f:
+                reader = csv.reader(f)
+                header = next(reader, None)
+                first = next(reader, None)
+            if header == CSV_HEADER:
+                if first:
+                    # Age counts from the file's first row, across restarts.
+                    self.opened_at = time.mktime(time.strptime(first[0], TIMESTAMP_FORMAT))
+                return
+            # Older layout: archive it rather than mixing columns.
+            self.rotate()
+            return
+        with open(self.path, mode="w", newline="") as f:
+            csv.writer(f).writerow(CSV_HEADER)
+
+    def _start_binary(self):
+        if os.path.exists(self.binary_path) and os.path.getsize(self.binary_path) >= FILE_HEADER.size:
+            return
+        with open(self.binary_path, "wb") as f:
+            f.write(FILE_HEADER.pack(MAGIC, FORMAT_VERSION))
+
+    def write(self, rows):
+        """Appends rows (tuples in COLUMNS order) and rotates when due."""
+        if not rows:
+            return
+        with open(self.path, mode="a", newline="") as f:
+            writer = csv.writer(f)
+            for row in rows:
+                writer.writerow(format_row(row, self.session_id))
+        if self.binary_path is not None:
+            with open(self.binary_path, "ab") as f:
+                f.write(encode_block(rows, self.session_id))
+        if self._rotation_due():
+            self.rotate()
+
+    def _rotation_due(self):
+        if self.max_bytes and os.path.getsize(self.path) >= self.max_bytes:
+            return True
+        return bool(self.max_age) and time.time() - self.opened_at >= self.max_age
+
+    def rotate(self):
+        """Moves the current files aside, compresses them in the background and starts new ones."""
+        # Millisecond stamps keep rotations within one second in order.
+        now = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"{int(now * 1000) % 1000:03d}"
+        for path in (self.path, self.binary_path):
+            if path is None or not os.path.exists(path):
+                continue
+            root, ext = os.path.splitext(path)
+            target = f"{root}.{stamp}{ext}"
+            suffix = 1
+            while os.path.exists(target) or os.path.exists(target + ".gz"):
+                suffix += 1
+                target = f"{root}.{stamp}-{suffix}{ext}"
+            os.replace(path, target)
+            self.pending.append(compressor.submit(compress_and_prune, target, self.keep))
+        self.pending = [future for future in self.pending if not future.done()]
+        self.opened_at = time.time()
+        with open(self.path, mode="w", newline="") as f:
+            csv.writer(f).writerow(CSV_HEADER)
+        if self.binary_path is not None:
+            self._start_binary()
+
+    def close(self):
+        """Waits for background compression of this log's rotated files."""
+        for future in self.pending:
+            future.result()
+        self.pending.clear()
+
+
+def rotated_files(path):
+    """Rotated (and compressed) siblings of `path`, oldest first."""
+    root, ext = os.path.splitext(path)
+    # Timestamped names sort chronologically.
+    return sorted(glob.glob(f"{glob.escape(root)}.[0-9]*{ext}*"))
+
+
+def compress_and_prune(path, keep):
+    temporary = path + ".gz.tmp"
+    with open(path, "rb") as source, gzip.open(temporary, "wb") as target:
+        shutil.copyfileobj(source, target)
+    os.replace(temporary, path + ".gz")
+    os.remove(path)
+    if keep:
+        root, ext = os.path.splitext(path)
+        current = root.rsplit(".", 1)[0] + ext
+        for old in [name for name in rotated_files(current) if name.endswith(".gz")][:-keep]:
+            os.remove(old)
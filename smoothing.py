@@ -0,0 +1,97 @@
+"""Smoothing filters for thumb-index distance signals."""
+import math
+from collections import deque
+
+
+class AdvancedSmoothFilter:
+    """Adaptive exponential smoothing.
+
+    With `prediction_factor` > 0 the output leads the filtered value by that
+    many frames of velocity. The controller leaves it at 0 and compensates
+    for the measured pipeline latency instead (latency_compensation.py).
+    """
+    def __init__(self, alpha=0.3, responsiveness=0.7, min_alpha=0.1, max_alpha=0.6, prediction_factor=0.0):
+        self.value = None
+        self.base_alpha = alpha
+        self.responsiveness = responsiveness
+        self.prediction_factor = prediction_factor
+        self.min_alpha = min_alpha
+        self.max_alpha = max_alpha
+        self.velocity = 0
+        self.acceleration = 0
+        self.last_values = deque(maxlen=3)
+    
+    def update(self, new_value):
+        if self.value is None:
+            self.value = new_value
+            self.last_values.append(new_value)
+            return new_value
+        
+        old_velocity = self.velocity
+        self.velocity = new_value - self.value
+        self.acceleration = self.velocity - old_velocity
+        
+        diff = abs(new_value - self.value)
+        direction = 1 if new_value > self.value else -1
+        
+        adjusted_alpha = max(self.min_alpha, 
+                            min(self.max_alpha, 
+                                self.base_alpha - diff * self.responsiveness * direction))
+        
+        filtered_value = adjusted_alpha * new_value + (1 - adjusted_alpha) * self.value
+        
+        self.value = filtered_value
+        self.last_values.append(filtered_value)
+        if not self.prediction_factor:
+            return filtered_value
+        
+        predicted_value = filtered_value + self.velocity * self.prediction_factor + self.acceleration * 0.15
+        
+        max_deviation = 0.12
+        if abs(predicted_value - filtered_value) > max_deviation:
+            direction = 1 if predicted_value > filtered_value else -1
+            predicted_value = filtered_value + (direction * max_deviation)
+        return predicted_value
+
+
+class ExponentialFilter:
+    """Plain exponential smoothing with a fixed alpha."""
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.value = None
+
+    def update(self, new_value):
+        if self.value is None:
+            self.value = new_value
+        else:
+            self.value += self.alpha * (new_value - self.value)
+        return self.value
+
+
+class OneEuroFilter:
+    """1€ filter (Casiez et al.): the cutoff rises with speed, so slow
+    movements are smoothed hard and fast ones pass with little lag.
+
+    Assumes a steady update rate of `rate` per second.
+    """
+    def __init__(self, rate=30.0, min_cutoff=1.5, beta=10.0, d_cutoff=1.0):
+        self.rate = rate
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.value = None
+        self.derivative = 0.0
+
+    def _alpha(self, cutoff):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau * self.rate)
+
+    def update(self, new_value):
+        if self.value is None:
+            self.value = new_value
+            return new_value
+        derivative = (new_value - self.value) * self.rate
+        self.derivative += self._alpha(self.d_cutoff) * (derivative - self.derivative)
+        cutoff = self.min_cutoff + self.beta * abs(self.derivative)
+        self.value += self._alpha(cutoff) * (new_value - self.value)
+        return self.value
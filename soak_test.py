@@ -0,0 +1,286 @@
+"""Soak test: the controller pipeline for hours, with resource trend checks.
+
+Replays a landmark recording (or a synthetic gesture workout) in a loop
+through the full frame path - hand tracking, gesture logic, the command
+executor, the session log with rotation, the browser monitor - against
+`mock_player.FakeDriver`, faster than real time. Every --sample-interval
+seconds it records:
+
+    rss_mb, threads, fds            process resources
+    result_queue, command_queue,    queue depths (summed over sessions); command_queue
+    state_inbox, log_buffer         counts browser commands queued or running
+    log_mb                          gesture logs on disk, rotated files included
+    gc_objects, gc_garbage          objects tracked by the GC, uncollectable garbage
+    gc_collections                  collections so far, reported only
+
+After --warmup of the run, a metric fails when its fitted growth over the
+rest of the run exceeds its limit in TREND_LIMITS and the median of the last
+third is above the median of the first third by at least half of it, so one
+spike does not fail the run. Exits 1 on failure; the samples can be written
+to CSV for plotting.
+
+    python soak_test.py --duration 600 --speed 20
+    python soak_test.py --duration 14400 --replay kiosk.hlrec --sessions 2 --samples soak.csv
+"""
+import argparse
+import contextlib
+import csv
+import gc
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from landmark_recording import LandmarkRecorder, open_recording
+from mock_player import FakeDriver, MockPlayer
+
+try:
+    import psutil
+    psutil_available = True
+except ImportError:
+    psutil_available = False
+
+# Allowed growth over the measured part of the run.
+TREND_LIMITS = {
+    "rss_mb": 16.0,
+    "threads": 2,
+    "fds": 4,
+    "result_queue": 1,
+    "command_queue": 8,
+    "state_inbox": 8,
+    "log_buffer": 100,
+    "log_mb": 2.0,
+    "gc_objects": 20000,
+    "gc_garbage": 0,
+}
+METRICS = ("rss_mb", "threads", "fds", "result_queue", "command_queue", "state_inbox", "log_buffer",
+           "log_mb", "gc_objects", "gc_garbage", "gc_collections")
+
+
+# ======== Source ========
+def synthetic_recording(path, seconds=60.0, fps=30.0, frame_size=(320, 240), seed=0):
+    """A looping workout: pinch sweeps with both hands, pause/play holds, both hands raised, no hands."""
+    rng = np.random.default_rng(seed)
+    base = (rng.random((21, 3)) * 0.1).astype(np.float32)
+    recorder = LandmarkRecorder(path, frame_size)
+    for i in range(int(seconds * fps)):
+        t = i / fps
+        phase = t % 20.0
+        hands = []
+        left = base + np.float32([0.2, 0.5, 0.0])
+        right = base + np.float32([0.7, 0.5, 0.0])
+        if phase < 6:
+            # Speed and volume sweeps
+            left_pinch = 0.12 + 0.08 * np.sin(t * 1.3)
+            right_pinch = 0.10 + 0.08 * np.sin(t * 0.9)
+        elif phase < 8:
+            left_pinch, right_pinch = 0.04, None   # pause hold
+        elif phase < 10:
+            left_pinch, right_pinch = 0.22, None   # play hold
+        elif phase < 12:
+            left_pinch, right_pinch = 0.12, 0.12   # next: both hands up
+        elif phase < 14:
+            left_pinch, right_pinch = None, None   # nobody there
+        else:
+            left_pinch, right_pinch = 0.12 + 0.03 * np.sin(t * 4), None
+        for side, points, pinch in (("left", left, left_pinch), ("right", right, right_pinch)):
+            if pinch is None:
+                continue
+            points = points + rng.normal(0.0, 0.002, points.shape).astype(np.float32)
+            points[8, 0] = points[4, 0] + pinch
+            points[8, 1] = points[4, 1]
+            hands.append((side, 0.85 + 0.1 * rng.random(), points))
+        recorder.write(t, hands)
+    recorder.close()
+    return path
+
+
+# ======== Sampling ========
+def process_resources():
+    """(RSS in MB, open file descriptors or handles); None where the platform does not say."""
+    if psutil_available:
+        process = psutil.Process()
+        fds = process.num_fds() if hasattr(process, "num_fds") else process.num_handles()
+        return process.memory_info().rss / 1e6, fds
+    rss = fds = None
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+        fds = len(os.listdir("/proc/self/fd"))
+    except OSError:
+        pass
+    return rss, fds
+
+
+def directory_mb(path):
+    total = 0
+    for name in os.listdir(path):
+        try:
+            total += os.path.getsize(os.path.join(path, name))
+        except OSError:
+            pass
+    return total / 1e6
+
+
+def sample(sessions, log_dir):
+    import youtube_controlv1 as controller
+
+    rss, fds = process_resources()
+    return {
+        "rss_mb": rss,
+        "threads": threading.active_count(),
+        "fds": fds,
+        "result_queue": sum(session.result_queue.qsize() for session in sessions),
+        "command_queue": controller.command_executor.pending,
+        "state_inbox": sum(session.store.inbox.qsize() for session in sessions),
+        "log_buffer": sum(len(session.log_buffer) for session in sessions),
+        "log_mb": directory_mb(log_dir),
+        "gc_objects": len(gc.get_objects()),
+        "gc_garbage": len(gc.garbage),
+        "gc_collections": sum(stats["collections"] for stats in gc.get_stats()),
+    }
+
+
+# ======== Trend check ========
+def check_trends(samples, warmup=0.2, limits=None):
+    """{metric: (growth, limit, failed)} over the samples after `warmup` (fraction of the run)."""
+    limits = TREND_LIMITS if limits is None else limits
+    start = int(len(samples) * warmup)
+    window = samples[start:]
+    results = {}
+    if len(window) < 6:
+        return results
+    times = np.array([row["elapsed"] for row in window])
+    third = len(window) // 3
+    for name, limit in limits.items():
+        values = np.array([row[name] for row in window], dtype=float)
+        if np.isnan(values).any():
+            continue
+        slope = np.polyfit(times, values, 1)[0] if np.ptp(times) > 0 else 0.0
+        growth = float(slope * (times[-1] - times[0]))
+        step = float(np.median(values[-third:]) - np.median(values[:third]))
+        failed = growth > limit and step >= limit / 2
+        results[name] = (round(growth, 3), limit, failed)
+    return results
+
+
+def run_soak(duration, recording, sessions_count=1, speed=10.0, sample_interval=5.0, warmup=0.2,
+             driver_latency=0.005, health_interval=1.0, log_max_bytes=256 * 1024, log_dir=None,
+             samples_path=None, verbose=False):
+    import youtube_controlv1 as controller
+
+    log_dir = log_dir or tempfile.mkdtemp(prefix="soak-")
+    sessions = []
+    for i in range(sessions_count):
+        session = controller.ControllerSession(index=i, video_url=f"mock://video/{i}")
+        session.log_file = os.path.join(log_dir, f"gesture_log_{i}.csv")
+        controller.init_gesture_log(session, max_bytes=log_max_bytes, keep=3)
+        session.driver = FakeDriver(MockPlayer(history=1000), latency=driver_latency, jitter=driver_latency / 2, seed=i)
+        session.driver.get(session.video_url)
+        session.backend = controller.SeleniumBackend(session)
+        session.selenium_active = True
+        session.store.publish()
+        session.monitor = controller.BrowserMonitor(session, health_interval).start()
+        sessions.append(session)
+
+    stop = threading.Event()
+    samples = []
+    output = open(os.devnull, "w") if not verbose else None
+    with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+        feeders = [threading.Thread(target=controller.replay_reader, args=(session, recording, speed, True, stop),
+                                    name=f"soak-feed-{session.index}", daemon=True) for session in sessions]
+        start = time.time()
+        for thread in feeders:
+            thread.start()
+        try:
+            while True:
+                elapsed = time.time() - start
+                row = sample(sessions, log_dir)
+                row["elapsed"] = round(elapsed, 1)
+                samples.append(row)
+                print(f"[{elapsed:7.0f}s] rss {row['rss_mb'] or 0:.1f} MB, threads {row['threads']}, "
+                      f"fds {row['fds']}, command queue {row['command_queue']}, log {row['log_mb']:.2f} MB",
+                      file=sys.__stdout__ if output else sys.stdout)
+                if elapsed >= duration:
+                    break
+                time.sleep(min(sample_interval, max(duration - elapsed, 0.01)))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop.set()
+            for thread in feeders:
+                thread.join(timeout=5.0)
+            # Let queued commands finish so the last state updates and log rows land.
+            while controller.command_executor.pending:
+                time.sleep(0.05)
+            time.sleep(max(driver_latency * 4, 0.05))
+            for session in sessions:
+                session.monitor.stop()
+                session.store.apply_pending()
+                controller.flush_gesture_log(session)
+                session.log.close()
+    if output:
+        output.close()
+
+    frames = sum(session.total_frames_processed for session in sessions)
+    if samples_path:
+        with open(samples_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=("elapsed",) + METRICS)
+            writer.writeheader()
+            writer.writerows(samples)
+    return {
+        "frames": frames,
+        "elapsed_s": samples[-1]["elapsed"] if samples else 0.0,
+        "samples": samples,
+        "trends": check_trends(samples, warmup),
+        "recoveries": sum(len(session.monitor.recoveries) for session in sessions),
+        "log_dir": log_dir,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the controller pipeline for a long time and check resource trends.")
+    parser.add_argument("--duration", type=float, default=600, help="Wall-clock seconds to run")
+    parser.add_argument("--replay", metavar="FILE", help="Landmark recording to loop (default: synthetic workout)")
+    parser.add_argument("--speed", type=float, default=10.0, help="Multiple of real time, 0 = as fast as possible")
+    parser.add_argument("--sessions", type=int, default=1, help="Sessions running side by side")
+    parser.add_argument("--sample-interval", type=float, default=5.0, help="Seconds between resource samples")
+    parser.add_argument("--warmup", type=float, default=0.2, help="Share of the run ignored by the trend check")
+    parser.add_argument("--driver-latency", type=float, default=0.005, help="Fake driver round trip in seconds")
+    parser.add_argument("--log-max-kb", type=float, default=256, help="Rotate the gesture logs at this size")
+    parser.add_argument("--log-dir", help="Where the gesture logs go (default: a temporary directory)")
+    parser.add_argument("--samples", metavar="FILE", help="Write the resource samples as CSV")
+    parser.add_argument("--verbose", action="store_true", help="Keep the controller's own output")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        recording = open_recording(args.replay)
+    else:
+        recording = open_recording(synthetic_recording(os.path.join(tempfile.mkdtemp(prefix="soak-"), "workout.hlrec")))
+    report = run_soak(args.duration, recording, args.sessions, args.speed, args.sample_interval, args.warmup,
+                      args.driver_latency, log_max_bytes=int(args.log_max_kb * 1024), log_dir=args.log_dir,
+                      samples_path=args.samples, verbose=args.verbose)
+
+    elapsed = max(report["elapsed_s"], 1e-9)
+    print(f"\nSoak: {report['frames']} frames in {elapsed:.0f}s ({report['frames'] / elapsed:.0f} frames/s), "
+          f"{report['recoveries']} browser recoveries, logs in {report['log_dir']}")
+    if not report["trends"]:
+        print("⚠️ Too few samples for a trend check; run longer or sample more often.")
+        return 1
+    failed = []
+    for name, (growth, limit, bad) in report["trends"].items():
+        print(f"  {'FAIL' if bad else 'ok  '} {name:14s} growth {growth:+.3f} (limit {limit})")
+        if bad:
+            failed.append(name)
+    if failed:
+        print(f"❌ Resource growth in: {', '.join(failed)}")
+        return 1
+    print("✅ No resource growth.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
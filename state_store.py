@@ -0,0 +1,64 @@
+"""Single-writer state for controller sessions.
+
+A session's playback and gesture state is owned by its frame path (frames of
+one session are processed one at a time). Other threads - browser commands on
+the command executor, DevTools event handlers - never assign to it. They
+`post` an update: a function plus arguments that the owner runs as
+`func(owner, *args)` at the start of its next frame. After each frame the
+owner publishes `snapshot`, an immutable namedtuple with a version number,
+which any thread may read without locking.
+
+Posting is a SimpleQueue put and publishing is one attribute store, so the
+frame path takes no locks.
+"""
+import queue
+from collections import namedtuple
+from types import MappingProxyType
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class StateStore:
+    def __init__(self, owner, fields):
+        self.owner = owner
+        self.fields = tuple(fields)
+        self.snapshot_type = namedtuple("StateSnapshot", ("version",) + self.fields)
+        self.inbox = queue.SimpleQueue()
+        self.version = 0
+        self.applied = 0
+        self.snapshot = self._capture()
+
+    def post(self, func, *args):
+        """Queue `func(owner, *args)` to run on the owning thread."""
+        self.inbox.put((func, args))
+
+    def apply_pending(self):
+        """Run queued updates; only the owner calls this. Returns how many ran."""
+        count = 0
+        while True:
+            try:
+                func, args = self.inbox.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(self.owner, *args)
+            except Exception as e:
+                print(f"State update {getattr(func, '__name__', func)} failed: {e}")
+            count += 1
+        self.applied += count
+        return count
+
+    def publish(self):
+        """Publish the owner's current state as a new snapshot."""
+        self.version += 1
+        self.snapshot = self._capture()
+        return self.snapshot
+
+    def _capture(self):
+        return self.snapshot_type(self.version, *(_freeze(getattr(self.owner, name)) for name in self.fields))
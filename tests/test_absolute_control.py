@@ -0,0 +1,103 @@
+"""Absolute speed/volume control: curve, hysteresis and coalesced emission."""
+import pytest
+
+from absolute_control import AbsoluteControl, CoalescingEmitter, ControlCurve, HysteresisQuantizer, parse_range
+
+
+def test_pending_target_settles_after_leaving_the_band():
+    control = AbsoluteControl([0.5, 1.0, 1.5, 2.0], ControlCurve.linear(0.09, 0.15), initial=0.5)
+    assert control.update(0.0, 0.15) == (2.0, None)
+    # Past the band the distance is ignored, but the pending target is still sent.
+    emitted = [control.settle(t / 30) for t in range(1, 60)]
+    assert [value for value in emitted if value is not None] == [2.0]
+
+
+def test_fast_sweep_out_of_the_band_reaches_the_player(tmp_path):
+    controller = pytest.importorskip("youtube_controlv1")
+    session = controller.ControllerSession(index=0)
+    session.log_file = str(tmp_path / "gesture_log.csv")
+    controller.init_gesture_log(session)
+    controller.configure_absolute_control(session, None, (0.03, 0.25))
+    assert session.speed_control.curve.points[0][0] == session.profile["threshold_close"]
+    t = 0.0
+    for i in range(8):  # 0.10 -> 0.17 in a quarter second
+        t += 1 / 30
+        controller.apply_absolute_speed(session, 0.10 + 0.01 * i, t, 30)
+    for _ in range(60):  # then held above the band for 2 s
+        t += 1 / 30
+        controller.apply_absolute_speed(session, 0.17, t, 30)
+    session.log.close()
+    # The last in-band target is sent rather than left pending at the starting speed.
+    assert session.current_speed == session.speed_control.emitter.pending
+    assert session.current_speed > 1.5
+
+
+def test_curve_interpolates_and_clamps():
+    curve = ControlCurve([(0.2, 1.0), (0.0, 0.0), (0.1, 0.8)])
+    assert curve(-1.0) == 0.0
+    assert curve(0.05) == pytest.approx(0.4)
+    assert curve(0.15) == pytest.approx(0.9)
+    assert curve(5.0) == 1.0
+    with pytest.raises(ValueError):
+        ControlCurve([(0.1, 0.0)])
+
+
+def test_quantizer_holds_level_inside_the_dead_band():
+    quantizer = HysteresisQuantizer([0, 1, 2, 3, 4], hysteresis=0.3, initial_index=2)
+    # One step is 0.25; leaving level 2 needs raw position beyond 2 +/- 0.8.
+    assert [quantizer(p) for p in (0.5, 0.6, 0.64, 0.36, 0.3)] == [2, 2, 2, 2, 2]
+    assert quantizer(0.71) == 3
+    assert quantizer(0.55) == 3
+    assert quantizer(0.1) == 0
+
+
+def test_emitter_sends_only_settled_targets_at_a_bounded_rate():
+    emitter = CoalescingEmitter(settle_time=0.15, min_interval=0.3, initial=1.0)
+    sent = []
+    targets = (1.25, 1.5, 1.75, 2.0) + (2.0,) * 10 + (1.5,) * 10
+    for i, target in enumerate(targets):
+        value = emitter.update(i / 20, target)
+        if value is not None:
+            sent.append((i / 20, value))
+    assert sent == [(0.3, 2.0), (0.85, 1.5)]
+    assert emitter.suppressed == 3
+    assert emitter.update(len(targets) / 20, 1.5) is None
+
+
+def test_emitter_waits_for_min_interval_after_last_send():
+    emitter = CoalescingEmitter(settle_time=0.0, min_interval=0.3, initial=0)
+    assert emitter.update(0.0, 1) == 1
+    assert emitter.update(0.1, 2) is None
+    assert emitter.update(0.2, 2) is None
+    assert emitter.update(0.3, 2) == 2
+
+
+def test_sweep_costs_one_command_and_is_deterministic():
+    def run():
+        control = AbsoluteControl([0.5, 0.75, 1.0, 1.25, 1.5, 1.75, 2.0], ControlCurve.linear(0.05, 0.2),
+                                  initial=1.0)
+        sent = []
+        for i in range(90):
+            t = i / 30
+            distance = 0.05 + 0.15 * min(1.0, i / 20) + 0.004 * ((-1) ** i)  # sweep up, then jitter
+            target, value = control.update(t, distance)
+            if value is not None:
+                sent.append(value)
+        return sent
+
+    assert run() == [2.0]
+    assert run() == run()
+
+
+def test_sync_adopts_externally_set_value():
+    control = AbsoluteControl([0.5, 1.0, 1.5, 2.0], ControlCurve.linear(0.0, 1.0), initial=0.5)
+    control.sync(1.5)
+    assert control.quantizer.index == 2
+    assert control.update(0.0, 0.68) == (1.5, None)
+    assert control.settle(1.0) is None
+
+
+def test_parse_range():
+    assert parse_range("0.03,0.25") == (0.03, 0.25)
+    with pytest.raises(ValueError):
+        parse_range("0.25,0.03")
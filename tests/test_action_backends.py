@@ -0,0 +1,87 @@
+"""MpvBackend against MpvStandIn over a Unix socket."""
+import os
+
+import pytest
+
+from action_backends import ActionBackendError, MpvBackend, MpvStandIn
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="the stand-in listens on a Unix socket")
+
+
+class ClosingStandIn(MpvStandIn):
+    """Reads the first request and closes the connection without replying, like an mpv that is quitting."""
+    def _serve(self, conn):
+        conn.recv(4096)
+        conn.close()
+
+
+@pytest.fixture
+def stand_in():
+    server = MpvStandIn().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def backend(stand_in):
+    client = MpvBackend(stand_in.path)
+    yield client
+    client.close()
+
+
+def test_set_speed_and_volume(backend, stand_in):
+    assert backend.set_speed(1.5)
+    assert backend.set_volume(0.4)
+    assert stand_in.properties["speed"] == 1.5
+    assert stand_in.properties["volume"] == pytest.approx(40.0)
+    state = backend.query_state()
+    assert (state.speed, state.volume, state.paused) == (1.5, pytest.approx(0.4), False)
+
+
+def test_toggle_pause_and_next_skip_events(backend, stand_in):
+    # Both commands make the stand-in send an event before the reply.
+    assert backend.toggle_pause() is True
+    assert backend.toggle_pause() is False
+    assert backend.next()
+    assert stand_in.properties["playlist-pos"] == 1
+    assert backend.alive()
+
+
+def test_rejected_command_raises(backend):
+    with pytest.raises(ActionBackendError):
+        backend.commands(("get_property", "no-such-property"))
+
+
+def test_closed_connection_raises():
+    server = ClosingStandIn().start()
+    client = MpvBackend(server.path)
+    try:
+        with pytest.raises(ActionBackendError):
+            client.query_state()
+        assert not client.alive()
+    finally:
+        client.close()
+        server.stop()
+
+
+def test_setup_mpv_reports_closed_connection(capsys):
+    controller = pytest.importorskip("youtube_controlv1")
+    server = ClosingStandIn().start()
+    session = controller.ControllerSession(index=0)
+    try:
+        assert controller.setup_mpv(session, server.path) is False
+    finally:
+        server.stop()
+    assert session.backend is None
+    assert "Could not connect to mpv" in capsys.readouterr().out
+
+
+def test_setup_mpv_syncs_player_state(stand_in):
+    controller = pytest.importorskip("youtube_controlv1")
+    stand_in.properties.update(speed=1.25, volume=60.0)
+    session = controller.ControllerSession(index=0)
+    try:
+        assert controller.setup_mpv(session, stand_in.path) is True
+        assert (session.player_speed, session.player_volume) == (1.25, pytest.approx(0.6))
+    finally:
+        session.backend.close()
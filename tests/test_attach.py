@@ -0,0 +1,94 @@
+"""--attach: picking the video tab of a running browser and taking it over."""
+import pytest
+
+controller = pytest.importorskip("youtube_controlv1")
+from devtools import DevToolsStandIn, list_page_targets  # noqa: E402
+from mock_player import FakeDriver  # noqa: E402
+
+TABS = [
+    {"id": "A", "type": "page", "url": "https://mail.example.com/", "webSocketDebuggerUrl": "ws://x/A"},
+    {"id": "B", "type": "page", "url": "https://www.youtube.com/watch?v=first&t=30", "webSocketDebuggerUrl": "ws://x/B"},
+    {"id": "C", "type": "page", "url": "https://www.youtube.com/watch?v=second", "webSocketDebuggerUrl": "ws://x/C"},
+    {"id": "D", "type": "page", "url": "https://www.youtube.com/feed/subscriptions", "webSocketDebuggerUrl": "ws://x/D"},
+]
+
+
+class AttachedDriver(FakeDriver):
+    """FakeDriver with the window switching attach_browser uses."""
+    def __init__(self, options=None, **kwargs):
+        super().__init__(latency=0, jitter=0)
+        self.options = options
+        self.windows = []
+        self.switch_to = self
+
+    def window(self, handle):
+        self.windows.append(handle)
+
+    def new_window(self, kind):
+        self.windows.append(f"new {kind}")
+
+
+@pytest.fixture
+def attach(monkeypatch):
+    opened = []
+    monkeypatch.setattr(controller.webdriver, "Chrome", AttachedDriver)
+    monkeypatch.setattr(controller, "list_page_targets", lambda address: TABS)
+    monkeypatch.setattr(controller, "open_video", lambda session, url: opened.append(url) or True)
+
+    def attach(url=None):
+        session = controller.ControllerSession(index=0)
+        session.attach_address = "127.0.0.1:9222"
+        assert controller.attach_browser(session, url)
+        return session, opened
+    return attach
+
+
+@pytest.mark.parametrize("url, expected", [
+    (None, "B"),
+    ("https://www.youtube.com/watch?v=second", "C"),
+    ("https://youtu.be/?v=first", "B"),
+    ("https://www.youtube.com/watch?v=missing", None),
+    ("https://www.youtube.com/feed/subscriptions", None),
+])
+def test_pick_video_tab(url, expected):
+    tab = controller.pick_video_tab(TABS, url)
+    assert (tab["id"] if tab else None) == expected
+
+
+def test_pick_video_tab_without_watch_pages():
+    assert controller.pick_video_tab(TABS[:1]) is None
+    assert controller.pick_video_tab([]) is None
+
+
+def test_attach_takes_over_the_matching_tab_without_reloading(attach):
+    session, opened = attach("https://www.youtube.com/watch?v=second")
+    driver = session.driver
+    assert driver.options.experimental_options["debuggerAddress"] == "127.0.0.1:9222"
+    assert driver.windows == ["C"]
+    assert session.page_target["id"] == "C"
+    assert session.video_url == TABS[2]["url"]
+    assert driver.current_url is None  # nothing navigated
+    assert opened == []
+
+
+def test_attach_opens_a_new_tab_without_a_match(attach):
+    session, opened = attach("https://www.youtube.com/watch?v=missing")
+    assert session.driver.windows == ["new tab"]
+    assert session.page_target is None
+    assert opened == ["https://www.youtube.com/watch?v=missing"]
+
+
+def test_attached_tab_is_the_devtools_target():
+    stand_in = DevToolsStandIn(url="https://www.youtube.com/watch?v=standin").start()
+    try:
+        tab = controller.pick_video_tab(list_page_targets(stand_in.address))
+        assert tab["webSocketDebuggerUrl"] == stand_in.ws_url
+        session = controller.ControllerSession(index=0)
+        session.driver = FakeDriver(latency=0, jitter=0)
+        session.driver.capabilities["goog:chromeOptions"] = {"debuggerAddress": stand_in.address}
+        session.page_target = tab
+        assert controller.connect_devtools(session)
+        assert session.devtools.ws_url == stand_in.ws_url
+        session.devtools.close()
+    finally:
+        stand_in.stop()
@@ -0,0 +1,103 @@
+"""Browser monitor recovery against the fake driver: re-inject, resync, restart."""
+import time
+
+import pytest
+
+controller = pytest.importorskip("youtube_controlv1")
+from mock_player import FakeDriver, MockPlayer  # noqa: E402
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def session(tmp_path):
+    session = controller.ControllerSession(index=0, video_url="mock://video/0")
+    session.log_file = str(tmp_path / "gesture_log.csv")
+    controller.init_gesture_log(session)
+    session.driver = FakeDriver(latency=0, jitter=0)
+    session.driver.get(session.video_url)
+    session.backend = controller.SeleniumBackend(session)
+    session.selenium_active = True
+    session.store.publish()
+    yield session
+    session.log.close()
+
+
+def test_reloaded_page_gets_the_controller_back(session):
+    monitor = controller.BrowserMonitor(session, interval=60)
+    monitor.check()
+    assert monitor.recoveries == []
+    session.driver.player.reload()
+    monitor.check()
+    assert session.driver.player.controller
+    assert [kind for kind, _ in monitor.recoveries] == ["Controller re-injected"]
+    monitor.check()
+    assert len(monitor.recoveries) == 1
+
+
+def test_navigation_resyncs_speed_and_volume(session):
+    monitor = controller.BrowserMonitor(session, interval=60)
+    monitor.check()
+    player = session.driver.player
+    player.speed, player.volume = 1.5, 0.4
+    player.key("N", shift=True)
+    monitor.check()
+    session.store.apply_pending()
+    assert (session.current_speed, session.current_volume) == (1.5, 0.4)
+    assert monitor.url == "mock://video/1"
+    assert monitor.recoveries == []
+
+
+def test_dead_browser_is_restarted_on_the_last_url(session):
+    reopened = []
+
+    def reopen(session, url):
+        reopened.append(url)
+        session.driver = FakeDriver(MockPlayer(), latency=0, jitter=0)
+        session.driver.get(url)
+        return True
+
+    monitor = controller.BrowserMonitor(session, interval=60, restart_after=3, reopen=reopen)
+    session.driver.player.key("N", shift=True)
+    monitor.check()
+    session.driver.crashed = True
+    monitor.check()
+    monitor.check()
+    assert reopened == []
+    monitor.check()
+    assert reopened == ["mock://video/1"]
+    assert [kind for kind, _ in monitor.recoveries] == ["Browser restarted"]
+    session.store.apply_pending()
+    assert session.selenium_active
+    assert monitor.failures == 0
+
+
+def test_failed_restart_waits_for_another_round_of_probes(session):
+    attempts = []
+    monitor = controller.BrowserMonitor(session, interval=60, restart_after=2,
+                                        reopen=lambda session, url: attempts.append(url) or False)
+    session.driver.crashed = True
+    for _ in range(4):
+        monitor.check()
+    assert len(attempts) == 2
+    assert monitor.recoveries == []
+    session.store.apply_pending()
+    assert not session.selenium_active
+
+
+def test_wake_checks_without_waiting_for_the_interval(session):
+    monitor = controller.BrowserMonitor(session, interval=60).start()
+    try:
+        session.driver.player.reload()
+        monitor.wake()
+        assert wait_for(lambda: monitor.recoveries)
+    finally:
+        monitor.stop()
+    assert not monitor.thread.is_alive()
@@ -0,0 +1,143 @@
+"""DevTools WebSocket client against the local stand-in (no browser)."""
+import json
+import socket
+import struct
+import time
+
+import pytest
+
+from devtools import (OP_CONTINUATION, OP_PING, OP_PONG, OP_TEXT, DevToolsError, DevToolsSession,
+                      DevToolsStandIn, WebSocket, encode_frame, find_page_target, read_frame)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+class ReorderingStandIn(DevToolsStandIn):
+    """Answers requests pairwise in reverse order; never answers Test.hang."""
+    def __init__(self):
+        super().__init__()
+        self.held = None
+
+    def handle(self, request):
+        if request.get("method") == "Test.hang":
+            return []
+        replies = super().handle(request)
+        if self.held is None:
+            self.held = replies
+            return []
+        held, self.held = self.held, None
+        return replies + held
+
+
+@pytest.fixture
+def stand_in():
+    server = DevToolsStandIn().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def session(stand_in):
+    client = DevToolsSession(find_page_target(stand_in.address), timeout=2.0)
+    yield client
+    client.close()
+
+
+# ======== Framing ========
+@pytest.mark.parametrize("length", [0, 125, 126, 65535, 70000])
+def test_masked_frame_round_trip(length):
+    payload = bytes(i % 251 for i in range(length))
+    frame = encode_frame(OP_TEXT, payload, mask=True)
+    assert frame[1] & 0x80
+    if length >= 16:
+        assert payload not in frame  # sent masked
+    a, b = socket.socketpair()
+    with a, b:
+        a.sendall(frame)
+        assert read_frame(b) == (True, OP_TEXT, payload)
+
+
+def test_unmasked_frame_from_server():
+    frame = encode_frame(OP_TEXT, b"hello", mask=False)
+    assert frame == bytes([0x81, 5]) + b"hello"
+
+
+def test_fragmented_message_with_ping_in_between():
+    a, b = socket.socketpair()
+    with a, b:
+        server, client = WebSocket(a, mask=False), WebSocket(b, mask=True)
+        first = encode_frame(OP_TEXT, b'{"id": 1, ', mask=False)
+        a.sendall(bytes([first[0] & 0x7F]) + first[1:])  # FIN cleared
+        a.sendall(encode_frame(OP_PING, b"p", mask=False))
+        a.sendall(encode_frame(OP_CONTINUATION, b'"result": {}}', mask=False))
+        assert json.loads(client.recv()) == {"id": 1, "result": {}}
+        # The client answered the ping with a masked pong.
+        fin, opcode, payload = read_frame(a)
+        assert (fin, opcode, payload) == (True, OP_PONG, b"p")
+        server.close()
+
+
+def test_extended_length_header():
+    frame = encode_frame(OP_TEXT, b"x" * 300, mask=False)
+    assert frame[1] == 126 and struct.unpack(">H", frame[2:4])[0] == 300
+
+
+# ======== Session ========
+def test_call_and_evaluate(session, stand_in):
+    assert session.evaluate("window.setYouTubeSpeed(1.5)") is True
+    assert stand_in.state["speed"] == 1.5
+    assert session.evaluate("document.querySelector('video').playbackRate") == 1.5
+    with pytest.raises(DevToolsError):
+        session.call("Bogus.method")
+
+
+def test_pipelined_replies_matched_by_id():
+    server = ReorderingStandIn().start()
+    client = DevToolsSession(find_page_target(server.address), timeout=2.0)
+    try:
+        futures = [client.evaluate_async(f"window.setYouTubeVolume({i / 10})") for i in range(10)]
+        futures += [client.evaluate_async("document.querySelector('video').volume")]
+        futures += [client.evaluate_async("window.setYouTubeVolume(0.3)")]
+        results = [future.result(2.0) for future in futures]
+        assert all(result["result"]["value"] is True for result in results[:10])
+        assert results[10]["result"]["value"] == pytest.approx(0.9)
+        assert server.state["volume"] == 0.3
+        assert not client.pending
+    finally:
+        client.close()
+        server.stop()
+
+
+def test_events_delivered_to_listeners(session, stand_in):
+    navigations, loads = [], []
+    session.on("Page.frameNavigated", lambda params: navigations.append(params["frame"]["url"]))
+    session.on("Page.loadEventFired", lambda params: loads.append(params))
+    session.call("Page.enable")
+    session.press_key("k").result(2.0)
+    session.press_key("n", shift=True).result(2.0)
+    assert wait_for(lambda: len(loads) == 1)
+    assert navigations == ["https://www.youtube.com/watch?v=standin1"]
+    assert stand_in.state["paused"] is True
+
+
+def test_connection_drop_fails_pending_and_later_commands():
+    server = ReorderingStandIn().start()
+    client = DevToolsSession(find_page_target(server.address), timeout=2.0)
+    try:
+        pending = client.send("Test.hang")
+        server.drop_connections()
+        with pytest.raises(DevToolsError):
+            pending.result(2.0)
+        assert wait_for(lambda: not client.connected)
+        with pytest.raises(DevToolsError):
+            client.call("Runtime.evaluate", {"expression": "1"}, timeout=2.0)
+    finally:
+        client.close()
+        server.stop()
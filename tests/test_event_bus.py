@@ -0,0 +1,153 @@
+"""Event publisher over local sockets: delivery, SUB filtering and slow subscribers."""
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from event_bus import EventPublisher, parse_event_address
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def publisher():
+    publisher = EventPublisher(("127.0.0.1", 0)).start()
+    yield publisher
+    publisher.stop()
+
+
+def subscribe(publisher, topics=None, receive_buffer=None):
+    count = len(publisher.subscribers)
+    family = socket.AF_UNIX if isinstance(publisher.address, str) else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    if receive_buffer:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+    sock.connect(publisher.address)
+    sock.settimeout(2.0)
+    assert wait_for(lambda: len(publisher.subscribers) == count + 1)
+    subscriber = publisher.subscribers[-1]
+    if topics is not None:
+        sock.sendall(f"SUB {' '.join(topics)}\n".encode())
+        wanted = set(topics) or None
+        assert wait_for(lambda: subscriber.topics == wanted)
+    return sock, sock.makefile("rb")
+
+
+def read_events(stream, count):
+    return [json.loads(stream.readline()) for _ in range(count)]
+
+
+def test_nothing_is_queued_without_subscribers(publisher):
+    assert publisher.publish("speed", 0, time.time(), value=1.25) is False
+    assert publisher.queue.empty()
+    assert publisher.summary() == "no subscribers connected"
+
+
+def test_events_arrive_in_order_as_json_lines(publisher):
+    sock, stream = subscribe(publisher)
+    for i in range(5):
+        assert publisher.publish("speed", 1, 100.0 + i, value=0.25 * i, confidence=0.9)
+    events = read_events(stream, 5)
+    assert [event["value"] for event in events] == [0.0, 0.25, 0.5, 0.75, 1.0]
+    assert events[0] == {"topic": "speed", "session": 1, "t": 100.0, "value": 0.0, "confidence": 0.9}
+    sock.close()
+
+
+def test_sub_filters_topics_per_subscriber(publisher):
+    all_sock, all_stream = subscribe(publisher)
+    gesture_sock, gesture_stream = subscribe(publisher, ["gesture", "hands"])
+    publisher.publish("speed", 0, 1.0, value=1.5)
+    publisher.publish("gesture", 0, 2.0, name="Pause", kind="fire")
+    publisher.publish("volume", 0, 3.0, value=0.5)
+    publisher.publish("hands", 0, 4.0, left=True, right=False)
+    assert [event["topic"] for event in read_events(all_stream, 4)] == ["speed", "gesture", "volume", "hands"]
+    assert [event["topic"] for event in read_events(gesture_stream, 2)] == ["gesture", "hands"]
+
+    # SUB alone subscribes to everything again.
+    subscribe_all = publisher.subscribers[1]
+    gesture_sock.sendall(b"SUB\n")
+    assert wait_for(lambda: subscribe_all.topics is None)
+    publisher.publish("volume", 0, 5.0, value=0.6)
+    assert read_events(gesture_stream, 1)[0]["topic"] == "volume"
+    all_sock.close()
+    gesture_sock.close()
+
+
+def test_slow_subscriber_loses_whole_events_without_delaying_others():
+    publisher = EventPublisher(("127.0.0.1", 0), max_backlog=16 * 1024).start()
+    try:
+        slow_sock, slow_stream = subscribe(publisher, receive_buffer=4096)
+        fast_sock, fast_stream = subscribe(publisher)
+        slow, fast = publisher.subscribers
+        # Keep the kernel from buffering megabytes on the slow reader's behalf.
+        slow.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        padding = "x" * 1000
+        received = []
+
+        def reader():
+            for _ in range(2000):
+                received.append(json.loads(fast_stream.readline())["seq"])
+
+        thread = threading.Thread(target=reader, daemon=True)
+        thread.start()
+        for seq in range(2000):
+            while not publisher.publish("gesture", 0, time.time(), seq=seq, padding=padding):
+                time.sleep(0.001)  # only if the sender's queue is full
+        thread.join(timeout=10.0)
+        assert received == list(range(2000))
+        assert slow.dropped > 0 and fast.dropped == 0
+        assert len(slow.backlog) <= publisher.max_backlog
+        assert "dropped" in publisher.summary()
+
+        # What the slow reader gets is whole events, in order, with gaps.
+        seen = []
+        slow_sock.settimeout(0.5)
+        try:
+            for line in slow_stream:
+                seen.append(json.loads(line)["seq"])
+        except socket.timeout:
+            pass
+        slow_sock.close()
+        assert seen and seen == sorted(seen)
+        assert len(seen) + slow.dropped <= 2000
+        fast_sock.close()
+    finally:
+        publisher.stop()
+
+
+def test_closed_subscriber_is_removed(publisher):
+    sock, stream = subscribe(publisher)
+    stream.close()
+    sock.close()
+    assert wait_for(lambda: not publisher.subscribers)
+
+
+def test_unix_socket_path_is_cleaned_up(tmp_path):
+    path = str(tmp_path / "events.sock")
+    publisher = EventPublisher(path).start()
+    try:
+        sock, stream = subscribe(publisher, ["speed"])
+        publisher.publish("speed", 0, 1.0, value=2.0)
+        assert read_events(stream, 1)[0]["value"] == 2.0
+        sock.close()
+    finally:
+        publisher.stop()
+    assert not (tmp_path / "events.sock").exists()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("127.0.0.1:8765", ("127.0.0.1", 8765)),
+    (":8765", ("127.0.0.1", 8765)),
+    ("/tmp/events.sock", "/tmp/events.sock"),
+])
+def test_parse_event_address(text, expected):
+    assert parse_event_address(text) == expected
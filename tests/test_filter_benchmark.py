@@ -0,0 +1,73 @@
+"""Filter benchmark metrics on signals with known lag, jitter and overshoot."""
+import json
+
+import numpy as np
+import pytest
+
+from filter_benchmark import (FILTERS, SETTLE_FRAMES, benchmark, cross_correlation_lag, main, overshoot,
+                              run_filter, settled, synthetic_traces)
+
+
+def sweep(n=600, shift=0.0):
+    t = np.arange(n) - shift
+    return 0.145 + 0.1 * np.sin(2 * np.pi * t / 90) + 0.03 * np.sin(2 * np.pi * t / 37)
+
+
+@pytest.mark.parametrize("shift", [0.0, 3.0, 2.5, -4.0])
+def test_lag_recovers_a_known_delay(shift):
+    reference = sweep()
+    output = sweep(shift=shift)
+    # Parabolic interpolation is good to a fraction of a frame.
+    assert cross_correlation_lag([output], [reference]) == pytest.approx(shift, abs=0.25)
+
+
+def test_lag_sums_correlation_over_traces():
+    references = [sweep(300), sweep(900)]
+    outputs = [sweep(300, shift=2.0), sweep(900, shift=2.0)]
+    assert cross_correlation_lag(outputs, references) == pytest.approx(2.0, abs=0.25)
+
+
+def test_settled_waits_after_movement():
+    reference = np.concatenate([np.full(20, 0.1), np.linspace(0.1, 0.2, 10), np.full(40, 0.2)])
+    still = settled(reference)
+    assert len(still) == len(reference) - 1
+    # Changes 20..28 move; each keeps the next SETTLE_FRAMES - 1 changes unsettled.
+    assert still[:20].all()
+    assert not still[20:28 + SETTLE_FRAMES].any()
+    assert still[28 + SETTLE_FRAMES:].all()
+
+
+def test_overshoot_measures_distance_outside_the_nearby_range():
+    reference = np.concatenate([np.full(30, 0.1), np.full(30, 0.2)])
+    output = reference.copy()
+    output[32] = 0.23   # past the top of the step
+    output[5] = 0.09    # below a hold
+    excess = overshoot(output, reference, window=5)
+    assert excess[32] == pytest.approx(0.03)
+    assert excess[5] == pytest.approx(0.01)
+    assert np.count_nonzero(excess) == 2
+
+
+def test_raw_filter_is_the_identity():
+    raw = np.array([0.1, 0.2, 0.15])
+    output = run_filter(None, raw)
+    assert output is not raw and np.array_equal(output, raw)
+
+
+def test_smoothing_trades_lag_for_jitter():
+    traces = synthetic_traces(seconds=20)
+    report = benchmark(traces, {name: FILTERS[name] for name in ("raw", "ema-0.3")})
+    raw, ema = report["raw"], report["ema-0.3"]
+    assert set(raw) == {"lag_ms", "jitter", "false_steps_per_min", "overshoot_p99", "overshoot_max", "cpu_ns"}
+    assert abs(raw["lag_ms"]) < 10
+    assert ema["lag_ms"] > 30
+    assert ema["jitter"] < raw["jitter"] / 2
+    assert ema["overshoot_max"] < raw["overshoot_max"]
+    assert raw["cpu_ns"] == 0.0 and ema["cpu_ns"] > 0
+
+
+def test_main_json_and_unknown_filters(capsys):
+    assert main(["--filters", "raw,ema-0.5", "--json"]) == 0
+    assert list(json.loads(capsys.readouterr().out)) == ["raw", "ema-0.5"]
+    with pytest.raises(SystemExit):
+        main(["--filters", "raw,kalman"])
@@ -0,0 +1,92 @@
+"""Skipping queued camera frames and dropping frames too old to use."""
+import time
+from collections import deque
+
+import pytest
+
+controller = pytest.importorskip("youtube_controlv1")
+cv2 = controller.cv2
+
+PERIOD = 1 / 30
+
+
+class QueuedCamera:
+    """VideoCapture stand-in: `ages` are frames already buffered, then live frames every `period`.
+
+    With `timestamps` the driver reports V4L2-style monotonic buffer times in
+    CAP_PROP_POS_MSEC, otherwise 0 like a backend without them.
+    """
+    def __init__(self, ages, period=PERIOD, timestamps=True, live=True):
+        now = time.monotonic()
+        self.queue = deque(now - age for age in ages)
+        self.period = period
+        self.timestamps = timestamps
+        self.live = live
+        self.last = None
+        self.grabs = 0
+
+    def grab(self):
+        self.grabs += 1
+        if self.queue:
+            self.last = self.queue.popleft()
+            return True
+        if not self.live:
+            return False
+        time.sleep(self.period)
+        self.last = time.monotonic()
+        return True
+
+    def get(self, prop):
+        assert prop == cv2.CAP_PROP_POS_MSEC
+        return self.last * 1000 if self.timestamps else 0.0
+
+
+def test_queued_stale_frames_are_skipped():
+    cap = QueuedCamera([0.3, 0.2, 0.1, 0.01])
+    ok, captured_at, skipped = controller.grab_newest(cap, PERIOD)
+    assert ok and skipped == 3
+    assert time.time() - captured_at == pytest.approx(0.01, abs=0.005)
+
+
+def test_without_driver_timestamps_queued_frames_count_as_stale():
+    cap = QueuedCamera([0.0, 0.0, 0.0], timestamps=False)
+    ok, captured_at, skipped = controller.grab_newest(cap, PERIOD)
+    # The three returned at once; the fourth grab waited for a new frame.
+    assert ok and skipped == 3 and cap.grabs == 4
+    assert time.time() - captured_at < PERIOD
+
+
+def test_skipping_is_bounded():
+    cap = QueuedCamera([1.0] * 20)
+    ok, _, skipped = controller.grab_newest(cap, PERIOD)
+    assert ok and skipped == controller.MAX_STALE_GRABS
+    assert cap.grabs == controller.MAX_STALE_GRABS + 1
+
+
+def test_failed_grab_reports_skipped_frames():
+    cap = QueuedCamera([0.5, 0.5], live=False)
+    assert controller.grab_newest(cap, PERIOD) == (False, None, 2)
+
+
+def test_stream_positions_are_not_timestamps():
+    cap = QueuedCamera([], timestamps=True)
+    cap.last = time.monotonic() + 10  # a stream position ahead of the clock
+    assert controller.driver_timestamp(cap) is None
+    cap.last = time.monotonic() - 5  # older than any buffered frame could be
+    assert controller.driver_timestamp(cap) is None
+    cap.last = time.monotonic() - 0.05
+    assert time.time() - controller.driver_timestamp(cap) == pytest.approx(0.05, abs=0.005)
+
+
+def test_fresh_frame_drops_frames_past_the_age_limit():
+    session = controller.ControllerSession(index=0)
+    session.max_frame_age = 0.2
+    now = time.time()
+    assert controller.fresh_frame(session, controller.CapturedFrame(None, now - 0.05))
+    assert not controller.fresh_frame(session, controller.CapturedFrame(None, now - 0.3))
+    assert session.stale_frames_dropped == 1
+    assert len(session.frame_ages) == 2
+    session.max_frame_age = 0  # disabled: only measured
+    assert controller.fresh_frame(session, controller.CapturedFrame(None, now - 5.0))
+    summary = controller.frame_age_summary(session)
+    assert summary["dropped"] == 1 and summary["p95_ms"] > 300
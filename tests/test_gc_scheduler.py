@@ -0,0 +1,94 @@
+"""GC pause measurement and deferred full collections."""
+import gc
+import time
+
+import pytest
+
+from gc_scheduler import DEFERRED_GEN2_THRESHOLD, GcScheduler
+
+
+@pytest.fixture
+def scheduler():
+    schedulers = []
+
+    def make(**kwargs):
+        schedulers.append(GcScheduler(**kwargs).enable())
+        return schedulers[-1]
+    yield make
+    # gc settings are process-wide: always put them back.
+    for scheduler in schedulers:
+        scheduler.disable()
+
+
+def overdue(scheduler, seconds):
+    scheduler.last_full = time.monotonic() - seconds
+
+
+def test_scheduled_mode_freezes_and_defers_full_collections(scheduler):
+    threshold = gc.get_threshold()
+    gc_scheduler = scheduler(scheduled=True)
+    assert gc.get_threshold() == threshold[:2] + (DEFERRED_GEN2_THRESHOLD,)
+    assert gc_scheduler.frozen == gc.get_freeze_count() > 0
+    gc_scheduler.disable()
+    assert gc.get_threshold() == threshold
+    assert gc.get_freeze_count() == 0
+    assert gc_scheduler._on_gc not in gc.callbacks
+
+
+def test_stats_mode_leaves_the_collector_alone(scheduler):
+    threshold = gc.get_threshold()
+    gc_scheduler = scheduler()
+    assert gc.get_threshold() == threshold and gc.get_freeze_count() == 0
+    overdue(gc_scheduler, 1000)
+    assert gc_scheduler.idle() is False
+
+
+def test_idle_waits_for_the_interval_and_a_gap_between_frames(scheduler):
+    gc_scheduler = scheduler(scheduled=True, full_interval=5.0, max_deferral=60.0)
+    overdue(gc_scheduler, 1.0)
+    assert gc_scheduler.idle() is False
+    overdue(gc_scheduler, 10.0)
+    with gc_scheduler.frame():
+        assert gc_scheduler.idle() is False  # a frame is in flight
+    before = gc_scheduler.pauses[2].count
+    assert gc_scheduler.idle() is True
+    assert (gc_scheduler.idle_collections, gc_scheduler.forced_collections) == (1, 0)
+    assert gc_scheduler.pauses[2].count == before + 1
+    assert gc_scheduler.idle() is False  # the interval starts again
+
+
+def test_collection_is_forced_after_max_deferral(scheduler):
+    gc_scheduler = scheduler(scheduled=True, full_interval=5.0, max_deferral=60.0)
+    overdue(gc_scheduler, 61.0)
+    with gc_scheduler.frame():
+        assert gc_scheduler.idle() is True
+    assert (gc_scheduler.idle_collections, gc_scheduler.forced_collections) == (0, 1)
+    assert "1 forced after 60s" in gc_scheduler.summary()
+
+
+def test_frames_are_split_by_whether_a_collection_ran(scheduler):
+    gc_scheduler = scheduler()
+    for i in range(10):
+        with gc_scheduler.frame():
+            if i % 5 == 0:
+                gc.collect(0)
+    assert gc_scheduler.frame_times.count == 10
+    assert gc_scheduler.gc_frames >= 2
+    assert gc_scheduler.clean_frame_times.count == 10 - gc_scheduler.gc_frames
+    assert gc_scheduler.pauses[0].count >= 2
+    summary = gc_scheduler.summary()
+    assert "gen0 pauses:" in summary and "frames: 10 |" in summary
+    assert f"{gc_scheduler.gc_frames} frames overlapped a collection" in summary
+
+
+def test_in_flight_count_survives_a_failing_frame(scheduler):
+    gc_scheduler = scheduler()
+    with pytest.raises(RuntimeError):
+        with gc_scheduler.frame():
+            raise RuntimeError("frame failed")
+    assert gc_scheduler.in_flight == 0
+    assert gc_scheduler.frame_times.count == 1
+
+
+def test_summary_without_measurements():
+    assert GcScheduler().summary() == "no frames or collections measured"
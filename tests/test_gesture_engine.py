@@ -0,0 +1,139 @@
+"""Offline features and hold confirmation on synthetic recordings."""
+import numpy as np
+import pytest
+
+from gesture_engine import compare_hold_modes, pinch_distances, recording_features, tracked_hands
+from hand_tracker import HandTracker
+from landmark_recording import LandmarkRecorder, open_recording
+from soak_test import synthetic_recording
+
+
+def flipped_copy(source, path, every=5):
+    """`source` with MediaPipe's labels flipped on every `every`-th frame.
+
+    Frames where a hand appears keep their label: a new track takes its role
+    from its first frame.
+    """
+    recording = open_recording(source)
+    recorder = LandmarkRecorder(path, recording.frame_size)
+    previous = 0
+    for i in range(len(recording)):
+        hands = recording.hands(i)
+        steady = len(hands) == previous
+        previous = len(hands)
+        if i % every == 0 and steady:
+            hands = [("left" if side == "right" else "right", score, points) for side, score, points in hands]
+        recorder.write(float(recording.timestamps[i]), hands)
+    recorder.close()
+    return path
+
+
+@pytest.fixture(scope="module")
+def recordings(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("recordings")
+    clean = synthetic_recording(str(directory / "clean.hlrec"), seconds=40.0)
+    return clean, flipped_copy(clean, str(directory / "flipped.hlrec"))
+
+
+def test_label_flips_do_not_move_features(recordings):
+    clean, flipped = (recording_features(open_recording(path), right_hand=True) for path in recordings)
+    raw_present, _ = open_recording(recordings[1]).hand_arrays("left")
+    # MediaPipe's raw labels put the left hand on the right on flipped frames...
+    assert (raw_present != clean["left_present"]).any()
+    # ...the tracker's voted roles do not.
+    for name in ("left_present", "right_present"):
+        assert np.array_equal(clean[name], flipped[name])
+    for name in ("left_distance_raw", "left_distance", "right_distance"):
+        assert np.allclose(clean[name], flipped[name], equal_nan=True)
+
+
+def tracked_hands_per_frame(recording):
+    """Reference for `tracked_hands`: every frame through HandTracker.update."""
+    tracker = HandTracker()
+    n = len(recording)
+    arrays = {side: (np.zeros(n, dtype=bool), np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan))
+              for side in ("left", "right")}
+    for i in range(n):
+        hands = recording.hands(i)
+        for (_, score, landmarks), track in zip(hands, tracker.update(float(recording.timestamps[i]), hands)):
+            present, scores, raw, smoothed = arrays[track.side]
+            present[i] = True
+            scores[i] = score
+            raw[i] = pinch_distances(landmarks[None], recording.frame_size)[0]
+            smoothed[i] = track.filter.update(float(raw[i]))
+    return arrays
+
+
+def wandering_recording(path, frames=3000, seed=0):
+    """Two hands drifting close together and crossing, with drifting label
+    confidence, label flips, jumps, dropouts and gaps."""
+    rng = np.random.default_rng(seed)
+    base = (rng.random((21, 3)) * 0.1).astype(np.float32)
+    positions = np.array([[0.4, 0.5], [0.5, 0.5]])
+    confidence = np.array([0.8, 0.8])
+    away = np.zeros(2, dtype=int)
+    recorder = LandmarkRecorder(path, (320, 240))
+    t = 0.0
+    for _ in range(frames):
+        t += 1 / 30 if rng.random() > 0.01 else 0.5
+        positions = np.clip(positions + rng.normal(0.0, 0.02, positions.shape), 0.3, 0.6)
+        positions[rng.random(2) < 0.01] = rng.random(2) * 0.9
+        confidence = np.clip(confidence + rng.normal(0.0, 0.05, 2), 0.0, 1.0)
+        away = np.where(rng.random(2) < 0.02, rng.integers(1, 30, 2), np.maximum(away - 1, 0))
+        hands = []
+        for slot, side in enumerate(("left", "right")):
+            if away[slot]:
+                continue
+            if rng.random() < 0.02:
+                side = "left" if side == "right" else "right"
+            points = base + np.float32([*positions[slot], 0.0])
+            hands.append((side, float(confidence[slot]), points))
+        if len(hands) == 2 and rng.random() < 0.02:
+            hands.reverse()
+        recorder.write(t, hands)
+    recorder.close()
+    return path
+
+
+@pytest.mark.parametrize("source", ["clean", "flipped", "wandering"])
+def test_steady_runs_match_a_per_frame_replay(recordings, tmp_path, source):
+    path = {"clean": recordings[0], "flipped": recordings[1]}.get(source)
+    recording = open_recording(path or wandering_recording(str(tmp_path / "wandering.hlrec")))
+    fast, reference = tracked_hands(recording), tracked_hands_per_frame(recording)
+    for side in ("left", "right"):
+        for ours, theirs in zip(fast[side], reference[side]):
+            assert np.array_equal(ours, theirs, equal_nan=True)
+
+
+def test_features_match_the_render_loop(recordings, tmp_path):
+    controller = pytest.importorskip("youtube_controlv1")
+    recording = open_recording(recordings[1])
+    features = recording_features(recording)
+
+    session = controller.ControllerSession(index=0)
+    session.log_file = str(tmp_path / "gesture_log.csv")
+    controller.init_gesture_log(session)
+    width, height = recording.frame_size
+    live = []
+    for i in range(len(recording)):
+        timestamp = float(recording.timestamps[i])
+        session.replay_time = timestamp
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        result = controller.build_processed_data(session, frame, recording.hands(i), 30, timestamp)
+        session.filtered_distance_history.clear()
+        controller.run_session_frame(session, result)
+        # The render loop appends the left track's smoothed distance when there is one.
+        live.append(session.filtered_distance_history[-1] if session.filtered_distance_history else np.nan)
+    live = np.array(live)
+    assert np.array_equal(~np.isnan(live), features["left_present"])
+    assert np.allclose(live, features["left_distance"], equal_nan=True)
+
+
+@pytest.mark.parametrize("bound", [0.1, 0.05, 0.01])
+def test_evidence_holds_its_false_trigger_bound(tmp_path, bound):
+    recording = open_recording(synthetic_recording(str(tmp_path / "workout.hlrec"), seconds=120.0))
+    features = recording_features(recording)
+    report = compare_hold_modes(np.asarray(recording.timestamps), features, false_trigger_bound=bound)
+    evidence = report["evidence"]
+    assert evidence["false_trigger_rate"] <= bound
+    assert evidence["fires"] == report["timer"]["fires"]
@@ -0,0 +1,74 @@
+"""Rule engine timer semantics, incremental and batch."""
+import numpy as np
+import pytest
+
+from gesture_engine import Feature, GestureEngine, GestureEvent, GestureRule, default_rules, evaluate_batch
+
+FPS = 10.0
+
+
+def run_incremental(rules, times, features):
+    engine = GestureEngine(rules)
+    events = []
+    for i, t in enumerate(times):
+        events.extend(engine.update(t, {name: values[i] for name, values in features.items()}))
+    return events
+
+
+def frames(pattern):
+    """Times and an `up` feature from a string like "..###.", one frame per character."""
+    times = np.arange(len(pattern)) / FPS
+    return times, {"up": np.array([c == "#" for c in pattern])}
+
+
+@pytest.mark.parametrize("evaluate", [run_incremental, evaluate_batch])
+def test_fire_restart_and_cancel(evaluate):
+    rule = GestureRule("Up", Feature("up"), hold=0.3)
+    times, features = frames(".#########.")
+    events = [(round(e.time, 3), e.kind, round(e.held, 3)) for e in evaluate([rule], times, features)]
+    # Holds from 0.1 and fires at 0.4; holds again from 0.5 and fires at 0.8;
+    # holds from 0.9 and is cancelled at 1.0.
+    assert events == [(0.4, "fire", 0.3), (0.8, "fire", 0.3), (1.0, "cancel", 0.1)]
+
+
+@pytest.mark.parametrize("evaluate", [run_incremental, evaluate_batch])
+def test_cooldown_is_shared_by_the_group(evaluate):
+    rules = [GestureRule("Pause", Feature("close"), 0.2, cooldown=1.0, group="pause"),
+             GestureRule("Play", Feature("open"), 0.2, cooldown=1.0, group="pause")]
+    times = np.arange(20) / FPS
+    close = times < 0.5
+    features = {"close": close, "open": ~close}
+    fired = [(e.name, round(e.time, 3)) for e in evaluate(rules, times, features) if e.kind == "fire"]
+    # Play has held long enough at 0.7 but waits for Pause's cooldown.
+    assert fired == [("Pause", 0.2), ("Play", 1.2)]
+
+
+def test_batch_matches_incremental_on_noisy_features():
+    rng = np.random.default_rng(3)
+    n = 3000
+    times = np.cumsum(rng.uniform(0.02, 0.05, n))
+    distance = np.clip(0.12 + np.cumsum(rng.normal(0, 0.01, n)) * 0.2, 0.0, 0.3)
+    distance[rng.random(n) < 0.02] = np.nan
+    features = {
+        "left_present": ~np.isnan(distance),
+        "right_present": rng.random(n) < 0.3,
+        "left_score": rng.uniform(0.5, 1.0, n),
+        "right_score": rng.uniform(0.5, 1.0, n),
+        "left_distance": distance,
+    }
+    for hold_mode in ("timer", "evidence"):
+        rules = default_rules(hold_mode=hold_mode)
+        batch = evaluate_batch(rules, times, features)
+        incremental = run_incremental(rules, times, features)
+        assert len(batch) > 10
+        assert [(e.name, e.kind) for e in batch] == [(e.name, e.kind) for e in incremental]
+        assert np.allclose([e.time for e in batch], [e.time for e in incremental])
+        assert np.allclose([e.held for e in batch], [e.held for e in incremental])
+
+
+def test_holding_reports_time_left():
+    engine = GestureEngine([GestureRule("Up", Feature("up"), hold=1.0)])
+    engine.update(0.0, {"up": True})
+    assert engine.holding(0.25) == [("Up", 0.75)]
+    assert engine.update(0.5, {"up": False}) == [GestureEvent(0.5, "Up", "cancel", 0.5)]
+    assert engine.holding(0.6) == []
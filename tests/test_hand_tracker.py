@@ -0,0 +1,133 @@
+"""Hand identities: matching by position, role votes, flips and conflicts."""
+import numpy as np
+import pytest
+
+from hand_tracker import HandTracker
+
+
+def hand(side, x, y=0.5, score=0.9):
+    points = np.zeros((21, 3))
+    points[:, 0] = x + np.linspace(-0.05, 0.05, 21)
+    points[:, 1] = y
+    return side, score, points
+
+
+class Predictor:
+    def __init__(self):
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+
+def test_ids_follow_positions_not_labels():
+    tracker = HandTracker()
+    left, right = tracker.update(0.0, [hand("left", 0.3), hand("right", 0.7)])
+    # Both hands drift and MediaPipe lists them in the other order.
+    tracks = tracker.update(0.03, [hand("right", 0.68), hand("left", 0.33)])
+    assert [track.id for track in tracks] == [right.id, left.id]
+    assert [track.side for track in tracks] == ["right", "left"]
+    assert left.frames == right.frames == 2
+
+
+def test_single_frame_flip_does_not_switch_roles():
+    tracker = HandTracker(make_predictor=Predictor)
+    left, right = tracker.update(0.0, [hand("left", 0.3), hand("right", 0.7)])
+    left.prev_distance = 0.1
+    tracker.update(0.03, [hand("right", 0.3), hand("left", 0.7)])  # labels swapped for one frame
+    tracks = tracker.update(0.06, [hand("left", 0.3), hand("right", 0.7)])
+    assert [track.side for track in tracks] == ["left", "right"]
+    assert tracker.label_flips == 2
+    assert tracker.role_switches == 0
+    assert left.prev_distance == 0.1 and left.predictor.resets == 0
+
+
+def test_sustained_opposite_labels_switch_the_role_and_reset_control():
+    tracker = HandTracker(vote_alpha=0.2, switch_margin=0.2, make_predictor=Predictor)
+    track, = tracker.update(0.0, [hand("left", 0.5, score=0.95)])
+    track.prev_distance = 0.1
+    frames = 0
+    while track.side == "left":
+        frames += 1
+        assert tracker.update(frames / 30, [hand("right", 0.5, score=0.95)]) == [track]
+    # p_right climbs 0.05 -> past 0.7 at 20% per frame.
+    assert frames == 6
+    assert tracker.role_switches == 1
+    assert track.prev_distance is None and track.predictor.resets == 1
+
+
+def test_lost_hand_comes_back_as_a_new_track():
+    tracker = HandTracker(max_missed=0.3)
+    first, = tracker.update(0.0, [hand("right", 0.5)])
+    assert tracker.update(0.2, [hand("right", 0.5)]) == [first]
+    back, = tracker.update(0.6, [hand("right", 0.5)])
+    assert back.id != first.id
+    assert tracker.tracks == [back]
+
+
+def test_jump_beyond_max_jump_starts_a_new_track():
+    tracker = HandTracker(max_jump=0.25)
+    first, = tracker.update(0.0, [hand("right", 0.2)])
+    second, = tracker.update(0.03, [hand("right", 0.6)])
+    assert second.id != first.id
+    assert len(tracker.tracks) == 2
+
+
+def test_two_hands_with_one_label_split_the_roles():
+    tracker = HandTracker()
+    a, b = tracker.update(0.0, [hand("right", 0.3, score=0.6), hand("right", 0.7, score=0.95)])
+    # The weaker vote gives way.
+    assert (a.side, b.side) == ("left", "right")
+    assert tracker.role_switches == 1
+
+
+def test_nearest_pair_wins_when_hands_are_close():
+    tracker = HandTracker(max_jump=0.25)
+    a, b = tracker.update(0.0, [hand("left", 0.40), hand("right", 0.55)])
+    # Both detections are within max_jump of both tracks; each goes to its nearest.
+    tracks = tracker.update(0.03, [hand("right", 0.57), hand("left", 0.42)])
+    assert tracks == [b, a]
+
+
+def test_advance_matches_update_on_steady_frames():
+    rng = np.random.default_rng(3)
+    n = 40
+    timestamps = np.arange(n) / 30
+    centroids = np.empty((n, 2, 2))
+    centroids[:, 0] = [0.3, 0.5] + np.cumsum(rng.normal(0, 0.005, (n, 2)), axis=0)
+    centroids[:, 1] = [0.7, 0.5] + np.cumsum(rng.normal(0, 0.005, (n, 2)), axis=0)
+    scores = rng.uniform(0.7, 1.0, (n, 2))
+    labels = np.tile([0, 1], (n, 1))
+    p_right = np.where(labels == 1, scores, 1 - scores)
+    frames = [[hand(side, *centroids[i, slot], score=scores[i, slot])
+               for slot, side in enumerate(("left", "right"))] for i in range(n)]
+
+    steady = HandTracker().steady_frames(timestamps, np.full(n, 2), labels, centroids, p_right)
+    assert not steady[0] and steady[1:].all()
+
+    reference = HandTracker()
+    for i in range(n):
+        expected = reference.update(timestamps[i], frames[i])
+    tracker = HandTracker()
+    tracks = tracker.update(timestamps[0], frames[0])
+    assert tracker.settled(tracks, frames[0])
+    tracker.advance(tracks, timestamps[1:], centroids[1:], p_right[1:])
+    for track, want in zip(tracks, expected):
+        assert track.p_right == pytest.approx(want.p_right)
+        assert track.centroid == pytest.approx(want.centroid)
+        assert (track.side, track.frames, track.last_seen) == (want.side, want.frames, want.last_seen)
+
+
+def test_steady_frames_stop_at_changes():
+    tracker = HandTracker(max_jump=0.25, max_missed=0.3)
+    timestamps = np.array([0.0, 0.03, 0.06, 0.5, 0.53, 0.56, 0.59])
+    counts = np.array([2, 2, 1, 1, 1, 1, 1])
+    labels = np.array([[0, 1], [0, 1], [0, 0], [0, 0], [0, 0], [1, 0], [1, 0]])
+    centroids = np.tile([[0.3, 0.5], [0.7, 0.5]], (7, 1, 1))
+    centroids[4, 0] = [0.6, 0.5]  # jump
+    p_right = np.full((7, 2), 0.1)
+    p_right[:, 1] = 0.9
+    p_right[5:, 0] = 0.9
+    steady = tracker.steady_frames(timestamps, counts, labels, centroids, p_right)
+    # count change, gap, jump, label change, then steady again
+    assert steady.tolist() == [False, True, False, False, False, False, True]
@@ -0,0 +1,36 @@
+"""HUD sprites: cached by content, evicted least recently used, same pixels as OpenCV."""
+import cv2
+import numpy as np
+import pytest
+
+controller = pytest.importorskip("youtube_controlv1")
+
+
+def test_sprites_are_evicted_least_recently_used():
+    hud = controller.HudRenderer(max_sprites=2)
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    hud.draw_label(frame, "0.5x", (40, 40))
+    hud.draw_label(frame, "1.0x", (40, 40))
+    hud.draw_label(frame, "0.5x", (40, 40))  # hit; "1.0x" is now the oldest
+    hud.draw_label(frame, "1.5x", (40, 40))
+    keys = [key[1] for key in hud.sprites]
+    assert keys == ["0.5x", "1.5x"]
+    assert (hud.hits, hud.misses) == (1, 3)
+
+
+def test_cached_text_matches_put_text():
+    hud = controller.HudRenderer()
+    expected = np.zeros((60, 200, 3), dtype=np.uint8)
+    cv2.putText(expected, "Volume: 40%", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+    for _ in range(2):  # rendered, then blitted from the cache
+        frame = np.zeros_like(expected)
+        hud.draw_text(frame, "Volume: 40%", (10, 30), 0.5, (0, 255, 0), 1)
+        assert np.array_equal(frame, expected)
+
+
+def test_sprites_are_clipped_at_the_frame_edge():
+    hud = controller.HudRenderer()
+    frame = np.zeros((20, 20, 3), dtype=np.uint8)
+    hud.draw_bar(frame, 15, 15, 10, 10, 0.5, (0, 0, 255))
+    assert (frame[15:, 15:] != 0).all(axis=-1).all()
+    assert not frame[:15].any() and not frame[:, :15].any()
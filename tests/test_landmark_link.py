@@ -0,0 +1,102 @@
+"""Landmark link over localhost: ordering, loss, duplicates and sender restarts."""
+import socket
+import time
+
+import numpy as np
+import pytest
+
+from landmark_link import LandmarkReceiver, LandmarkSender, encode_packet
+
+HAND = [("left", 0.9, np.zeros((21, 3), dtype=np.float32))]
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def link(request):
+    """(receiver, delivered packets, raw UDP socket aimed at the receiver)."""
+    delivered = []
+    max_delay = getattr(request, "param", 0.0)
+    receiver = LandmarkReceiver(("127.0.0.1", 0), lambda packet, latency: delivered.append(packet),
+                                max_delay=max_delay).start()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    yield receiver, delivered, sock
+    sock.close()
+    receiver.stop()
+
+
+def send_raw(sock, receiver, seqs, epoch=7):
+    for seq in seqs:
+        sock.sendto(encode_packet(seq, time.time(), HAND, epoch=epoch), receiver.address)
+        time.sleep(0.002)
+
+
+def test_delivers_in_order(link):
+    receiver, delivered, _ = link
+    sender = LandmarkSender(receiver.address)
+    for _ in range(50):
+        sender.send(HAND, frame_size=(320, 240))
+    sender.close()
+    assert wait_for(lambda: len(delivered) == 50)
+    assert [packet.seq for packet in delivered] == list(range(50))
+    assert delivered[0].frame_size == (320, 240)
+    assert delivered[0].hands[0][0] == "left"
+    stats = receiver.stats[0].summary()
+    assert stats["lost"] == 0 and stats["duplicates"] == 0
+
+
+@pytest.mark.parametrize("link", [0.5], indirect=True)
+def test_reorders_within_delay(link):
+    receiver, delivered, sock = link
+    send_raw(sock, receiver, [0, 2, 1, 4, 3])
+    assert wait_for(lambda: len(delivered) == 5)
+    assert [packet.seq for packet in delivered] == [0, 1, 2, 3, 4]
+    assert receiver.stats[0].lost == 0
+
+
+@pytest.mark.parametrize("link", [0.1], indirect=True)
+def test_counts_loss_then_late_packet(link):
+    receiver, delivered, sock = link
+    send_raw(sock, receiver, [0, 1, 3, 4])
+    assert wait_for(lambda: len(delivered) == 4)
+    assert [packet.seq for packet in delivered] == [0, 1, 3, 4]
+    assert receiver.stats[0].lost == 1
+    send_raw(sock, receiver, [2])
+    assert wait_for(lambda: receiver.stats[0].late == 1)
+    assert receiver.stats[0].lost == 0
+    assert len(delivered) == 4
+
+
+def test_drops_duplicates(link):
+    receiver, delivered, sock = link
+    send_raw(sock, receiver, [0, 1, 1, 2])
+    assert wait_for(lambda: receiver.stats[0].received == 4)
+    assert [packet.seq for packet in delivered] == [0, 1, 2]
+    assert receiver.stats[0].duplicates == 1
+
+
+def test_sender_restart_early(link):
+    # A node restarting within its first frames starts over at seq 0, far
+    # less than RESTART_DISTANCE behind; its new epoch must reset the buffer.
+    receiver, delivered, _ = link
+    first = LandmarkSender(receiver.address)
+    for _ in range(200):
+        first.send(HAND)
+    first.close()
+    assert wait_for(lambda: len(delivered) == 200)
+    second = LandmarkSender(receiver.address)
+    for _ in range(50):
+        second.send(HAND)
+    second.close()
+    assert wait_for(lambda: len(delivered) == 250)
+    assert [packet.seq for packet in delivered[200:]] == list(range(50))
+    stats = receiver.stats[0]
+    assert stats.restarts == 1
+    assert stats.duplicates == 0
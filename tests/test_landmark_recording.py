@@ -0,0 +1,67 @@
+"""hlrec files: write, memory-map, read back."""
+import os
+
+import numpy as np
+import pytest
+
+from landmark_recording import HEADER, RECORD_DTYPE, LandmarkRecorder, open_recording
+
+
+def hand(seed):
+    return np.random.default_rng(seed).random((21, 3)).astype(np.float32)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "session.hlrec")
+    frames = [
+        (10.0, []),
+        (10.033, [("left", 0.9, hand(1))]),
+        (10.066, [("right", 0.8, hand(2)), ("left", 0.7, hand(3))]),
+    ]
+    recorder = LandmarkRecorder(path, (640, 480), block_size=2)
+    for timestamp, hands in frames:
+        recorder.write(timestamp, hands)
+    recorder.close()
+
+    recording = open_recording(path)
+    assert len(recording) == 3 and recording.frame_size == (640, 480)
+    assert np.allclose(recording.timestamps, [t for t, _ in frames])
+    for i, (_, expected) in enumerate(frames):
+        hands = recording.hands(i)
+        assert [side for side, _, _ in hands] == [side for side, _, _ in expected]
+        for (_, score, points), (_, expected_score, expected_points) in zip(hands, expected):
+            assert score == pytest.approx(expected_score)
+            assert np.array_equal(points, expected_points)
+
+    present, landmarks = recording.hand_arrays("left")
+    assert present.tolist() == [False, True, True]
+    assert np.isnan(landmarks[0]).all() and np.array_equal(landmarks[2], hand(3))
+    assert np.allclose(recording.hand_scores("right"), [np.nan, np.nan, 0.8], equal_nan=True)
+
+
+def test_frame_size_from_the_first_frame(tmp_path):
+    path = str(tmp_path / "session.hlrec")
+    recorder = LandmarkRecorder(path)
+    recorder.write(1.0, [], frame_size=(320, 240))
+    recorder.write(2.0, [], frame_size=(640, 480))  # only the first frame's size is kept
+    recorder.close()
+    assert open_recording(path).frame_size == (320, 240)
+
+
+def test_partial_last_record_is_ignored(tmp_path):
+    path = str(tmp_path / "killed.hlrec")
+    recorder = LandmarkRecorder(path, (320, 240))
+    for i in range(3):
+        recorder.write(float(i), [("left", 0.9, hand(i))])
+    recorder.close()
+    with open(path, "ab") as f:
+        f.write(b"\0" * (RECORD_DTYPE.itemsize // 2))
+    assert len(open_recording(path)) == 3
+    assert os.path.getsize(path) > HEADER.size + 3 * RECORD_DTYPE.itemsize
+
+
+def test_not_a_recording(tmp_path):
+    path = tmp_path / "gesture_log.csv"
+    path.write_text("timestamp,gesture\n" * 10)
+    with pytest.raises(ValueError, match="not a landmark recording"):
+        open_recording(str(path))
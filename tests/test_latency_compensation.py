@@ -0,0 +1,78 @@
+"""Latency estimation and forward prediction."""
+import math
+import time
+
+import pytest
+
+from latency_compensation import CorrectionMeter, Extrapolator, LatencyEstimator
+
+
+def test_split_mode_pipeline_latency_uses_the_local_receive_time():
+    controller = pytest.importorskip("youtube_controlv1")
+    now = time.time()
+    # Received 50 ms ago after a 20 ms link: 70 ms from capture.
+    result = {'timestamp': now - 0.07, 'received_at': now - 0.05}
+    assert controller.pipeline_latency(result, result['timestamp']) == pytest.approx(0.07, abs=0.01)
+    # The node's clock runs 5 s ahead: its timestamp alone would give a negative
+    # latency, which the estimator drops; the local part is still measured.
+    result = {'timestamp': now + 5.0, 'received_at': now - 0.05}
+    assert controller.pipeline_latency(result, result['timestamp']) == pytest.approx(0.05, abs=0.01)
+    # Local frames are measured from their capture time.
+    assert controller.pipeline_latency({'timestamp': now - 0.03}, now - 0.03) == pytest.approx(0.03, abs=0.01)
+
+
+def test_extrapolator_projects_ramp_by_real_time():
+    extrapolator = Extrapolator(velocity_alpha=1.0, max_deviation=1.0)
+    # 0.5 units/s sampled at uneven intervals: the projection follows time, not frames.
+    for t in (0.0, 0.03, 0.05, 0.1, 0.12):
+        predicted = extrapolator.update(t, 0.5 * t, 0.1)
+    assert extrapolator.velocity == pytest.approx(0.5)
+    assert predicted == pytest.approx(0.5 * 0.12 + 0.05)
+
+
+def test_extrapolator_caps_horizon_and_deviation():
+    extrapolator = Extrapolator(velocity_alpha=1.0, max_horizon=0.2, max_deviation=1.0)
+    extrapolator.update(0.0, 0.0, 0.0)
+    assert extrapolator.update(0.1, 0.1, 5.0) == pytest.approx(0.1 + 1.0 * 0.2)
+    assert extrapolator.update(0.2, 0.2, -1.0) == pytest.approx(0.2)
+    extrapolator = Extrapolator(velocity_alpha=1.0, max_deviation=0.05)
+    extrapolator.update(0.0, 0.0, 0.0)
+    assert extrapolator.update(0.1, 0.1, 0.4) == pytest.approx(0.15)
+    assert extrapolator.update(0.2, 0.0, 0.4) == pytest.approx(-0.05)
+
+
+def test_extrapolator_restarts_after_gaps_and_missing_values():
+    extrapolator = Extrapolator(velocity_alpha=1.0, max_deviation=1.0, max_gap=0.25)
+    extrapolator.update(0.0, 0.0, 0.1)
+    extrapolator.update(0.1, 0.1, 0.1)
+    assert extrapolator.update(0.5, 0.9, 0.1) == 0.9  # gap: no velocity across it
+    assert extrapolator.update(0.6, None, 0.1) is None
+    assert extrapolator.last_t is None
+    assert math.isnan(extrapolator.update(0.7, float("nan"), 0.1))
+    assert extrapolator.update(0.8, 0.3, 0.1) == 0.3
+    assert extrapolator.velocity == 0.0
+
+
+def test_latency_estimator_averages_and_drops_bad_samples():
+    estimator = LatencyEstimator(alpha=0.5)
+    estimator.observe("inference", 0.02)
+    estimator.observe("inference", 0.04)
+    estimator.observe("inference", -1.0)
+    estimator.observe("command", float("inf"))
+    estimator.observe("command", 0.1)
+    assert estimator.stages == {"inference": pytest.approx(0.03), "command": pytest.approx(0.1)}
+    assert estimator.total() == pytest.approx(0.13)
+    assert estimator.summary() == {"inference": 30.0, "command": 100.0}
+
+
+def test_correction_meter_counts_overshoot_and_undershoot():
+    meter = CorrectionMeter(settle_gap=0.6, correction_window=2.0)
+    meter.record(0.0, 1.0, 1.25)
+    meter.record(0.2, 1.25, 1.5)   # same move
+    meter.record(0.5, 1.5, 1.25)   # back down quickly: overshoot
+    meter.record(1.5, 1.25, 1.0)   # further down after a pause: undershoot
+    meter.record(5.0, 1.0, 1.25)   # long after: a new move
+    meter.record(5.1, 1.25, 1.25)  # no change
+    summary = meter.summary()
+    assert (summary["moves"], summary["overshoots"], summary["undershoots"]) == (4, 1, 1)
+    assert summary["mean_overshoot"] == 0.25
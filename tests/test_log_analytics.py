@@ -0,0 +1,120 @@
+"""log_analytics.summarize on the repository's sample gesture_log.csv."""
+import csv
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from log_analytics import TIMESTAMP_FORMAT, summarize
+from session_log import SessionLog, read_blocks
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gesture_log.csv")
+
+
+def fixture_rows():
+    with open(FIXTURE, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture(scope="module")
+def report():
+    return summarize([FIXTURE])["all"]
+
+
+def test_row_count_and_range(report):
+    assert report["rows"] == 457
+    assert report["skipped_rows"] == 0
+    assert report["sessions"] == 0  # written before rows carried a session id
+    assert (report["first"], report["last"]) == ("2025-08-10 08:37:27", "2025-08-10 08:40:04")
+
+
+def test_per_gesture_success(report):
+    rows = fixture_rows()
+    names = sorted({row["Gesture"] for row in rows})
+    assert list(report["gestures"]) == names
+    for name in names:
+        stats = report["gestures"][name]
+        mine = [row for row in rows if row["Gesture"] == name]
+        success = sum(row["Success"] == "True" for row in mine)
+        assert (stats["rows"], stats["success"]) == (len(mine), success)
+        assert stats["success_rate"] == round(success / len(mine), 3)
+    assert report["gestures"]["Speed Up"]["rows"] == 130
+    assert report["gestures"]["Speed Up"]["success"] == 48
+
+
+def test_latency_percentiles_within_bin_error(report):
+    rows = fixture_rows()
+    for name, stats in report["gestures"].items():
+        latencies = np.array([float(row["Latency"]) for row in rows
+                              if row["Gesture"] == name and row["Success"] == "True" and float(row["Latency"])])
+        assert stats["latency_samples"] == len(latencies)
+        for q in (50, 95, 99):
+            exact = np.percentile(latencies, q, method="inverted_cdf") * 1000
+            # 50 bins per decade: bin centres are within about 2.3% of any value in the bin.
+            assert stats["latency_ms"][f"p{q}"] == pytest.approx(exact, rel=0.025, abs=0.01)
+
+
+def test_fps_bands(report):
+    fps = np.array([float(row["FPS"]) for row in fixture_rows()])
+    fps_report = report["fps"]
+    assert fps_report["samples"] == 457
+    assert fps_report["mean"] == round(fps.mean(), 1)
+    expected = {}
+    for value in fps:
+        lo = int(value // 10) * 10
+        expected[f"{lo}-{lo + 10}"] = expected.get(f"{lo}-{lo + 10}", 0) + 1
+    assert fps_report["bands"] == expected
+    assert fps_report["bands"] == {"40-50": 350, "50-60": 67, "60-70": 15, "70-80": 13, "80-90": 12}
+    assert fps_report["p50"] == np.percentile(fps, 50, method="inverted_cdf")
+
+
+def test_degraded_stretches(report):
+    rows = fixture_rows()
+    degraded_rows = sum(float(row["FPS"]) < 20 or float(row["Hand Detection Accuracy"]) < 0.5 for row in rows)
+    degraded = report["degraded"]
+    assert degraded["rows"] == degraded_rows == 111
+    assert degraded["stretches"] == 2
+    assert [(s["start"], s["end"], s["seconds"], s["rows"]) for s in degraded["longest"]] == [
+        ("2025-08-10 08:38:42", "2025-08-10 08:40:04", 82.0, 75),
+        ("2025-08-10 08:37:27", "2025-08-10 08:37:33", 6.0, 36),
+    ]
+
+
+def test_degraded_stretches_split_on_gaps():
+    # With a 1 s gap limit the long stretch breaks wherever rows are further apart.
+    report = summarize([FIXTURE], max_gap=1)["all"]
+    assert report["degraded"]["rows"] == 111
+    assert report["degraded"]["stretches"] > 2
+
+
+def test_columnar_round_trip(tmp_path, report):
+    rows = []
+    for row in fixture_rows():
+        rows.append((datetime.strptime(row["Timestamp"], TIMESTAMP_FORMAT).timestamp(), row["Gesture"],
+                     row["Success"] == "True", float(row["Latency"]), float(row["FPS"]), row["Action Status"],
+                     float(row["Selenium Latency"]), float(row["Hand Detection Accuracy"]),
+                     float(row["Frame Processing Rate"]), float(row["Distance Stability"]),
+                     float(row["Frame Processing Time"]), float(row["Gesture Success Rate"])))
+    log = SessionLog(str(tmp_path / "logs" / "gesture_log.csv"), "test-session", max_bytes=0, binary=True)
+    log.write(rows[:200])
+    log.write(rows[200:])
+    log.close()
+
+    blocks = list(read_blocks(log.binary_path))
+    assert [len(columns["Timestamp"]) for _, columns in blocks] == [200, 257]
+    assert {session for session, _ in blocks} == {"test-session"}
+    assert list(blocks[0][1]["Gesture"][:2]) == [rows[0][1], rows[1][1]]
+
+    for path in (log.binary_path, log.path):
+        copy = summarize([path])["all"]
+        assert copy["rows"] == 457 and copy["sessions"] == 1
+        assert (copy["first"], copy["last"]) == (report["first"], report["last"])
+        assert copy["fps"]["bands"] == report["fps"]["bands"]
+        assert copy["degraded"] == report["degraded"]
+        for name, stats in report["gestures"].items():
+            other = copy["gestures"][name]
+            assert (other["rows"], other["success"], other["latency_samples"]) == \
+                   (stats["rows"], stats["success"], stats["latency_samples"])
+            for q, value in stats["latency_ms"].items():
+                assert other["latency_ms"][q] == pytest.approx(value, rel=0.05)
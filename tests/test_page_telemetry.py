@@ -0,0 +1,58 @@
+"""In-page command telemetry: drained in seq order without skipping entries."""
+import inspect
+import json
+import re
+import shutil
+import subprocess
+
+import pytest
+
+controller = pytest.importorskip("youtube_controlv1")
+
+
+def drain_script():
+    source = inspect.getsource(controller.inject_controller_script)
+    match = re.search(r"window\.aiHandController\.drainTelemetry = function.*?\n\s*\};", source, re.S)
+    return match.group(0)
+
+
+def drain(entries, since_seq, now):
+    """Runs the page's drainTelemetry under node against `entries`."""
+    if shutil.which("node") is None:
+        pytest.skip("node is not installed")
+    script = (f"const performance = {{now: () => {now}, timeOrigin: 0}};\n"
+              f"const window = {{aiHandController: {{telemetry: {{entries: {json.dumps(entries)}}}}}}};\n"
+              f"{drain_script()}\n"
+              f"console.log(JSON.stringify(window.aiHandController.drainTelemetry({since_seq})));")
+    output = subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True).stdout
+    return json.loads(output)["entries"]
+
+
+def entry(seq, applied=None, event=None, superseded=False, received=0.0):
+    return {"seq": seq, "kind": "speed", "value": 1.0, "received": received, "applied": applied,
+            "event": event, "superseded": superseded}
+
+
+def test_drain_stops_at_the_first_unsettled_entry():
+    # Ring order, not seq order: 3 waits for its media event, 4 has settled.
+    entries = [entry(4, applied=900.0, event=905.0), entry(2, superseded=True),
+               entry(3, applied=800.0), entry(1, applied=100.0, event=101.0)]
+    assert [e["seq"] for e in drain(entries, 0, now=1000.0)] == [1, 2]
+    # Once 3 has waited long enough it settles, and 4 follows.
+    assert [e["seq"] for e in drain(entries, 2, now=1400.0)] == [3, 4]
+
+
+def test_unapplied_command_settles_eventually():
+    entries = [entry(1, received=0.0), entry(2, applied=10.0, event=11.0)]
+    assert drain(entries, 0, now=1000.0) == []
+    assert [e["seq"] for e in drain(entries, 0, now=6000.0)] == [1, 2]
+
+
+def test_recorded_entries_advance_the_high_water_mark():
+    session = controller.ControllerSession(index=0)
+    controller.record_page_telemetry(session, [entry(1, applied=1.0, event=3.0), entry(2, superseded=True)])
+    controller.record_page_telemetry(session, [entry(2, superseded=True), entry(3, applied=5.0)])
+    assert session.page_telemetry_seq == 3
+    assert session.page_superseded == 1
+    assert list(session.page_apply_ms) == [1.0, 5.0]
+    assert list(session.page_event_ms) == [2.0]
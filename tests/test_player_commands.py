@@ -0,0 +1,80 @@
+"""Speed/volume commands reach the player in order, latest value wins."""
+import threading
+
+import pytest
+
+controller = pytest.importorskip("youtube_controlv1")
+from mock_player import FakeDriver  # noqa: E402
+
+
+@pytest.fixture
+def session():
+    session = controller.ControllerSession(index=0)
+    session.driver = FakeDriver(latency=0.01, jitter=0.04, seed=1)
+    session.driver.get("http://127.0.0.1/mock_player.html")
+    session.backend = controller.SeleniumBackend(session)
+    session.selenium_active = True
+    session.store.publish()
+    return session
+
+
+def test_latest_value_lands_last(session):
+    values = [0.5, 0.75, 1.25, 1.5, 1.75, 2.0, 1.5]
+    futures = [controller.queue_player_value(session, "speed", value) for value in values]
+    results = [future.result(5.0) for future in futures]
+    # The first is sent at once, the last after it; everything between is dropped unsent.
+    assert results[0] is True and results[-1] is True
+    assert all(result is None for result in results[1:-1])
+    assert session.backend.query_state().speed == 1.5
+    session.store.apply_pending()
+    assert session.player_speed == 1.5
+    assert session.confirmed_seq["speed"] == session.issued_seq["speed"]
+
+
+def test_kinds_are_independent(session):
+    speed = controller.queue_player_value(session, "speed", 1.25)
+    volume = controller.queue_player_value(session, "volume", 0.4)
+    assert speed.result(5.0) is True and volume.result(5.0) is True
+    state = session.backend.query_state()
+    assert (state.speed, state.volume) == (1.25, pytest.approx(0.4))
+
+
+def test_stale_confirmation_is_ignored(session):
+    controller.command_applied(session, "speed", 1.5, 5)
+    controller.command_applied(session, "speed", 0.5, 4)
+    assert session.player_speed == 1.5
+
+
+def test_failure_rolls_back_only_the_newest_command(session):
+    session.player_speed = session.current_speed = 1.0
+    session.issued_seq["speed"] = 7
+    session.current_speed = 1.5
+    controller.command_failed(session, "speed", 6)
+    assert session.current_speed == 1.5
+    controller.command_failed(session, "speed", 7)
+    assert session.current_speed == 1.0
+
+
+def test_executor_counts_commands_until_they_finish():
+    executor = controller.CommandExecutor(max_workers=1)
+    release = threading.Event()
+    futures = [executor.submit(release.wait, 5.0) for _ in range(3)]
+    assert executor.pending == 3
+    release.set()
+    for future in futures:
+        future.result(5.0)
+    executor.shutdown(wait=True)
+    assert executor.pending == 0
+
+
+def test_load_report_counts_sent_commands_per_requested_change(session, tmp_path):
+    from mock_player import run_load
+
+    session.log_file = str(tmp_path / "gesture_log.csv")
+    controller.init_gesture_log(session)
+    bursts = [[("speed", 1.25), ("speed", 1.25), ("speed", 1.5)], [("volume", 0.4)], [("pause", None)]]
+    report = run_load(session, bursts, frame_interval=0, burst_gap=0)
+    session.log.close()
+    assert report["requested_changes"] == 4
+    sent = report["issued"] - report["superseded"]
+    assert report["sent_per_requested_change"] == round(sent / 4, 3)
@@ -0,0 +1,74 @@
+"""Preview encoding and streaming against a local server."""
+import socket
+import threading
+import time
+import urllib.request
+
+import numpy as np
+import pytest
+
+import preview_server
+from preview_server import PreviewServer
+
+
+@pytest.fixture
+def preview():
+    server = PreviewServer(("127.0.0.1", 0), ["station"], max_fps=0).start()
+    yield server
+    server.stop()
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_unwatched_channel_does_not_encode(preview):
+    assert not preview.publish(0, np.zeros((48, 64, 3), dtype=np.uint8))
+    assert preview.channels[0].encoded == 0
+
+
+def test_encode_error_does_not_stall_channel(preview):
+    channel = preview.channels[0]
+    channel.attach()
+    try:
+        assert preview.publish(0, np.zeros((48, 64, 3), dtype=np.complex64))  # imencode raises
+        assert wait_for(lambda: not channel.encoding)
+        assert preview.publish(0, np.zeros((48, 64, 3), dtype=np.uint8))
+        assert wait_for(lambda: channel.encoded == 1)
+        assert channel.jpeg.startswith(b"\xff\xd8")
+    finally:
+        channel.detach()
+
+
+def test_snapshot_over_http(preview):
+    frame = np.full((48, 64, 3), 128, dtype=np.uint8)
+    result = {}
+
+    def fetch():
+        with urllib.request.urlopen(preview.url + "snapshot/0", timeout=5) as response:
+            result["type"] = response.headers["Content-Type"]
+            result["body"] = response.read()
+
+    thread = threading.Thread(target=fetch)
+    thread.start()
+    assert wait_for(lambda: preview.channels[0].viewers == 1)
+    preview.publish(0, frame)
+    thread.join(5)
+    assert result["type"] == "image/jpeg" and result["body"].startswith(b"\xff\xd8")
+
+
+def test_idle_stream_detaches_a_viewer_that_went_away(preview, monkeypatch):
+    monkeypatch.setattr(preview_server, "VIEWER_TIMEOUT", 0.05)
+    host, port = preview.server.server_address[:2]
+    client = socket.create_connection((host, port), timeout=5)
+    client.sendall(b"GET /stream/0 HTTP/1.1\r\nHost: preview\r\n\r\n")
+    assert client.recv(4096).startswith(b"HTTP/1.0 200")
+    assert wait_for(lambda: preview.channels[0].viewers == 1)
+    # No frame is ever published; the keep-alive writes notice the closed connection.
+    client.close()
+    assert wait_for(lambda: preview.channels[0].viewers == 0)
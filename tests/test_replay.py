@@ -0,0 +1,30 @@
+"""Landmark replay through the session frame path."""
+import threading
+import time
+
+import pytest
+
+from landmark_recording import open_recording
+from soak_test import synthetic_recording
+
+controller = pytest.importorskip("youtube_controlv1")
+
+
+def test_looping_replay_continues_the_clock_until_stopped(tmp_path, monkeypatch):
+    recording = open_recording(synthetic_recording(str(tmp_path / "workout.hlrec"), seconds=2.0))
+    session = controller.ControllerSession(index=0)
+    stop = threading.Event()
+    times = []
+    monkeypatch.setattr(controller, "run_session_frame", lambda session, result: times.append(result['timestamp']))
+    thread = threading.Thread(target=controller.replay_reader, args=(session, recording, 0, True, stop))
+    thread.start()
+    deadline = time.monotonic() + 5.0
+    while len(times) < 3 * len(recording) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    thread.join(5.0)
+    assert not thread.is_alive() and session.source_finished
+    assert len(times) >= 3 * len(recording)
+    # Each pass continues where the last one ended, one frame period later.
+    assert all(later > earlier for earlier, later in zip(times, times[1:]))
+    assert times[len(recording)] == pytest.approx(times[len(recording) - 1] + 1 / 30)
@@ -0,0 +1,88 @@
+"""Several sessions in one process: frames are scheduled per session."""
+import threading
+import time
+
+import pytest
+
+controller = pytest.importorskip("youtube_controlv1")
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+class GatedStep:
+    """Pool step that records frames per session and blocks until released."""
+    def __init__(self):
+        self.seen = {}
+        self.release = threading.Event()
+        self.active = set()
+        self.overlaps = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, session, frame):
+        with self.lock:
+            if session.index in self.active:
+                self.overlaps += 1
+            self.active.add(session.index)
+        self.release.wait(5.0)
+        with self.lock:
+            self.seen.setdefault(session.index, []).append(frame)
+            self.active.discard(session.index)
+
+
+def test_newest_pending_frame_replaces_older_ones():
+    step = GatedStep()
+    pool = controller.InferencePool(workers=4, step=step)
+    session = controller.ControllerSession(index=0)
+    try:
+        for frame in range(5):
+            pool.submit(session, frame)
+        step.release.set()
+        assert wait_for(lambda: not session.inference_busy)
+    finally:
+        pool.shutdown()
+    # The first frame was in flight; of those queued behind it only the newest ran.
+    assert step.seen[0] == [0, 4]
+    assert step.overlaps == 0
+
+
+def test_sessions_run_side_by_side():
+    step = GatedStep()
+    pool = controller.InferencePool(workers=2, step=step)
+    sessions = [controller.ControllerSession(index=i) for i in range(2)]
+    try:
+        for session in sessions:
+            pool.submit(session, f"frame-{session.index}")
+        assert wait_for(lambda: step.active == {0, 1})
+        step.release.set()
+        assert wait_for(lambda: not any(session.inference_busy for session in sessions))
+    finally:
+        pool.shutdown()
+    assert step.seen == {0: ["frame-0"], 1: ["frame-1"]}
+
+
+def test_landmark_packets_reach_their_session():
+    from landmark_link import LandmarkSender
+
+    step = GatedStep()
+    step.release.set()
+    pool = controller.InferencePool(workers=2, step=step)
+    sessions = [controller.ControllerSession(index=i) for i in range(2)]
+    receiver = controller.start_landmark_receiver(sessions, pool, ("127.0.0.1", 0))
+    sender = LandmarkSender(receiver.address, source_id=1)
+    try:
+        sender.send([], timestamp=time.time(), frame_size=(64, 48))
+        assert wait_for(lambda: 1 in step.seen)
+    finally:
+        sender.close()
+        receiver.stop()
+        pool.shutdown()
+    assert 0 not in step.seen
+    received = step.seen[1][0]
+    assert isinstance(received, controller.ReceivedPacket) and received.packet.source_id == 1
@@ -5,11 +5,29 @@ import numpy as np
 import time
 import threading
 import queue
-from collections import deque
+from collections import deque, OrderedDict, namedtuple
 import traceback
+import sys
+from urllib.parse import urlparse, parse_qs
 import platform
 import random
-import csv
+import argparse
+import itertools
+from concurrent.futures import Future, ThreadPoolExecutor
+from landmark_link import LandmarkSender, LandmarkReceiver, parse_address
+from landmark_recording import LandmarkRecorder, open_recording
+from hand_tracker import HandTracker
+from absolute_control import AbsoluteControl, ControlCurve, parse_range
+from action_backends import ActionBackend, ActionBackendError, MpvBackend, PlayerState
+from devtools import DevToolsSession, DevToolsError, find_page_target, list_page_targets
+from latency_compensation import LatencyEstimator, Extrapolator, CorrectionMeter
+from state_store import StateStore
+from session_log import SessionLog, new_session_id
+from preview_server import PreviewServer
+from event_bus import EventPublisher, parse_event_address
+from gc_scheduler import GcScheduler
+from gesture_engine import (GestureEngine, default_rules, profile_rules, load_profile, speed_step_threshold,
+                            DEFAULT_PROFILE)
 
 try:
     from selenium import webdriver
@@ -33,123 +51,375 @@ except ImportError:
     termcolor_available = False
 
 # ======== Global Variables ========
-frame_queue = queue.Queue(maxsize=3)
-result_queue = queue.Queue(maxsize=1)
 processing_active = True
-fps_values = deque(maxlen=10)
-driver = None
-video_url = ""
-selenium_active = False
 browser_type = "brave"
-current_speed = 1.0
-speed_index = 3
 speed_values = [0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 1.75, 2.0]
-current_volume = 1.0
-distance_history = deque(maxlen=5)
-filtered_distance_history = deque(maxlen=20)
-last_speed_change = 0
-last_volume_change = 0
-MIN_SPEED_CHANGE_INTERVAL = 0.015
-MIN_VOLUME_CHANGE_INTERVAL = 0.015
-speed_direction_bias = 0
-volume_direction_bias = 0
-prev_left_hand_distance = None
-prev_right_hand_distance = None
-last_next_action = 0
-last_pause_action = 0
-MIN_ACTION_INTERVAL = 2.5
-next_gesture_start = None
-pause_gesture_start = None
-NEXT_GESTURE_DURATION = 1.0
-PAUSE_GESTURE_DURATION = 0.7
-PAUSE_THRESHOLD_OPEN = 0.15
-PAUSE_THRESHOLD_CLOSE = 0.09
+volume_levels = [round(i * 0.1, 1) for i in range(11)]
 NEXT_THRESHOLD = 0.1
 THUMB_UP_THRESHOLD = -0.03
-VOLUME_CHANGE_THRESHOLD = 0.005
-action_status = None
-selenium_action_lock = threading.Lock()
-log_file = "gesture_log.csv"
-log_buffer = []  
-last_log_write = 0
+LOG_DIR = "logs"  # git-ignored; the gesture_log.csv in the repository is a sample
+log_file = os.path.join(LOG_DIR, "gesture_log.csv")
 LOG_WRITE_INTERVAL = 5.0  
-total_frames_processed = 0
-frames_with_hands = 0
-gesture_counts = {
-    "Next": {"success": 0, "total": 0},
-    "Pause": {"success": 0, "total": 0},
-    "Play": {"success": 0, "total": 0},
-    "Speed Up": {"success": 0, "total": 0},
-    "Speed Down": {"success": 0, "total": 0},
-    "Volume Up": {"success": 0, "total": 0},
-    "Volume Down": {"success": 0, "total": 0}
-}
-frame_processing_times = deque(maxlen=100)
+TELEMETRY_FETCH_INTERVAL = 5.0
+HEALTH_CHECK_INTERVAL = 1.0
+MAX_FRAME_AGE = 0.5  # seconds from capture to inference before a frame is dropped
+MAX_STALE_GRABS = 8
+BROWSER_RESTART_AFTER = 3  # failed heartbeats in a row
+DEFAULT_VIDEO_URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
 
 # ======== MediaPipe Hands Setup ========
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 mp_drawing_styles = mp.solutions.drawing_styles
-hands = mp_hands.Hands(
-    max_num_hands=2,
-    min_detection_confidence=0.8,
-    min_tracking_confidence=0.7,
-    static_image_mode=False
-)
-
-# ======== Advanced Smooth Filter ========
-class AdvancedSmoothFilter:
-    def __init__(self, alpha=0.3, responsiveness=0.7, min_alpha=0.1, max_alpha=0.6):
-        self.value = None
-        self.base_alpha = alpha
-        self.responsiveness = responsiveness
-        self.min_alpha = min_alpha
-        self.max_alpha = max_alpha
-        self.velocity = 0
-        self.acceleration = 0
-        self.last_values = deque(maxlen=3)
-    
-    def update(self, new_value):
-        if self.value is None:
-            self.value = new_value
-            self.last_values.append(new_value)
-            return new_value
-        
-        old_velocity = self.velocity
-        self.velocity = new_value - self.value
-        self.acceleration = self.velocity - old_velocity
-        
-        diff = abs(new_value - self.value)
-        direction = 1 if new_value > self.value else -1
-        
-        adjusted_alpha = max(self.min_alpha, 
-                            min(self.max_alpha, 
-                                self.base_alpha - diff * self.responsiveness * direction))
-        
-        filtered_value = adjusted_alpha * new_value + (1 - adjusted_alpha) * self.value
-        
-        prediction_factor = 0.4
-        predicted_value = filtered_value + self.velocity * prediction_factor + self.acceleration * 0.15
-        
-        max_deviation = 0.12
-        if abs(predicted_value - filtered_value) > max_deviation:
-            direction = 1 if predicted_value > filtered_value else -1
-            predicted_value = filtered_value + (direction * max_deviation)
-            
-        self.value = filtered_value
-        self.last_values.append(filtered_value)
-        return predicted_value if self.responsiveness > 0.8 else filtered_value
+HAND_CONNECTIONS = sorted(tuple(connection) for connection in mp_hands.HAND_CONNECTIONS)
+
+def create_hands():
+    # One instance per session: MediaPipe tracks hands across consecutive
+    # frames, so frames from different cameras must not share a graph.
+    return mp_hands.Hands(
+        max_num_hands=2,
+        min_detection_confidence=0.8,
+        min_tracking_confidence=0.7,
+        static_image_mode=False
+    )
+
+# ======== Controller Session ========
+# Published to other threads after every frame (see state_store.py).
+SNAPSHOT_FIELDS = ("current_speed", "speed_index", "current_volume", "player_speed", "player_volume",
+                   "action_status", "selenium_active", "last_next_action", "last_pause_action",
+                   "gesture_counts", "page_telemetry_seq")
+
+class ControllerSession:
+    """One camera driving one browser tab.
+
+    Holds everything that is specific to a station: browser target, playback
+    state, smoothing filters, gesture timers, counters and the log buffer.
+    Several sessions can run in one process and share the inference pool and
+    the command executor.
+    """
+    def __init__(self, index=0, camera_index=0, video_url=None, browser_type="brave", transport="webdriver"):
+        self.index = index
+        self.name = f"session-{index}"
+        self.camera_index = camera_index
+        self.video_url = video_url
+        self.browser_type = browser_type
+        self.window_name = "Hand Controller" if index == 0 else f"Hand Controller {index}"
+        self.profile_dir = os.path.join(os.getcwd(), "temp_selenium_profile" if index == 0 else f"temp_selenium_profile_{index}")
+        self.log_file = log_file if index == 0 else os.path.join(LOG_DIR, f"gesture_log_{index}.csv")
+        self.session_id = new_session_id(index)
+
+        # Browser target
+        self.driver = None
+        self.selenium_active = False
+        self.selenium_action_lock = threading.Lock()
+        self.transport = transport
+        self.devtools = None
+        self.backend = None
+        self.monitor = None
+        self.health_interval = HEALTH_CHECK_INTERVAL
+        self.attach_address = None  # host:port of a browser started with --remote-debugging-port
+        self.page_target = None
+
+        # Playback state
+        self.current_speed = 1.0
+        self.speed_index = 3
+        self.current_volume = 1.0
+        self.player_speed = 1.0
+        self.player_volume = 1.0
+        self.action_status = None
+        # Speed/volume commands: one per kind in flight, newer values replace pending ones.
+        self.command_lock = threading.Lock()
+        self.command_seq = 0
+        self.commands_busy = set()
+        self.pending_commands = {}
+        self.issued_seq = {"speed": 0, "volume": 0}
+        self.confirmed_seq = {"speed": 0, "volume": 0}
+
+        # Hand inference
+        self.hands = None
+        self.inference_lock = threading.Lock()
+        self.inference_busy = False
+        self.pending_frame = None
+        self.result_queue = queue.Queue(maxsize=1)
+        self.fps_values = deque(maxlen=10)
+        self.fps = 0
+        self.frame_processing_times = deque(maxlen=100)
+        self.gc_scheduler = None
+        self.camera_backend = "auto"
+        self.max_frame_age = MAX_FRAME_AGE
+        self.frame_ages = deque(maxlen=1000)
+        self.stale_frames_dropped = 0
+        self.stale_grabs = 0
+        self.total_frames_processed = 0
+        self.frames_with_hands = 0
+        self.link_latency = None
+        self.last_remote_timestamp = 0
+        self.recorder = None
+        self.replay_time = None
+        self.source_finished = False
+
+        # Gesture state
+        self.hand_tracker = HandTracker()
+        self.filtered_distance_history = deque(maxlen=20)
+        self.last_speed_change = 0
+        self.last_volume_change = 0
+        self.speed_direction_bias = 0
+        self.volume_direction_bias = 0
+        self.last_next_action = 0
+        self.last_pause_action = 0
+        self.profile = dict(DEFAULT_PROFILE)
+        self.gesture_engine = GestureEngine(default_rules())
+        self.speed_control = None
+        self.volume_control = None
+        self.latency = LatencyEstimator()
+        self.speed_corrections = CorrectionMeter()
+        self.volume_corrections = CorrectionMeter()
+        self.page_telemetry_seq = 0
+        self.page_apply_ms = deque(maxlen=1000)
+        self.page_event_ms = deque(maxlen=1000)
+        self.page_superseded = 0
+        self.last_telemetry_fetch = 0
+        self.last_speed_status = ""
+        self.last_volume_status = ""
+        self.speed_trend = 0
+        self.volume_trend = 0
+        self.frame_timestamp = 0
+
+        # Event publishing (shared EventPublisher or None)
+        self.events = None
+        self.published_state = {}
+
+        # Logging
+        self.log = None
+        self.log_buffer = []
+        self.last_log_write = 0
+        self.gesture_counts = {
+            "Next": {"success": 0, "total": 0},
+            "Pause": {"success": 0, "total": 0},
+            "Play": {"success": 0, "total": 0},
+            "Speed Up": {"success": 0, "total": 0},
+            "Speed Down": {"success": 0, "total": 0},
+            "Volume Up": {"success": 0, "total": 0},
+            "Volume Down": {"success": 0, "total": 0}
+        }
+
+        # Owned by the frame path; other threads post updates and read snapshots.
+        self.store = StateStore(self, SNAPSHOT_FIELDS)
+
+    def record_fps(self, value):
+        # Frame path only; other threads just read the last mean through mean_fps().
+        self.fps_values.append(value)
+        self.fps = int(np.mean(self.fps_values))
+
+    def mean_fps(self):
+        return self.fps
+
+    def now(self):
+        # Gesture timers and action cooldowns follow the recorded timeline
+        # during replay, so holds behave the same at any replay speed.
+        return time.time() if self.replay_time is None else self.replay_time
+
+# ======== Session State Updates ========
+# Posted from command threads with session.store.post(func, *args); they run
+# on the session's frame path.
+def count_gesture(session, gesture, success):
+    counts = session.gesture_counts.get(gesture)
+    if counts is None:
+        return
+    counts["total"] += 1
+    if success:
+        counts["success"] += 1
+
+def set_action_status(session, status):
+    session.action_status = status
+
+def mark_player_lost(session):
+    session.selenium_active = False
+
+def mark_player_restored(session):
+    session.selenium_active = True
+
+def sync_player_state(session, speed, volume):
+    """Adopt the player's actual speed and volume as the controller's."""
+    sync_player_value(session, "speed", speed)
+    sync_player_value(session, "volume", volume)
+
+def sync_player_value(session, kind, value):
+    if kind == "speed":
+        session.current_speed = session.player_speed = value
+        if value in speed_values:
+            session.speed_index = speed_values.index(value)
+        if session.speed_control is not None:
+            session.speed_control.sync(value)
+    else:
+        session.current_volume = session.player_volume = value
+        if session.volume_control is not None:
+            session.volume_control.sync(round(value, 1))
+
+def command_applied(session, kind, value, seq=None):
+    if seq is not None:
+        # Only a newer command than the last confirmed one moves the player value.
+        if seq <= session.confirmed_seq[kind]:
+            return
+        session.confirmed_seq[kind] = seq
+    if kind == "speed":
+        session.player_speed = value
+    else:
+        session.player_volume = value
+
+def record_page_telemetry(session, entries):
+    for entry in entries:
+        if entry["seq"] <= session.page_telemetry_seq:
+            continue
+        session.page_telemetry_seq = entry["seq"]
+        if entry["superseded"]:
+            session.page_superseded += 1
+            continue
+        if entry["applied"] is not None:
+            session.page_apply_ms.append(entry["applied"] - entry["received"])
+            if entry["event"] is not None:
+                session.page_event_ms.append(entry["event"] - entry["applied"])
+
+def command_failed(session, kind, seq=None):
+    if seq is not None and seq != session.issued_seq[kind]:
+        # A newer command for this kind is pending; its outcome decides.
+        return
+    # The player kept its last confirmed value; continue from there.
+    sync_player_value(session, kind, session.player_speed if kind == "speed" else session.player_volume)
 
-left_hand_filter = AdvancedSmoothFilter(alpha=0.3, responsiveness=0.7, min_alpha=0.1, max_alpha=0.6)
-right_hand_filter = AdvancedSmoothFilter(alpha=0.3, responsiveness=0.7, min_alpha=0.1, max_alpha=0.6)
+# ======== Shared Workers ========
+class InferencePool:
+    """Schedules frames from many sessions onto a shared worker pool.
+
+    Each session has at most one frame in flight, so its MediaPipe graph sees
+    frames in order; a frame that arrives while the session is busy replaces
+    any older pending one. Finished sessions are re-queued behind the others,
+    so a fast camera cannot starve a slow one.
+    """
+    def __init__(self, workers=None, step=None):
+        self.workers = workers or os.cpu_count() or 2
+        self.step = step or run_session_frame
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hand-inference")
+
+    def submit(self, session, frame):
+        with session.inference_lock:
+            if session.inference_busy:
+                session.pending_frame = frame
+                return
+            session.inference_busy = True
+        self.executor.submit(self._run, session, frame)
+
+    def _run(self, session, frame):
+        try:
+            self.step(session, frame)
+        except Exception as e:
+            print(f"[{session.name}] Hand processor error: {e}")
+        with session.inference_lock:
+            frame = session.pending_frame
+            session.pending_frame = None
+            if frame is None or not processing_active:
+                session.inference_busy = False
+                return
+        self.executor.submit(self._run, session, frame)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+class CommandExecutor(ThreadPoolExecutor):
+    """Thread pool for browser commands that counts the commands not finished yet."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pending_lock = threading.Lock()
+        self.pending = 0
+
+    def submit(self, fn, *args, **kwargs):
+        with self.pending_lock:
+            self.pending += 1
+        try:
+            future = super().submit(fn, *args, **kwargs)
+        except RuntimeError:
+            self._finished(None)
+            raise
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        with self.pending_lock:
+            self.pending -= 1
+
+command_executor = CommandExecutor(max_workers=4, thread_name_prefix="selenium-command")
 
 # ======== Camera Reader ========
-def camera_reader():
+CapturedFrame = namedtuple("CapturedFrame", "image captured_at")
+# captured_at: capture time in time.time() terms, from the driver's buffer timestamp when it has one
+
+CAMERA_BACKENDS = {"v4l2": cv2.CAP_V4L2, "dshow": cv2.CAP_DSHOW, "msmf": cv2.CAP_MSMF,
+                   "avfoundation": cv2.CAP_AVFOUNDATION, "gstreamer": cv2.CAP_GSTREAMER, "any": cv2.CAP_ANY}
+PLATFORM_CAMERA_BACKENDS = {"Linux": "v4l2", "Windows": "dshow", "Darwin": "avfoundation"}
+
+def open_camera(index, backend="auto"):
+    name = PLATFORM_CAMERA_BACKENDS.get(platform.system(), "any") if backend == "auto" else backend
+    cap = cv2.VideoCapture(index, CAMERA_BACKENDS[name])
+    if not cap.isOpened() and name != "any":
+        print(f"⚠️ Camera {index}: {name} backend unavailable, using OpenCV's default")
+        cap = cv2.VideoCapture(index)
+    return cap
+
+def driver_timestamp(cap):
+    """Capture time of the last grabbed buffer in time.time() terms, or None.
+
+    V4L2 reports buffer timestamps on the monotonic clock in CAP_PROP_POS_MSEC;
+    other backends report a stream position there, which fails the range check.
+    """
+    msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+    age = time.monotonic() - msec / 1000
+    if msec > 0 and 0 <= age < 2.0:
+        return time.time() - age
+    return None
+
+def grab_newest(cap, period):
+    """Grab until the newest buffered frame; returns (ok, captured_at, skipped).
+
+    CAP_PROP_BUFFERSIZE is a hint many drivers ignore, so frames queued while
+    the loop was busy are grabbed (not decoded) and skipped here.
+    """
+    skipped = 0
+    while True:
+        start = time.perf_counter()
+        if not cap.grab():
+            return False, None, skipped
+        waited = time.perf_counter() - start
+        captured_at = driver_timestamp(cap)
+        # A grab that had to wait got a frame just delivered. One that returned at
+        # once took a queued frame: stale if its timestamp is over a period old,
+        # or always when the driver gives no timestamp.
+        stale = waited < period / 4 and (captured_at is None or time.time() - captured_at > period)
+        if captured_at is None:
+            captured_at = time.time()
+        if not stale or skipped >= MAX_STALE_GRABS:
+            return True, captured_at, skipped
+        skipped += 1
+
+def fresh_frame(session, captured):
+    """Record a frame's age at inference; False when it is too old to use."""
+    age = time.time() - captured.captured_at
+    session.frame_ages.append(age)
+    if session.max_frame_age and age > session.max_frame_age:
+        session.stale_frames_dropped += 1
+        return False
+    return True
+
+def frame_age_summary(session):
+    ages = np.array(session.frame_ages) * 1000
+    return {"p50_ms": round(float(np.percentile(ages, 50)), 1), "p95_ms": round(float(np.percentile(ages, 95)), 1),
+            "dropped": session.stale_frames_dropped, "stale_grabs": session.stale_grabs}
+
+def camera_reader(session, pool):
     global processing_active
     try:
-        cap = cv2.VideoCapture(0)
+        cap = open_camera(session.camera_index, session.camera_backend)
         if not cap.isOpened():
-            print("ERROR: Could not open webcam. Please check your camera connection.")
+            print(f"ERROR: Could not open webcam {session.camera_index}. Please check your camera connection.")
             processing_active = False
             return
             
@@ -158,21 +428,22 @@ def camera_reader():
         cap.set(cv2.CAP_PROP_FPS, 30)
         cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
         cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        camera_fps = cap.get(cv2.CAP_PROP_FPS)
+        period = 1.0 / camera_fps if 1 <= camera_fps <= 240 else 1.0 / 30
 
         while processing_active:
-            ret, frame = cap.read()
+            ret, captured_at, skipped = grab_newest(cap, period)
+            session.stale_grabs += skipped
+            if ret:
+                # Only the newest frame is decoded.
+                ret, frame = cap.retrieve()
             if not ret:
                 print("WARNING: Failed to capture frame from camera. Trying again...")
                 time.sleep(0.1)
                 continue
             
             frame = cv2.flip(frame, 1)
-            try:
-                if frame_queue.full():
-                    frame_queue.get_nowait()
-                frame_queue.put(frame, block=False)
-            except queue.Full:
-                pass
+            pool.submit(session, CapturedFrame(frame, captured_at))
                 
     except Exception as e:
         print(f"ERROR in camera thread: {e}")
@@ -180,95 +451,373 @@ def camera_reader():
     finally:
         if 'cap' in locals() and cap is not None:
             cap.release()
-        print("Camera thread terminated.")
+        print(f"Camera thread terminated ({session.name}).")
 
 # ======== Hand Processor ========
-def hand_processor():
-    global processing_active, current_volume, total_frames_processed, frames_with_hands, frame_processing_times
-    while processing_active:
+def landmarks_to_array(hand_landmarks):
+    return np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark], dtype=np.float32)
+
+def build_processed_data(session, frame, hands_found, fps=0, timestamp=None):
+    """Turn a list of (hand_side, score, landmarks) into the per-frame result dict.
+
+    `landmarks` is a (21, 3) array of normalized MediaPipe coordinates, so the
+    same code serves local inference, remote inference nodes and replays.
+    """
+    h, w = frame.shape[:2]
+    processed_data = {
+        'landmarks': [],
+        'hand_sides': [],
+        'hand_scores': [],
+        'hand_data': [],
+        'frame': frame,
+        'fps': fps,
+        'timestamp': time.time() if timestamp is None else timestamp
+    }
+    
+    if hands_found:
+        session.frames_with_hands += 1
+    for hand_side, score, points in hands_found:
+        processed_data['hand_sides'].append(hand_side)
+        processed_data['hand_scores'].append(score)
+        processed_data['landmarks'].append(points)
+        
+        thumb_x, thumb_y = int(points[4, 0] * w), int(points[4, 1] * h)
+        index_x, index_y = int(points[8, 0] * w), int(points[8, 1] * h)
+        wrist_x, wrist_y = int(points[0, 0] * w), int(points[0, 1] * h)
+        
+        thumb_index_distance = np.hypot(thumb_x - index_x, thumb_y - index_y) / w
+        
+        # Which hand controls what is decided by the tracker, not this frame's label.
+        processed_data['hand_data'].append({
+            'index_point': (index_x, index_y),
+            'thumb_point': (thumb_x, thumb_y),
+            'wrist_point': (wrist_x, wrist_y),
+            'distance': thumb_index_distance
+        })
+    session.total_frames_processed += 1
+    return processed_data
+
+def detect_hands(session, frame):
+    scale = 0.5
+    small_frame = cv2.resize(frame, (0, 0), fx=scale, fy=scale)
+    rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+    
+    results = session.hands.process(rgb_frame)
+    
+    hands_found = []
+    if results.multi_hand_landmarks and results.multi_handedness:
+        for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+            classification = handedness.classification[0]
+            hand_side = 'left' if classification.label == "Left" else 'right'
+            hands_found.append((hand_side, classification.score, landmarks_to_array(hand_landmarks)))
+    return hands_found
+
+def hand_processor(session, frame, captured_at=None):
+    start_time = time.time()
+    captured_at = start_time if captured_at is None else captured_at
+    hands_found = detect_hands(session, frame)
+    if session.recorder is not None:
+        h, w = frame.shape[:2]
+        session.recorder.write(captured_at, hands_found, frame_size=(w, h))
+    # Timestamped at capture, so pipeline latency includes the frame's age.
+    processed_data = build_processed_data(session, frame, hands_found, timestamp=captured_at)
+    
+    elapsed = max(time.time() - start_time, 0.001)
+    session.frame_processing_times.append(elapsed)
+    session.record_fps(1.0 / elapsed)
+    processed_data['fps'] = session.mean_fps()
+    return processed_data
+
+def run_session_frame(session, item):
+    """Gesture handling for one frame; runs on a pool worker.
+
+    `item` is a CapturedFrame that still needs hand inference, a
+    ReceivedPacket from a remote inference node, or a result dict that was
+    already produced elsewhere (replay).
+    """
+    if session.gc_scheduler is not None:
+        with session.gc_scheduler.frame():
+            handle_session_frame(session, item)
+    else:
+        handle_session_frame(session, item)
+
+def handle_session_frame(session, item):
+    if isinstance(item, dict):
+        result = item
+    elif isinstance(item, ReceivedPacket):
+        result = remote_result(session, item)
+    elif fresh_frame(session, item):
+        result = hand_processor(session, item.image, item.captured_at)
+    else:
+        return
+    annotated = process_frame_result(session, result)
+    if annotated is None:
+        return
+    if session.result_queue.full():
         try:
-            frame = frame_queue.get(timeout=0.03)
-            start_time = time.time()
-            h, w, _ = frame.shape
-            
-            scale = 0.5
-            small_frame = cv2.resize(frame, (0, 0), fx=scale, fy=scale)
-            rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
-            
-            results = hands.process(rgb_frame)
-            
-            processed_data = {
-                'landmarks': [],
-                'hand_sides': [],
-                'hand_points': [],
-                'left_hand_data': None,
-                'right_hand_data': None,
-                'frame': frame,
-                'fps': 0
-            }
-            
-            if results.multi_hand_landmarks and results.multi_handedness:
-                frames_with_hands += 1
-                for idx, (hand_landmarks, handedness) in enumerate(zip(results.multi_hand_landmarks, results.multi_handedness)):
-                    hand_side = 'left' if handedness.classification[0].label == "Left" else 'right'
-                    processed_data['hand_sides'].append(hand_side)
-                    processed_data['landmarks'].append(hand_landmarks)
-                    
-                    thumb_tip = hand_landmarks.landmark[4]
-                    index_tip = hand_landmarks.landmark[8]
-                    wrist = hand_landmarks.landmark[0]
-                    
-                    thumb_x, thumb_y = int(thumb_tip.x * w), int(thumb_tip.y * h)
-                    index_x, index_y = int(index_tip.x * w), int(index_tip.y * h)
-                    wrist_x, wrist_y = int(wrist.x * w), int(wrist.y * h)
-                    
-                    thumb_index_distance = np.hypot(thumb_x - index_x, thumb_y - index_y) / w
-                    
-                    if hand_side == 'right':
-                        processed_data['right_hand_data'] = {
-                            'index_point': (index_x, index_y),
-                            'thumb_point': (thumb_x, thumb_y),
-                            'distance': thumb_index_distance,
-                            'volume': current_volume
-                        }
-                    elif hand_side == 'left':
-                        processed_data['left_hand_data'] = {
-                            'index_point': (index_x, index_y),
-                            'thumb_point': (thumb_x, thumb_y),
-                            'wrist_point': (wrist_x, wrist_y),
-                            'distance': thumb_index_distance
-                        }
-            
-            total_frames_processed += 1
-            elapsed = max(time.time() - start_time, 0.001)
-            frame_processing_times.append(elapsed)
-            fps_values.append(1.0 / elapsed)
-            processed_data['fps'] = int(np.mean(fps_values))
-            
-            if result_queue.full():
-                result_queue.get_nowait()
-            result_queue.put(processed_data, block=False)
-            
+            session.result_queue.get_nowait()
         except queue.Empty:
-            time.sleep(0.001)
-        except Exception as e:
-            print(f"Hand processor error: {e}")
+            pass
+    try:
+        session.result_queue.put(annotated, block=False)
+    except queue.Full:
+        pass
+
+# ======== Landmark Replay ========
+def replay_reader(session, recording, speed=1.0, loop=False, stop=None):
+    """Feed recorded hand-processor output into the gesture logic, no MediaPipe.
+
+    `speed` is a multiple of real time; 0 replays as fast as possible. Every
+    record is processed in order on this thread, so replays are reproducible.
+    With `loop` the recording repeats, continuing the recorded clock so
+    cooldowns and holds stay valid, until processing stops or the `stop`
+    event is set.
+    """
+    width, height = recording.frame_size
+    width, height = width or 320, height or 240
+    timestamps = recording.timestamps
+    start_wall = time.time()
+    processed = 0
+    if len(recording):
+        start_recorded = float(timestamps[0])
+        period = float(np.median(np.diff(timestamps))) if len(recording) > 1 else 1 / 30
+        span = float(timestamps[-1]) - start_recorded + period
+        previous = start_recorded
+        offset = 0.0
+        indices = range(len(recording))
+        for index in itertools.cycle(indices) if loop else indices:
+            if not processing_active or (stop is not None and stop.is_set()):
+                break
+            if loop and index == 0 and processed:
+                offset += span
+            timestamp = float(timestamps[index]) + offset
+            if speed > 0:
+                delay = (timestamp - start_recorded) / speed - (time.time() - start_wall)
+                if delay > 0:
+                    time.sleep(delay)
+            session.replay_time = timestamp
+            session.record_fps(1.0 / max(timestamp - previous, 0.001))
+            previous = timestamp
+            frame = np.zeros((height, width, 3), dtype=np.uint8)
+            result = build_processed_data(session, frame, recording.hands(index), session.mean_fps(), timestamp)
+            run_session_frame(session, result)
+            processed += 1
+    elapsed = max(time.time() - start_wall, 1e-6)
+    print(f"Replay finished ({session.name}): {processed} frames in {elapsed:.2f}s ({processed / elapsed:.0f} frames/s)")
+    session.source_finished = True
+
+# ======== Remote Inference ========
+def run_inference_node(session, controller_address, workers=None):
+    """Capture + hand inference only; landmarks are streamed to a controller."""
+    sender = LandmarkSender(controller_address, source_id=session.index)
+
+    def send_frame(session, captured):
+        if not fresh_frame(session, captured):
+            return
+        frame = captured.image
+        result = hand_processor(session, frame, captured.captured_at)
+        hands_found = list(zip(result['hand_sides'], result['hand_scores'], result['landmarks']))
+        h, w = frame.shape[:2]
+        sender.send(hands_found, timestamp=result['timestamp'], frame_size=(w, h))
+
+    pool = InferencePool(workers, step=send_frame)
+    session.hands = create_hands()
+    print(f"Inference node {session.index}: camera {session.camera_index} -> {controller_address[0]}:{controller_address[1]}")
+    try:
+        camera_reader(session, pool)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.shutdown()
+        session.hands.close()
+        sender.close()
+        if session.recorder is not None:
+            session.recorder.close()
+        if session.frame_ages:
+            print(f"Frame age at inference: {frame_age_summary(session)}")
+
+ReceivedPacket = namedtuple("ReceivedPacket", "packet latency")
+
+def remote_result(session, received):
+    """Result dict for a packet from an inference node; runs on the frame path."""
+    packet = received.packet
+    width, height = packet.frame_size
+    frame = np.zeros((height or 240, width or 320, 3), dtype=np.uint8)
+    result = build_processed_data(session, frame, packet.hands, timestamp=packet.timestamp)
+    session.link_latency = received.latency
+    # The timestamp is on the node's clock; this is when the packet arrived on ours.
+    result['received_at'] = packet.timestamp + received.latency
+    session.record_fps(1.0 / max(packet.timestamp - session.last_remote_timestamp, 0.001))
+    session.last_remote_timestamp = packet.timestamp
+    result['fps'] = session.mean_fps()
+    return result
+
+def start_landmark_receiver(sessions, pool, listen_address, max_delay=0.0):
+    """Feed landmark packets from inference nodes into the matching sessions.
+
+    The receiver thread only hands packets to the pool; session state is
+    updated on the session's frame path.
+    """
+    by_source = {session.index: session for session in sessions}
+
+    def on_packet(packet, latency):
+        session = by_source.get(packet.source_id)
+        if session is not None:
+            pool.submit(session, ReceivedPacket(packet, latency))
+
+    receiver = LandmarkReceiver(listen_address, on_packet, max_delay=max_delay).start()
+    print(f"Listening for inference nodes on {receiver.address[0]}:{receiver.address[1]}")
+    return receiver
+
+# ======== HUD Overlay Cache ========
+class HudRenderer:
+    """Draws HUD labels, bars and static text from cached sprites.
+
+    Every sprite is an (image, mask) pair rendered once with OpenCV and then
+    blitted with a masked copy, so unchanged labels such as "1.25x" or
+    "YouTube: Connected" cost a numpy copy instead of getTextSize + rectangle +
+    putText on every frame. Sprites live in an LRU keyed by their content.
+    """
+    def __init__(self, max_sprites=256):
+        self.max_sprites = max_sprites
+        self.sprites = OrderedDict()
+        self.static_overlays = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Sessions draw from several inference workers at once.
+        self.lock = threading.Lock()
+
+    def _cached(self, key, render):
+        with self.lock:
+            sprite = self.sprites.get(key)
+            if sprite is not None:
+                self.sprites.move_to_end(key)
+                self.hits += 1
+                return sprite
+            self.misses += 1
+            sprite = render()
+            self.sprites[key] = sprite
+            if len(self.sprites) > self.max_sprites:
+                self.sprites.popitem(last=False)
+            return sprite
+
+    @staticmethod
+    def _blit(frame, sprite, x, y):
+        image, mask = sprite
+        fh, fw = frame.shape[:2]
+        sh, sw = image.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + sw, fw), min(y + sh, fh)
+        if x0 >= x1 or y0 >= y1:
+            return
+        roi = frame[y0:y1, x0:x1]
+        src = image[y0 - y:y1 - y, x0 - x:x1 - x]
+        if mask is None:
+            roi[:] = src
+        else:
+            np.copyto(roi, src, where=mask[y0 - y:y1 - y, x0 - x:x1 - x, None])
+
+    @staticmethod
+    def _render_label(text, size, thickness):
+        (text_w, text_h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, size, thickness)
+        bg_width = text_w + 10
+        bg_height = text_h + 10
+        sprite_h = max(bg_height + 1, (bg_height + text_h) // 2 + baseline + 1)
+        image = np.zeros((sprite_h, bg_width + 1, 3), dtype=np.uint8)
+        mask = np.zeros((sprite_h, bg_width + 1), dtype=np.uint8)
+        cv2.rectangle(image, (0, 0), (bg_width, bg_height), (255, 255, 255), -1)
+        cv2.rectangle(mask, (0, 0), (bg_width, bg_height), 255, -1)
+        origin = ((bg_width - text_w) // 2, (bg_height + text_h) // 2)
+        cv2.putText(image, text, origin, cv2.FONT_HERSHEY_SIMPLEX, size, (0, 0, 0), thickness)
+        cv2.putText(mask, text, origin, cv2.FONT_HERSHEY_SIMPLEX, size, 255, thickness)
+        return image, mask.astype(bool), bg_width, bg_height
+
+    @staticmethod
+    def _render_text(text, size, color, thickness):
+        (text_w, text_h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, size, thickness)
+        pad = thickness + 1
+        image = np.zeros((text_h + baseline + 2 * pad, text_w + 2 * pad, 3), dtype=np.uint8)
+        mask = np.zeros(image.shape[:2], dtype=np.uint8)
+        origin = (pad, text_h + pad)
+        cv2.putText(image, text, origin, cv2.FONT_HERSHEY_SIMPLEX, size, color, thickness)
+        cv2.putText(mask, text, origin, cv2.FONT_HERSHEY_SIMPLEX, size, 255, thickness)
+        return image, mask.astype(bool), pad, text_h + pad
+
+    def draw_label(self, frame, text, position, size=0.5, thickness=1):
+        image, mask, bg_width, bg_height = self._cached(
+            ("label", text, size, thickness),
+            lambda: self._render_label(text, size, thickness))
+        text_x, text_y = position
+        self._blit(frame, (image, mask), text_x - bg_width // 2, text_y - bg_height // 2)
+
+    def draw_text(self, frame, text, origin, size=0.5, color=(255, 255, 255), thickness=1):
+        image, mask, off_x, off_y = self._cached(
+            ("text", text, size, tuple(color), thickness),
+            lambda: self._render_text(text, size, color, thickness))
+        self._blit(frame, (image, mask), origin[0] - off_x, origin[1] - off_y)
+
+    def draw_bar(self, frame, x, y, width, height, fraction, fill_color, bg_color=(200, 200, 200)):
+        fill_h = int(height * max(0.0, min(1.0, fraction)))
+
+        def render():
+            image = np.empty((height + 1, width + 1, 3), dtype=np.uint8)
+            image[:] = bg_color
+            image[height - fill_h:, :] = fill_color
+            return image, None
+
+        sprite = self._cached(("bar", width, height, fill_h, tuple(fill_color), tuple(bg_color)), render)
+        self._blit(frame, sprite, x, y)
+
+    def draw_static(self, frame, elements):
+        """Composite text elements that rarely change from one pre-rendered overlay.
+
+        `elements` is a sequence of (text, origin, size, color, thickness). The
+        overlay and its mask are rendered once per frame size and element set,
+        cropped to their bounding box, and copied onto the frame through the mask.
+        """
+        key = (frame.shape, tuple(elements))
+        with self.lock:
+            overlay = self._static_overlay(key, frame, elements)
+        x0, y0, sprite = overlay
+        if sprite is not None:
+            self._blit(frame, sprite, x0, y0)
+
+    def _static_overlay(self, key, frame, elements):
+        overlay = self.static_overlays.get(key)
+        if overlay is None:
+            canvas = np.zeros_like(frame)
+            mask = np.zeros(frame.shape[:2], dtype=np.uint8)
+            for text, origin, size, color, thickness in elements:
+                cv2.putText(canvas, text, origin, cv2.FONT_HERSHEY_SIMPLEX, size, color, thickness)
+                cv2.putText(mask, text, origin, cv2.FONT_HERSHEY_SIMPLEX, size, 255, thickness)
+            ys, xs = np.nonzero(mask)
+            if len(xs) == 0:
+                overlay = (0, 0, None)
+            else:
+                x0, x1, y0, y1 = xs.min(), xs.max() + 1, ys.min(), ys.max() + 1
+                overlay = (x0, y0, (canvas[y0:y1, x0:x1].copy(), mask[y0:y1, x0:x1].astype(bool)))
+            self.static_overlays[key] = overlay
+            if len(self.static_overlays) > 16:
+                self.static_overlays.popitem(last=False)
+        else:
+            self.static_overlays.move_to_end(key)
+        return overlay
+
+hud = HudRenderer()
 
 # ======== Helper Functions ========
 def draw_centered_label(frame, text, position, size=0.5, thickness=1):
-    text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, size, thickness)[0]
-    text_x, text_y = position
-    
-    bg_width = text_size[0] + 10
-    bg_height = text_size[1] + 10
-    bg_x = text_x - bg_width // 2
-    bg_y = text_y - bg_height // 2
-    
-    cv2.rectangle(frame, (bg_x, bg_y), (bg_x + bg_width, bg_y + bg_height), (255, 255, 255), -1)
-    
-    text_offset_x = bg_x + (bg_width - text_size[0]) // 2
-    text_offset_y = bg_y + (bg_height + text_size[1]) // 2
-    cv2.putText(frame, text, (text_offset_x, text_offset_y), cv2.FONT_HERSHEY_SIMPLEX, size, (0, 0, 0), thickness)
+    hud.draw_label(frame, text, position, size, thickness)
+
+def draw_hand_landmarks(frame, points, color):
+    # Same look as mp_drawing.draw_landmarks, but from a (21, 3) array.
+    h, w = frame.shape[:2]
+    pixels = [(int(x * w), int(y * h)) for x, y, _ in points]
+    for start, end in HAND_CONNECTIONS:
+        cv2.line(frame, pixels[start], pixels[end], color, 2)
+    for pixel in pixels:
+        cv2.circle(frame, pixel, 6, (255, 255, 255), 2)
+        cv2.circle(frame, pixel, 5, color, 2)
 
 def get_browser_user_data_dir(browser_type="brave"):
     system = platform.system()
@@ -288,23 +837,95 @@ def get_browser_user_data_dir(browser_type="brave"):
             return os.path.expanduser("~/.config/google-chrome")
     return None
 
-def setup_selenium():
-    global driver, selenium_active, browser_type, video_url, current_volume
+def setup_selenium(session):
     if not selenium_available:
         print("Selenium is not available - skipping browser initialization")
         return False
     
-    print("\n=== MỞ VIDEO TRÊN BRAVE ===")
-    video_url = input("\nEnter YouTube video URL (press Enter to use default video): ").strip()
-    if not video_url:
-        video_url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
-        print(f"Using default video: {video_url}")
+    print(f"\n=== MỞ VIDEO TRÊN BRAVE ({session.name}) ===")
+    # Attaching never prompts: the video comes from --url or the open YouTube tab.
+    if session.video_url is None and session.attach_address is None and sys.stdin.isatty():
+        session.video_url = input("\nEnter YouTube video URL (press Enter to use default video): ").strip()
+    if not session.video_url and session.attach_address is None:
+        session.video_url = DEFAULT_VIDEO_URL
+        print(f"Using default video: {session.video_url}")
     
-    temp_user_dir = os.path.join(os.getcwd(), "temp_selenium_profile")
+    try:
+        if not reopen_browser(session, session.video_url):
+            return False
+        # No frames yet: the setup thread still owns the session state.
+        session.store.apply_pending()
+        session.selenium_active = True
+        session.backend = SeleniumBackend(session)
+        if session.transport == "devtools":
+            connect_devtools(session)
+        try:
+            session.current_volume = session.driver.execute_script("return document.querySelector('video') ? document.querySelector('video').volume : 1.0;")
+            print(f"Current volume: {session.current_volume:.2f}")
+        except Exception as e:
+            print(f"⚠️ Error getting initial volume: {e}")
+            session.current_volume = 1.0
+        session.store.publish()
+        if session.health_interval:
+            session.monitor = BrowserMonitor(session, session.health_interval).start()
+        return True
+        
+    except Exception as e:
+        print(f"❌ Lỗi khi khởi tạo Selenium: {e}")
+        traceback.print_exc()
+        return False
+
+def reopen_browser(session, url):
+    """Connect session.driver to a player tab: attach to the running browser, or launch one on `url`."""
+    if session.attach_address is not None:
+        return attach_browser(session, url)
+    return start_browser(session) and open_video(session, url)
+
+def video_id(url):
+    return parse_qs(urlparse(url or "").query).get("v", [None])[0]
+
+def pick_video_tab(targets, url=None):
+    """The open tab playing `url`'s video, else (without `url`) the first YouTube watch page."""
+    watch_pages = [t for t in targets if "youtube.com/watch" in t.get("url", "")]
+    if url:
+        wanted = video_id(url)
+        return next((t for t in watch_pages if wanted and video_id(t["url"]) == wanted), None)
+    return watch_pages[0] if watch_pages else None
+
+def attach_browser(session, url=None):
+    """Attach to the browser at session.attach_address and take over its YouTube tab.
+
+    Nothing is launched or reloaded: the tab keeps playing. Without a matching
+    tab, `url` (or the default video) opens in a new one.
+    """
+    options = webdriver.ChromeOptions()
+    options.add_experimental_option("debuggerAddress", session.attach_address)
+    print(f"\n🔗 Attaching to browser at {session.attach_address}...")
+    try:
+        # Selenium Manager's cached driver: no download check, so attaching takes about a second.
+        session.driver = webdriver.Chrome(options=options)
+    except Exception as e:
+        print(f"Lỗi khi dùng ChromeDriver có sẵn: {e}")
+        session.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    tab = pick_video_tab(list_page_targets(session.attach_address), url)
+    if tab is None:
+        session.driver.switch_to.new_window("tab")
+        session.page_target = None
+        return open_video(session, url or DEFAULT_VIDEO_URL)
+    # ChromeDriver window handles are DevTools target ids.
+    session.driver.switch_to.window(tab["id"])
+    session.page_target = tab
+    session.video_url = tab["url"]
+    print(f"✅ Attached to tab: {tab.get('title', '')} ({tab['url']})")
+    return inject_controller_script(session, humanize=False)
+
+def start_browser(session):
+    """Launch Brave/Chrome with the session's profile as session.driver."""
+    temp_user_dir = session.profile_dir
     os.makedirs(temp_user_dir, exist_ok=True)
     
     options = webdriver.ChromeOptions()
-    if browser_type == "brave":
+    if session.browser_type == "brave":
         brave_paths = [
             "C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
             "C:\\Program Files (x86)\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
@@ -324,71 +945,56 @@ def setup_selenium():
     options.add_argument('--disable-notifications')
     options.add_experimental_option('excludeSwitches', ['enable-logging'])
     
+    print("\n🔄 Starting browser... Please wait...")
     try:
-        print("\n🔄 Starting browser... Please wait...")
-        try:
-            driver = webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()),
-                options=options
-            )
-        except Exception as e:
-            print(f"Lỗi khi sử dụng ChromeDriverManager: {e}")
-            driver = webdriver.Chrome(options=options)
-        
-        print(f"\n🌐 Opening YouTube video: {video_url}")
-        driver.get(video_url)
-        
-        try:
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.TAG_NAME, "video"))
-            )
-            print("✅ Video loaded successfully")
-        except Exception as e:
-            print(f"⚠️ Warning: Video element not found - {str(e)}")
-        
-        if inject_controller_script():
-            selenium_active = True
-            try:
-                current_volume = driver.execute_script("return document.querySelector('video') ? document.querySelector('video').volume : 1.0;")
-                print(f"Current volume: {current_volume:.2f}")
-            except Exception as e:
-                print(f"⚠️ Error getting initial volume: {e}")
-                current_volume = 1.0
-            return True
-        else:
-            return False
-        
+        session.driver = webdriver.Chrome(
+            service=Service(ChromeDriverManager().install()),
+            options=options
+        )
     except Exception as e:
-        print(f"❌ Lỗi khi khởi tạo Selenium: {e}")
-        traceback.print_exc()
-        return False
+        print(f"Lỗi khi sử dụng ChromeDriverManager: {e}")
+        session.driver = webdriver.Chrome(options=options)
+    return True
+
+def open_video(session, url):
+    """Load `url` in session.driver and inject the controller script."""
+    print(f"\n🌐 Opening YouTube video: {url}")
+    session.driver.get(url)
+    
+    try:
+        WebDriverWait(session.driver, 15).until(
+            EC.presence_of_element_located((By.TAG_NAME, "video"))
+        )
+        print("✅ Video loaded successfully")
+    except Exception as e:
+        print(f"⚠️ Warning: Video element not found - {str(e)}")
+    
+    return inject_controller_script(session)
 
-def inject_controller_script():
-    global driver, current_speed, current_volume
-    if not driver:
+def inject_controller_script(session, humanize=True):
+    if not session.driver:
         return False
     try:
-        driver.title
-        time.sleep(random.uniform(0.5, 2.0))
-        action = webdriver.ActionChains(driver)
-        action.move_by_offset(
-            random.randint(10, 50),
-            random.randint(10, 50)
-        ).perform()
+        session.driver.title
+        if humanize:
+            time.sleep(random.uniform(0.5, 2.0))
+            action = webdriver.ActionChains(session.driver)
+            action.move_by_offset(
+                random.randint(10, 50),
+                random.randint(10, 50)
+            ).perform()
         
         controller_script = """
         if (!document.getElementById('ai-speed-controller')) {
             window.aiHandController = {
                 currentSpeed: document.querySelector('video') ? document.querySelector('video').playbackRate : 1.0,
                 currentVolume: document.querySelector('video') ? document.querySelector('video').volume : 1.0,
-                updateQueue: [],
-                volumeUpdateQueue: [],
-                processingUpdate: false,
-                processingVolumeUpdate: false,
-                lastUpdateTime: Date.now(),
-                lastVolumeUpdateTime: Date.now(),
-                pendingAnimationFrame: null,
-                pendingVolumeAnimationFrame: null
+                pendingSpeed: null,
+                pendingVolume: null,
+                flushScheduled: false,
+                navigations: 0,
+                // Ring buffer of command timings (performance.now() ms), fetched by drainTelemetry
+                telemetry: {size: 512, next: 0, seq: 0, entries: []}
             };
             
             const controlPanel = document.createElement('div');
@@ -491,78 +1097,96 @@ def inject_controller_script():
             
             document.body.appendChild(controlPanel);
             
-            function processUpdateQueue() {
-                if (window.aiHandController.processingUpdate) return;
-                
-                if (window.aiHandController.updateQueue.length > 0) {
-                    window.aiHandController.processingUpdate = true;
-                    
-                    const latestRate = window.aiHandController.updateQueue.pop();
-                    window.aiHandController.updateQueue = [];
-                    
-                    const video = document.querySelector('video');
-                    if (video) {
-                        video.playbackRate = latestRate;
-                        window.aiHandController.currentSpeed = latestRate;
-                        
-                        if (window.aiHandController.pendingAnimationFrame === null) {
-                            window.aiHandController.pendingAnimationFrame = requestAnimationFrame(() => {
-                                const display = document.getElementById('current-speed-display');
-                                if (display) {
-                                    display.textContent = `Speed: ${latestRate.toFixed(2)}x`;
-                                }
-                                controlPanel.style.backgroundColor = 'rgba(204, 0, 0, 0.9)';
-                                setTimeout(() => {
-                                    controlPanel.style.backgroundColor = 'rgba(0, 0, 0, 0.7)';
-                                }, 150);
-                                window.aiHandController.pendingAnimationFrame = null;
-                            });
+            function recordCommand(kind, value) {
+                const t = window.aiHandController.telemetry;
+                const entry = {seq: ++t.seq, kind: kind, value: value, received: performance.now(),
+                               applied: null, event: null, superseded: false};
+                t.entries[t.next] = entry;
+                t.next = (t.next + 1) % t.size;
+                return entry;
+            }
+            
+            function recordMediaEvent(kind, value) {
+                const t = window.aiHandController.telemetry;
+                for (let i = 1; i <= t.entries.length; i++) {
+                    const entry = t.entries[(t.next - i + t.size) % t.size];
+                    if (!entry) break;
+                    if (entry.kind === kind && entry.applied !== null) {
+                        if (entry.event === null && Math.abs(entry.value - value) < 0.001) {
+                            entry.event = performance.now();
                         }
+                        break;
                     }
-                    
-                    window.aiHandController.processingUpdate = false;
                 }
             }
             
-            function processVolumeUpdateQueue() {
-                if (window.aiHandController.processingVolumeUpdate) return;
-                
-                if (window.aiHandController.volumeUpdateQueue.length > 0) {
-                    window.aiHandController.processingVolumeUpdate = true;
-                    
-                    const latestVolume = window.aiHandController.volumeUpdateQueue.pop();
-                    window.aiHandController.volumeUpdateQueue = [];
-                    
-                    const video = document.querySelector('video');
-                    if (video) {
-                        video.volume = latestVolume;
-                        window.aiHandController.currentVolume = latestVolume;
-                        
-                        if (window.aiHandController.pendingVolumeAnimationFrame === null) {
-                            window.aiHandController.pendingVolumeAnimationFrame = requestAnimationFrame(() => {
-                                const display = document.getElementById('current-volume-display');
-                                if (display) {
-                                    display.textContent = `Volume: ${(latestVolume * 100).toFixed(0)}%`;
-                                }
-                                controlPanel.style.backgroundColor = 'rgba(204, 0, 0, 0.9)';
-                                setTimeout(() => {
-                                    controlPanel.style.backgroundColor = 'rgba(0, 0, 0, 0.7)';
-                                }, 150);
-                                window.aiHandController.pendingVolumeAnimationFrame = null;
-                            });
-                        }
-                    }
-                    
-                    window.aiHandController.processingVolumeUpdate = false;
+            // Entries newer than sinceSeq, in seq order, up to the first one that has not
+            // settled: the caller moves sinceSeq to the last entry returned, so a newer
+            // settled entry must not skip an older one that is still waiting for its
+            // media event. A command never applied (no video) settles after 5 s.
+            // Times are relative to timeOrigin.
+            window.aiHandController.drainTelemetry = function(sinceSeq) {
+                const now = performance.now();
+                const newer = window.aiHandController.telemetry.entries.filter(entry => entry.seq > sinceSeq);
+                newer.sort((a, b) => a.seq - b.seq);
+                const entries = [];
+                for (const entry of newer) {
+                    const settled = entry.superseded || entry.event !== null ||
+                        (entry.applied !== null ? now - entry.applied > 500 : now - entry.received > 5000);
+                    if (!settled) break;
+                    entries.push(entry);
+                }
+                return {timeOrigin: performance.timeOrigin, entries: entries};
+            };
+            
+            function flashPanel() {
+                if (controlPanel.animate) {
+                    controlPanel.animate([{backgroundColor: 'rgba(204, 0, 0, 0.9)'},
+                                          {backgroundColor: 'rgba(0, 0, 0, 0.7)'}], {duration: 150});
+                }
+            }
+            
+            // Commands arriving in the same task collapse to the latest value and are
+            // applied on a microtask: no frame wait, and not throttled in background tabs.
+            function flushCommands() {
+                const controller = window.aiHandController;
+                controller.flushScheduled = false;
+                const video = document.querySelector('video');
+                if (!video) return;
+                if (controller.pendingSpeed) {
+                    const entry = controller.pendingSpeed;
+                    controller.pendingSpeed = null;
+                    controller.currentSpeed = entry.value;
+                    video.playbackRate = entry.value;
+                    entry.applied = performance.now();
+                    speedDisplay.textContent = `Speed: ${entry.value.toFixed(2)}x`;
+                    flashPanel();
+                }
+                if (controller.pendingVolume) {
+                    const entry = controller.pendingVolume;
+                    controller.pendingVolume = null;
+                    controller.currentVolume = entry.value;
+                    video.volume = entry.value;
+                    entry.applied = performance.now();
+                    volumeDisplay.textContent = `Volume: ${(entry.value * 100).toFixed(0)}%`;
+                    flashPanel();
                 }
             }
             
+            function scheduleFlush() {
+                if (window.aiHandController.flushScheduled) return;
+                window.aiHandController.flushScheduled = true;
+                queueMicrotask(flushCommands);
+            }
+            
             window.updatePlaybackSpeed = function(rate) {
                 if (typeof rate !== 'number' || isNaN(rate) || rate < 0.25 || rate > 2.0) {
                     return false;
                 }
-                window.aiHandController.updateQueue.push(rate);
-                processUpdateQueue();
+                const controller = window.aiHandController;
+                if (controller.pendingSpeed) controller.pendingSpeed.superseded = true;
+                controller.pendingSpeed = recordCommand('speed', rate);
+                scheduleFlush();
                 return true;
             };
             
@@ -570,14 +1194,17 @@ def inject_controller_script():
                 if (typeof volume !== 'number' || isNaN(volume) || volume < 0.0 || volume > 1.0) {
                     return false;
                 }
-                window.aiHandController.volumeUpdateQueue.push(volume);
-                processVolumeUpdateQueue();
+                const controller = window.aiHandController;
+                if (controller.pendingVolume) controller.pendingVolume.superseded = true;
+                controller.pendingVolume = recordCommand('volume', volume);
+                scheduleFlush();
                 return true;
             };
             
             const video = document.querySelector('video');
             if (video) {
                 video.addEventListener('ratechange', function() {
+                    recordMediaEvent('speed', video.playbackRate);
                     if (Math.abs(video.playbackRate - window.aiHandController.currentSpeed) > 0.01) {
                         window.aiHandController.currentSpeed = video.playbackRate;
                         const display = document.getElementById('current-speed-display');
@@ -587,6 +1214,7 @@ def inject_controller_script():
                     }
                 });
                 video.addEventListener('volumechange', function() {
+                    recordMediaEvent('volume', video.volume);
                     if (Math.abs(video.volume - window.aiHandController.currentVolume) > 0.01) {
                         window.aiHandController.currentVolume = video.volume;
                         const display = document.getElementById('current-volume-display');
@@ -679,6 +1307,23 @@ def inject_controller_script():
                 }
             });
             
+            // YouTube moves between videos without a page load: the controller
+            // survives, but re-read the player and keep the panel attached.
+            document.addEventListener('yt-navigate-finish', function() {
+                const controller = window.aiHandController;
+                controller.navigations += 1;
+                const video = document.querySelector('video');
+                if (video) {
+                    controller.currentSpeed = video.playbackRate;
+                    controller.currentVolume = video.volume;
+                }
+            });
+            new MutationObserver(function() {
+                if (!controlPanel.isConnected && document.body) {
+                    document.body.appendChild(controlPanel);
+                }
+            }).observe(document.body, {childList: true});
+            
             console.log('AI Hand Controller added to YouTube!');
             return true;
         }
@@ -686,673 +1331,1217 @@ def inject_controller_script():
         """
         
         print("👉 Injecting controller script...")
-        driver.execute_script(controller_script)
+        session.driver.execute_script(controller_script)
         print("Added speed and volume control panel to YouTube!")
         
         try:
-            current_speed = driver.execute_script("return document.querySelector('video') ? document.querySelector('video').playbackRate : 1.0;")
-            current_volume = driver.execute_script("return document.querySelector('video') ? document.querySelector('video').volume : 1.0;")
-            print(f"Current playback speed: {current_speed}x")
-            print(f"Current volume: {current_volume:.2f}")
+            speed = session.driver.execute_script("return document.querySelector('video') ? document.querySelector('video').playbackRate : 1.0;")
+            volume = session.driver.execute_script("return document.querySelector('video') ? document.querySelector('video').volume : 1.0;")
+            print(f"Current playback speed: {speed}x")
+            print(f"Current volume: {volume:.2f}")
         except Exception as e:
             print(f"⚠️ Error getting initial playback speed or volume: {e}")
-            current_speed = 1.0
-            current_volume = 1.0
+            speed = 1.0
+            volume = 1.0
+        # Also runs on the command executor when the page reloads.
+        session.store.post(sync_player_state, speed, volume)
         
         return True
     except Exception as e:
         print(f"Error adding control panel: {e}")
         return False
 
-def change_youtube_speed(new_speed):
-    global driver, selenium_active, current_speed
-    if not driver or not selenium_active:
-        print("Selenium not active or driver not initialized")
+def connect_devtools(session):
+    """Open a DevTools WebSocket to the video tab; WebDriver stays the fallback."""
+    address = session.driver.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+    if not address:
+        print("⚠️ Browser did not report a DevTools address - using WebDriver commands")
         return False
     try:
-        driver.title
-        if not isinstance(new_speed, (int, float)) or new_speed < 0.25 or new_speed > 2.0:
-            print(f"Invalid speed value: {new_speed}")
+        if session.page_target is not None:
+            # The tab WebDriver attached to, not just the first YouTube tab.
+            session.devtools = DevToolsSession(session.page_target["webSocketDebuggerUrl"])
+        else:
+            session.devtools = DevToolsSession(find_page_target(address))
+        # A full page load drops the controller script; put it back.
+        session.devtools.on("Page.loadEventFired", lambda params: async_action(inject_controller_script, session, False))
+        session.devtools.call("Page.enable")
+    except (OSError, DevToolsError) as e:
+        print(f"⚠️ DevTools transport unavailable ({e}) - using WebDriver commands")
+        session.devtools = None
+        return False
+    print(f"✅ DevTools transport connected ({address})")
+    return True
+
+def run_page_script(session, expression):
+    """Evaluate `expression` in the video tab and return its value."""
+    if session.devtools is not None and session.devtools.connected:
+        return session.devtools.evaluate(expression)
+    return session.driver.execute_script(f"return {expression};")
+
+def press_page_key(session, key, shift=False):
+    if session.devtools is not None and session.devtools.connected:
+        session.devtools.press_key(key, shift).result(session.devtools.timeout)
+        return
+    actions = ActionChains(session.driver)
+    if shift:
+        actions.key_down(Keys.SHIFT).send_keys(key).key_up(Keys.SHIFT).perform()
+    else:
+        actions.send_keys(key).perform()
+
+class SeleniumBackend(ActionBackend):
+    """The YouTube tab: page controller script for speed/volume, player shortcuts for the rest."""
+    name = "selenium"
+
+    def __init__(self, session):
+        self.session = session
+
+    def set_speed(self, speed):
+        return run_page_script(self.session, f"window.setYouTubeSpeed({speed})")
+
+    def set_volume(self, volume):
+        return run_page_script(self.session, f"window.setYouTubeVolume({volume})")
+
+    def toggle_pause(self):
+        press_page_key(self.session, 'k')
+        return run_page_script(self.session, "document.querySelector('video').paused")
+
+    def next(self):
+        press_page_key(self.session, 'n', shift=True)
+        return True
+
+    def query_state(self):
+        state = run_page_script(self.session, "(v => ({speed: v.playbackRate, volume: v.volume, paused: v.paused}))"
+                                              "(document.querySelector('video'))")
+        return PlayerState(state["speed"], state["volume"], state["paused"])
+
+    def alive(self):
+        try:
+            self.session.driver.title
+            return True
+        except:
             return False
-        
-        max_retries = 3
-        for attempt in range(max_retries):
+
+    def close(self):
+        if self.session.devtools is not None:
+            self.session.devtools.close()
+        try:
+            if self.session.attach_address is not None:
+                # Leave the user's browser and tab running; only stop chromedriver.
+                self.session.driver.service.stop()
+            else:
+                self.session.driver.quit()
+        except:
+            pass
+
+def setup_mpv(session, socket_path):
+    try:
+        session.backend = MpvBackend(socket_path)
+        state = session.backend.query_state()
+    except (OSError, ValueError, ActionBackendError) as e:
+        print(f"❌ Could not connect to mpv at {socket_path}: {e}")
+        if session.backend is not None:
+            session.backend.close()
+        session.backend = None
+        return False
+    sync_player_state(session, state.speed, state.volume)
+    session.selenium_active = True
+    session.store.publish()
+    print(f"✅ Connected to mpv ({socket_path}): speed {state.speed}x, volume {state.volume:.2f}")
+    return True
+
+def player_lost(session):
+    if session.monitor is not None:
+        # The heartbeat re-injects the controller or restarts the browser.
+        session.monitor.wake()
+    elif not session.backend.alive():
+        print(f"Player backend ({session.backend.name}) crashed")
+        session.store.post(mark_player_lost)
+
+# One round trip: is the controller there, and has YouTube navigated since the last check?
+HEALTH_PROBE = ("(() => { const c = window.aiHandController, v = document.querySelector('video'); "
+                "return {ready: !!c && typeof window.setYouTubeSpeed === 'function', "
+                "navigations: c ? c.navigations : 0, href: location.href, "
+                "speed: v ? v.playbackRate : null, volume: v ? v.volume : null}; })()")
+
+class BrowserMonitor:
+    """Heartbeat for a session's browser, off the command path.
+
+    Every `interval` seconds (or at once after `wake`, when a command failed)
+    it probes the page. A missing controller script - the page reloaded - is
+    re-injected; an SPA navigation resyncs speed/volume; `restart_after`
+    failed probes in a row mean the driver is gone, and the browser is
+    restarted (or re-attached) on the last seen URL. Each recovery is printed and logged as a
+    "Recovery" row with its duration. Commands therefore make a single
+    attempt and leave recovery to the monitor.
+    """
+    def __init__(self, session, interval=HEALTH_CHECK_INTERVAL, restart_after=BROWSER_RESTART_AFTER,
+                 reopen=None):
+        self.session = session
+        self.interval = interval
+        self.restart_after = restart_after
+        self.reopen = reopen or reopen_browser
+        self.failures = 0
+        self.navigations = 0
+        self.url = session.video_url
+        self.recoveries = []
+        self.wake_event = threading.Event()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=f"{self.session.name}-browser-monitor", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self.wake_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+
+    def wake(self):
+        self.wake_event.set()
+
+    def _run(self):
+        while self.running:
+            self.wake_event.wait(self.interval)
+            self.wake_event.clear()
+            if not self.running:
+                break
             try:
-                success = driver.execute_script(f"return window.setYouTubeSpeed({new_speed});")
-                if success:
-                    current_speed = new_speed
-                    return True
-                else:
-                    print(f"Attempt {attempt + 1}: setYouTubeSpeed returned false")
-                    time.sleep(0.5)
+                self.check()
             except Exception as e:
-                print(f"Attempt {attempt + 1}: Error changing speed: {e}")
-                time.sleep(0.5)
-        
+                print(f"⚠️ {self.session.name}: browser health check failed: {e}")
+
+    def check(self):
+        session = self.session
+        try:
+            state = run_page_script(session, HEALTH_PROBE)
+        except Exception as e:
+            self.failures += 1
+            if self.failures == 1:
+                print(f"⚠️ {session.name}: browser not responding ({e})")
+            if self.failures >= self.restart_after:
+                self.restart_browser()
+            return
+        self.failures = 0
+        self.url = state["href"]
+        if not state["ready"]:
+            self.reinject()
+        elif state["navigations"] != self.navigations:
+            self.navigations = state["navigations"]
+            if state["speed"] is not None:
+                session.store.post(sync_player_state, state["speed"], state["volume"])
+
+    def reinject(self):
+        start = time.time()
+        if inject_controller_script(self.session, humanize=False):
+            self.navigations = 0
+            self._recovered("Controller re-injected", start)
+
+    def restart_browser(self):
+        session = self.session
+        start = time.time()
+        session.store.post(mark_player_lost)
+        print(f"🔄 {session.name}: restarting browser on {self.url}")
+        if session.devtools is not None:
+            session.devtools.close()
+            session.devtools = None
         try:
-            driver.title
+            if session.attach_address is None:
+                session.driver.quit()
+            else:
+                session.driver.service.stop()
         except:
-            print("Selenium driver crashed")
-            selenium_active = False
+            pass
+        try:
+            if not self.reopen(session, self.url):
+                raise RuntimeError("controller script not injected")
+            if session.transport == "devtools":
+                connect_devtools(session)
+        except Exception as e:
+            # Try again after another `restart_after` failed probes.
+            print(f"❌ {session.name}: browser restart failed: {e}")
+            self.failures = 0
+            return
+        session.store.post(mark_player_restored)
+        self.failures = 0
+        self.navigations = 0
+        self._recovered("Browser restarted", start)
+
+    def _recovered(self, kind, start):
+        elapsed = time.time() - start
+        self.recoveries.append((kind, elapsed))
+        print(f"✅ {self.session.name}: {kind} in {elapsed:.2f}s")
+        self.session.store.post(log_gesture_result, "Recovery", True, elapsed, self.session.mean_fps(), kind, elapsed)
+
+def fetch_page_telemetry(session):
+    """Pull settled command timings from the page controller in one call."""
+    data = run_page_script(session, "window.aiHandController.drainTelemetry("
+                                    f"{session.store.snapshot.page_telemetry_seq})")
+    if data and data.get("entries"):
+        session.store.post(record_page_telemetry, data["entries"])
+
+def page_telemetry_summary(session):
+    summary = {"superseded": session.page_superseded}
+    for name, samples in (("apply_ms", session.page_apply_ms), ("media_event_ms", session.page_event_ms)):
+        if samples:
+            summary[name] = {"p50": round(float(np.percentile(samples, 50)), 2),
+                             "p95": round(float(np.percentile(samples, 95)), 2)}
+    return summary
+
+def observe_latency(session, stage, seconds):
+    session.latency.observe(stage, seconds)
+
+def change_youtube_speed(session, new_speed, seq=None):
+    if not session.backend or not session.store.snapshot.selenium_active:
+        print("Player backend not active or not initialized")
+        return False
+    try:
+        if not isinstance(new_speed, (int, float)) or new_speed < 0.25 or new_speed > 2.0:
+            print(f"Invalid speed value: {new_speed}")
+            return False
+        
+        # One attempt: recovery is the browser monitor's job (see BrowserMonitor).
+        command_start = time.time()
+        if session.backend.set_speed(new_speed):
+            session.store.post(observe_latency, "command", time.time() - command_start)
+            session.store.post(command_applied, "speed", new_speed, seq)
+            return True
+        print("set_speed returned false")
+        player_lost(session)
+        session.store.post(command_failed, "speed", seq)
         return False
     except Exception as e:
         print(f"❌ Lỗi khi điều chỉnh tốc độ video: {e}")
-        try:
-            driver.title
-        except:
-            print("Selenium driver crashed")
-            selenium_active = False
+        player_lost(session)
+        session.store.post(command_failed, "speed", seq)
         return False
 
-def change_youtube_volume(new_volume):
-    global driver, selenium_active, current_volume
-    if not driver or not selenium_active:
-        print("Selenium not active or driver not initialized")
+def change_youtube_volume(session, new_volume, seq=None):
+    if not session.backend or not session.store.snapshot.selenium_active:
+        print("Player backend not active or not initialized")
         return False
     try:
-        driver.title
         if not isinstance(new_volume, (int, float)) or new_volume < 0.0 or new_volume > 1.0:
             print(f"Invalid volume value: {new_volume}")
             return False
         
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                success = driver.execute_script(f"return window.setYouTubeVolume({new_volume});")
-                if success:
-                    current_volume = new_volume
-                    return True
-                else:
-                    print(f"Attempt {attempt + 1}: setYouTubeVolume returned false")
-                    time.sleep(0.5)
-            except Exception as e:
-                print(f"Attempt {attempt + 1}: Error changing volume: {e}")
-                time.sleep(0.5)
-        
-        try:
-            driver.title
-        except:
-            print("Selenium driver crashed")
-            selenium_active = False
+        # One attempt: recovery is the browser monitor's job (see BrowserMonitor).
+        command_start = time.time()
+        if session.backend.set_volume(new_volume):
+            session.store.post(observe_latency, "command", time.time() - command_start)
+            session.store.post(command_applied, "volume", new_volume, seq)
+            return True
+        print("set_volume returned false")
+        player_lost(session)
+        session.store.post(command_failed, "volume", seq)
         return False
     except Exception as e:
         print(f"❌ Lỗi khi điều chỉnh âm lượng video: {e}")
-        try:
-            driver.title
-        except:
-            print("Selenium driver crashed")
-            selenium_active = False
+        player_lost(session)
+        session.store.post(command_failed, "volume", seq)
         return False
 
-def perform_next_action():
-    global driver, selenium_active, action_status, last_next_action, gesture_counts
-    
-    current_time = time.time()
-    if current_time - last_next_action < MIN_ACTION_INTERVAL:
-        return False  
-
-    last_next_action = time.time()
+def perform_next_action(session):
+    # Runs on the command executor: state changes go through session.store.
     start_time = time.time()
 
-    if not driver or not selenium_active:
-        print("Selenium not active or driver not initialized")
-        log_gesture_result("Next", False, 0, int(np.mean(fps_values)), "Selenium not active", 0)
-        gesture_counts["Next"]["total"] += 1
+    if not session.backend or not session.store.snapshot.selenium_active:
+        print("Player backend not active or not initialized")
+        session.store.post(log_gesture_result, "Next", False, 0, session.mean_fps(), "Player not active", 0)
+        session.store.post(count_gesture, "Next", False)
         return False
 
-    with selenium_action_lock:
+    with session.selenium_action_lock:
         try:
             print("INFO: Chuyen video bang phim tat...")
             
-            actions = ActionChains(driver)
-            actions.key_down(Keys.SHIFT).send_keys('n').key_up(Keys.SHIFT).perform()
+            session.backend.next()
             
-            action_status = "Next Video"
+            session.store.post(set_action_status, "Next Video")
             print("✅ Da chuyen video bang phim tat.")
             
             latency = time.time() - start_time
-            log_gesture_result("Next", True, latency, int(np.mean(fps_values)), action_status, latency)
-            gesture_counts["Next"]["success"] += 1
-            gesture_counts["Next"]["total"] += 1
+            session.store.post(log_gesture_result, "Next", True, latency, session.mean_fps(), "Next Video", latency)
+            session.store.post(count_gesture, "Next", True)
             
             return True
             
         except Exception as e:
             # Nếu có lỗi xảy ra với phương pháp phím tắt
             print(f"❌ Loi khi dung phim tat: {e}")
-            action_status = "Next video failed"
-            log_gesture_result("Next", False, 0, int(np.mean(fps_values)), f"Error: {str(e)}", 0)
-            gesture_counts["Next"]["total"] += 1
+            session.store.post(set_action_status, "Next video failed")
+            session.store.post(log_gesture_result, "Next", False, 0, session.mean_fps(), f"Error: {str(e)}", 0)
+            session.store.post(count_gesture, "Next", False)
             return False
 
-# THAY THẾ TOÀN BỘ HÀM NÀY
-
-def perform_pause_action():
-    global driver, selenium_active, action_status, last_pause_action, gesture_counts
-    
-    current_time = time.time()
-    if current_time - last_pause_action < MIN_ACTION_INTERVAL:
-        return False # Vẫn trong thời gian chờ, không làm gì cả
-
-    # Cập nhật thời gian ngay khi một hành động được "thử"
-    last_pause_action = time.time()
+def perform_pause_action(session, want_paused=None):
+    # Runs on the command executor: state changes go through session.store.
     start_time = time.time()
 
-    if not driver or not selenium_active:
-        print("Selenium not active or driver not initialized")
+    if not session.backend or not session.store.snapshot.selenium_active:
+        print("Player backend not active or not initialized")
         return False
 
-    with selenium_action_lock:
+    with session.selenium_action_lock:
         try:
             # Lấy trạng thái video TRƯỚC KHI thực hiện hành động
-            is_paused_before_action = driver.execute_script("return document.querySelector('video').paused;")
+            is_paused_before_action = session.backend.query_state().paused
+            if want_paused is not None and is_paused_before_action == want_paused:
+                return False # Video đã ở trạng thái mong muốn
             gesture_name = "Play" if is_paused_before_action else "Pause"
             
             print(f"INFO: Thuc hien hanh dong '{gesture_name}' bang phim tat (K)...")
             
-            # Gửi phím 'k' đến trang web
-            actions = ActionChains(driver)
-            actions.send_keys('k').perform()
+            # Gửi lệnh pause/play đến trình phát (phím 'k' trên YouTube)
+            session.backend.toggle_pause()
 
             # Cập nhật trạng thái và ghi log
             action_status = "Paused" if not is_paused_before_action else "Playing"
+            session.store.post(set_action_status, action_status)
             print(f"✅ Video da duoc {'tam dung' if not is_paused_before_action else 'phat'}.")
             
             latency = time.time() - start_time
-            log_gesture_result(gesture_name, True, latency, int(np.mean(fps_values)), action_status, latency)
-            gesture_counts[gesture_name]["success"] += 1
-            gesture_counts[gesture_name]["total"] += 1
+            session.store.post(log_gesture_result, gesture_name, True, latency, session.mean_fps(), action_status, latency)
+            session.store.post(count_gesture, gesture_name, True)
             return True
             
         except Exception as e:
             print(f"❌ Loi khi dung phim tat Pause/Play: {e}")
             # Cố gắng xác định gesture_name lần nữa để ghi log lỗi chính xác
             try:
-                is_paused = driver.execute_script("return document.querySelector('video').paused;")
+                is_paused = session.backend.query_state().paused
                 gesture_name_on_error = "Play" if is_paused else "Pause"
             except:
                 gesture_name_on_error = "Pause/Play Action" # Tên chung nếu không kiểm tra được
 
-            log_gesture_result(gesture_name_on_error, False, 0, int(np.mean(fps_values)), f"Error: {str(e)}", 0)
-            if gesture_name_on_error in gesture_counts:
-                gesture_counts[gesture_name_on_error]["total"] += 1
+            session.store.post(log_gesture_result, gesture_name_on_error, False, 0, session.mean_fps(), f"Error: {str(e)}", 0)
+            session.store.post(count_gesture, gesture_name_on_error, False)
             return False
-def log_gesture_result(gesture, success, latency, fps, action_status, selenium_latency):
-    global log_buffer, last_log_write, total_frames_processed, frames_with_hands, filtered_distance_history, frame_processing_times
-    hand_detection_accuracy = frames_with_hands / max(total_frames_processed, 1)
-    frame_processing_rate = total_frames_processed / max(total_frames_processed, 1)
-    distance_stability = np.std(list(filtered_distance_history)) if filtered_distance_history else 0
-    avg_frame_processing_time = np.mean(list(frame_processing_times)) if frame_processing_times else 0
-    gesture_success_rate = gesture_counts[gesture]["success"] / max(gesture_counts[gesture]["total"], 1) if gesture_counts[gesture]["total"] > 0 else 0
-    log_buffer.append([
-        time.strftime('%Y-%m-%d %H:%M:%S'),
+
+def log_gesture_result(session, gesture, success, latency, fps, action_status, selenium_latency):
+    hand_detection_accuracy = session.frames_with_hands / max(session.total_frames_processed, 1)
+    frame_processing_rate = session.total_frames_processed / max(session.total_frames_processed, 1)
+    distance_stability = np.std(list(session.filtered_distance_history)) if session.filtered_distance_history else 0
+    avg_frame_processing_time = np.mean(list(session.frame_processing_times)) if session.frame_processing_times else 0
+    counts = session.gesture_counts.get(gesture, {"success": 0, "total": 0})
+    gesture_success_rate = counts["success"] / max(counts["total"], 1) if counts["total"] > 0 else 0
+    # Raw values; SessionLog formats them for the CSV and stores them typed in the columnar log.
+    current_time = time.time()
+    session.log_buffer.append((
+        current_time,
         gesture,
         success,
-        f"{latency:.3f}",
+        latency,
         fps,
         action_status,
-        f"{selenium_latency:.3f}",
-        f"{hand_detection_accuracy:.3f}",
-        f"{frame_processing_rate:.3f}",
-        f"{distance_stability:.6f}",
-        f"{avg_frame_processing_time:.6f}",
-        f"{gesture_success_rate:.3f}"
-    ])
-    current_time = time.time()
-    if current_time - last_log_write >= LOG_WRITE_INTERVAL or len(log_buffer) >= 100:
-        with open(log_file, mode='a', newline='') as f:
-            writer = csv.writer(f)
-            for log_entry in log_buffer:
-                writer.writerow(log_entry)
-        log_buffer.clear()
-        last_log_write = current_time
+        selenium_latency,
+        hand_detection_accuracy,
+        frame_processing_rate,
+        distance_stability,
+        avg_frame_processing_time,
+        gesture_success_rate
+    ))
+    if current_time - session.last_log_write >= LOG_WRITE_INTERVAL or len(session.log_buffer) >= 100:
+        flush_gesture_log(session)
+        session.last_log_write = current_time
 
 def async_action(action_func, *args):
-    """Run a Selenium action in a separate thread to avoid blocking the main loop."""
+    """Run a Selenium action on the shared command executor to avoid blocking the frame path."""
     def wrapper():
-        action_func(*args)
-    threading.Thread(target=wrapper, daemon=True).start()
+        try:
+            action_func(*args)
+        except Exception as e:
+            print(f"Async action error in {action_func.__name__}: {e}")
+    return command_executor.submit(wrapper)
+
+def queue_player_value(session, kind, value):
+    """Send a speed or volume to the player, in order and latest-wins.
 
-def adjust_playback_speed(direction, distance_change=None):
-    global speed_index, current_speed, speed_direction_bias, speed_values, gesture_counts
+    A session has at most one command per kind in flight, so an older value
+    can never land after a newer one; a value queued meanwhile replaces any
+    pending one, which is dropped unsent. Returns a Future with the command's
+    result, or None once it was superseded.
+    """
+    future = Future()
+    superseded = None
+    with session.command_lock:
+        session.command_seq += 1
+        session.issued_seq[kind] = session.command_seq
+        command = (session.command_seq, value, future)
+        if kind in session.commands_busy:
+            superseded = session.pending_commands.get(kind)
+            session.pending_commands[kind] = command
+            command = None
+        else:
+            session.commands_busy.add(kind)
+    if superseded is not None:
+        superseded[2].set_result(None)
+    if command is not None:
+        command_executor.submit(run_player_command, session, kind, command)
+    return future
+
+def run_player_command(session, kind, command):
+    seq, value, future = command
+    change = change_youtube_speed if kind == "speed" else change_youtube_volume
+    try:
+        result = change(session, value, seq)
+    except Exception as e:
+        print(f"Async action error in {change.__name__}: {e}")
+        result = False
+    future.set_result(result)
+    with session.command_lock:
+        command = session.pending_commands.pop(kind, None)
+        if command is None or not processing_active:
+            session.commands_busy.discard(kind)
+            if command is not None:
+                command[2].set_result(None)
+            return
+    command_executor.submit(run_player_command, session, kind, command)
+
+def adjust_playback_speed(session, direction, distance_change=None):
     start_time = time.time()
     if distance_change is not None:
         change_magnitude = abs(distance_change) * 100
         change_probability = min(1.0, change_magnitude ** 1.4 / 35)
         
-        if distance_change > 0 and np.random.random() < change_probability and speed_index < len(speed_values) - 1:
-            speed_index += 1
-            current_speed = speed_values[speed_index]
-            if selenium_active:
-                async_action(change_youtube_speed, current_speed)
+        if distance_change > 0 and np.random.random() < change_probability and session.speed_index < len(speed_values) - 1:
+            session.speed_index += 1
+            session.current_speed = speed_values[session.speed_index]
+            if session.selenium_active:
+                queue_player_value(session, "speed", session.current_speed)
             latency = time.time() - start_time
-            log_gesture_result("Speed Up", True, latency, int(np.mean(fps_values)), f"Speed: {current_speed}x", 0)
-            gesture_counts["Speed Up"]["success"] += 1
-            gesture_counts["Speed Up"]["total"] += 1
-            return current_speed
-        elif distance_change < 0 and np.random.random() < change_probability and speed_index > 0:
-            speed_index -= 1
-            current_speed = speed_values[speed_index]
-            if selenium_active:
-                async_action(change_youtube_speed, current_speed)
+            log_gesture_result(session, "Speed Up", True, latency, session.mean_fps(), f"Speed: {session.current_speed}x", 0)
+            session.gesture_counts["Speed Up"]["success"] += 1
+            session.gesture_counts["Speed Up"]["total"] += 1
+            return session.current_speed
+        elif distance_change < 0 and np.random.random() < change_probability and session.speed_index > 0:
+            session.speed_index -= 1
+            session.current_speed = speed_values[session.speed_index]
+            if session.selenium_active:
+                queue_player_value(session, "speed", session.current_speed)
             latency = time.time() - start_time
-            log_gesture_result("Speed Down", True, latency, int(np.mean(fps_values)), f"Speed: {current_speed}x", 0)
-            gesture_counts["Speed Down"]["success"] += 1
-            gesture_counts["Speed Down"]["total"] += 1
-            return current_speed
+            log_gesture_result(session, "Speed Down", True, latency, session.mean_fps(), f"Speed: {session.current_speed}x", 0)
+            session.gesture_counts["Speed Down"]["success"] += 1
+            session.gesture_counts["Speed Down"]["total"] += 1
+            return session.current_speed
         else:
-            log_gesture_result("Speed Up" if distance_change > 0 else "Speed Down", False, 0, int(np.mean(fps_values)), "No speed change", 0)
-            gesture_counts["Speed Up" if distance_change > 0 else "Speed Down"]["total"] += 1
+            log_gesture_result(session, "Speed Up" if distance_change > 0 else "Speed Down", False, 0, session.mean_fps(), "No speed change", 0)
+            session.gesture_counts["Speed Up" if distance_change > 0 else "Speed Down"]["total"] += 1
     
-    speed_direction_bias += 1.8 if direction == "faster" else -1.8
-    speed_direction_bias = max(-4.0, min(4.0, speed_direction_bias))
+    session.speed_direction_bias += 1.8 if direction == "faster" else -1.8
+    session.speed_direction_bias = max(-4.0, min(4.0, session.speed_direction_bias))
     
     should_change = False
-    if direction == "faster" and speed_index < len(speed_values) - 1:
-        if speed_direction_bias >= 1.2:
-            speed_index += 1
-            speed_direction_bias = 0
+    if direction == "faster" and session.speed_index < len(speed_values) - 1:
+        if session.speed_direction_bias >= 1.2:
+            session.speed_index += 1
+            session.speed_direction_bias = 0
             should_change = True
-    elif direction == "slower" and speed_index > 0:
-        if speed_direction_bias <= -1.2:
-            speed_index -= 1
-            speed_direction_bias = 0
+    elif direction == "slower" and session.speed_index > 0:
+        if session.speed_direction_bias <= -1.2:
+            session.speed_index -= 1
+            session.speed_direction_bias = 0
             should_change = True
     
     if should_change:
-        current_speed = speed_values[speed_index]
-        if selenium_active:
-            async_action(change_youtube_speed, current_speed)
+        session.current_speed = speed_values[session.speed_index]
+        if session.selenium_active:
+            queue_player_value(session, "speed", session.current_speed)
         latency = time.time() - start_time
-        log_gesture_result("Speed Up" if direction == "faster" else "Speed Down", True, latency, int(np.mean(fps_values)), f"Speed: {current_speed}x", 0)
-        gesture_counts["Speed Up" if direction == "faster" else "Speed Down"]["success"] += 1
-        gesture_counts["Speed Up" if direction == "faster" else "Speed Down"]["total"] += 1
+        log_gesture_result(session, "Speed Up" if direction == "faster" else "Speed Down", True, latency, session.mean_fps(), f"Speed: {session.current_speed}x", 0)
+        session.gesture_counts["Speed Up" if direction == "faster" else "Speed Down"]["success"] += 1
+        session.gesture_counts["Speed Up" if direction == "faster" else "Speed Down"]["total"] += 1
     
-    return current_speed
+    return session.current_speed
 
-def adjust_volume(direction, distance_change=None):
-    global current_volume, volume_direction_bias, gesture_counts
+def adjust_volume(session, direction, distance_change=None):
     start_time = time.time()
     if distance_change is not None:
         change_magnitude = abs(distance_change) * 100
         change_probability = min(1.0, change_magnitude ** 1.4 / 35)
         
-        if distance_change > 0 and np.random.random() < change_probability and current_volume < 1.0:
-            new_volume = min(1.0, current_volume + 0.1)
-            if selenium_active:
-                async_action(change_youtube_volume, new_volume)
+        if distance_change > 0 and np.random.random() < change_probability and session.current_volume < 1.0:
+            new_volume = min(1.0, session.current_volume + 0.1)
+            if session.selenium_active:
+                queue_player_value(session, "volume", new_volume)
             latency = time.time() - start_time
-            log_gesture_result("Volume Up", True, latency, int(np.mean(fps_values)), f"Volume: {int(new_volume * 100)}%", 0)
-            gesture_counts["Volume Up"]["success"] += 1
-            gesture_counts["Volume Up"]["total"] += 1
+            log_gesture_result(session, "Volume Up", True, latency, session.mean_fps(), f"Volume: {int(new_volume * 100)}%", 0)
+            session.gesture_counts["Volume Up"]["success"] += 1
+            session.gesture_counts["Volume Up"]["total"] += 1
             return new_volume
-        elif distance_change < 0 and np.random.random() < change_probability and current_volume > 0.0:
-            new_volume = max(0.0, current_volume - 0.1)
-            if selenium_active:
-                async_action(change_youtube_volume, new_volume)
+        elif distance_change < 0 and np.random.random() < change_probability and session.current_volume > 0.0:
+            new_volume = max(0.0, session.current_volume - 0.1)
+            if session.selenium_active:
+                queue_player_value(session, "volume", new_volume)
             latency = time.time() - start_time
-            log_gesture_result("Volume Down", True, latency, int(np.mean(fps_values)), f"Volume: {int(new_volume * 100)}%", 0)
-            gesture_counts["Volume Down"]["success"] += 1
-            gesture_counts["Volume Down"]["total"] += 1
+            log_gesture_result(session, "Volume Down", True, latency, session.mean_fps(), f"Volume: {int(new_volume * 100)}%", 0)
+            session.gesture_counts["Volume Down"]["success"] += 1
+            session.gesture_counts["Volume Down"]["total"] += 1
             return new_volume
         else:
-            log_gesture_result("Volume Up" if distance_change > 0 else "Volume Down", False, 0, int(np.mean(fps_values)), "No volume change", 0)
-            gesture_counts["Volume Up" if distance_change > 0 else "Volume Down"]["total"] += 1
+            log_gesture_result(session, "Volume Up" if distance_change > 0 else "Volume Down", False, 0, session.mean_fps(), "No volume change", 0)
+            session.gesture_counts["Volume Up" if distance_change > 0 else "Volume Down"]["total"] += 1
     
-    volume_direction_bias += 1.8 if direction == "louder" else -1.8
-    volume_direction_bias = max(-4.0, min(4.0, volume_direction_bias))
+    session.volume_direction_bias += 1.8 if direction == "louder" else -1.8
+    session.volume_direction_bias = max(-4.0, min(4.0, session.volume_direction_bias))
     
     should_change = False
-    if direction == "louder" and current_volume < 1.0:
-        if volume_direction_bias >= 1.2:
-            new_volume = min(1.0, current_volume + 0.1)
-            volume_direction_bias = 0
+    if direction == "louder" and session.current_volume < 1.0:
+        if session.volume_direction_bias >= 1.2:
+            new_volume = min(1.0, session.current_volume + 0.1)
+            session.volume_direction_bias = 0
             should_change = True
-    elif direction == "quieter" and current_volume > 0.0:
-        if volume_direction_bias <= -1.2:
-            new_volume = max(0.0, current_volume - 0.1)
-            volume_direction_bias = 0
+    elif direction == "quieter" and session.current_volume > 0.0:
+        if session.volume_direction_bias <= -1.2:
+            new_volume = max(0.0, session.current_volume - 0.1)
+            session.volume_direction_bias = 0
             should_change = True
     
     if should_change:
-        current_volume = new_volume
-        if selenium_active:
-            async_action(change_youtube_volume, new_volume)
+        session.current_volume = new_volume
+        if session.selenium_active:
+            queue_player_value(session, "volume", new_volume)
         latency = time.time() - start_time
-        log_gesture_result("Volume Up" if direction == "louder" else "Volume Down", True, latency, int(np.mean(fps_values)), f"Volume: {int(new_volume * 100)}%", 0)
-        gesture_counts["Volume Up" if direction == "louder" else "Volume Down"]["success"] += 1
-        gesture_counts["Volume Up" if direction == "louder" else "Volume Down"]["total"] += 1
+        log_gesture_result(session, "Volume Up" if direction == "louder" else "Volume Down", True, latency, session.mean_fps(), f"Volume: {int(new_volume * 100)}%", 0)
+        session.gesture_counts["Volume Up" if direction == "louder" else "Volume Down"]["success"] += 1
+        session.gesture_counts["Volume Up" if direction == "louder" else "Volume Down"]["total"] += 1
     
-    return current_volume
+    return session.current_volume
 
-# ======== Main ========
-def main():
-    global processing_active, selenium_active, current_speed, current_volume, prev_left_hand_distance, prev_right_hand_distance
-    global last_speed_change, speed_direction_bias, last_volume_change, volume_direction_bias, action_status
-    global next_gesture_start, pause_gesture_start, log_buffer, last_log_write, total_frames_processed, frames_with_hands
+# ======== Frame Processing ========
+HOLD_CANCEL_STATUS = {
+    "Next": "No both hands detected",
+    "Pause": "Distance not in threshold",
+    "Play": "Distance not in threshold",
+}
+
+def publish_event(session, topic, **fields):
+    if session.events is not None:
+        session.events.publish(topic, session.index, session.frame_timestamp, **fields)
+
+def score_field(score):
+    return None if score is None or np.isnan(score) else round(float(score), 3)
+
+def publish_control_events(session, hand_tracks, hand_scores):
+    """Hand presence and speed/volume target changes since the last frame."""
+    published = session.published_state
+    ids = tuple(hand_tracks[side].id if side in hand_tracks else None for side in ('left', 'right'))
+    if ids != published.get('hands'):
+        published['hands'] = ids
+        publish_event(session, "hands", left=ids[0] is not None, right=ids[1] is not None,
+                      left_id=ids[0], right_id=ids[1])
+    if session.current_speed != published.get('speed'):
+        published['speed'] = session.current_speed
+        publish_event(session, "speed", value=session.current_speed, confidence=score_field(hand_scores.get('left')))
+    if session.current_volume != published.get('volume'):
+        published['volume'] = session.current_volume
+        publish_event(session, "volume", value=round(float(session.current_volume), 3),
+                      confidence=score_field(hand_scores.get('right')))
+
+def handle_hold_gestures(session, frame, left_present, right_present, left_distance, hand_scores, fps):
+    current_time = session.now()
+    events = session.gesture_engine.update(current_time, {
+        "left_present": left_present,
+        "right_present": right_present,
+        "left_distance": left_distance,
+        "left_score": hand_scores.get('left', np.nan),
+        "right_score": hand_scores.get('right', np.nan),
+    })
+    for event in events:
+        if session.events is not None:
+            score = min(hand_scores.values(), default=None) if event.name == "Next" else hand_scores.get('left')
+            publish_event(session, "gesture", name=event.name, kind=event.kind, held=round(event.held, 3),
+                          confidence=score_field(score))
+        if event.kind == "cancel":
+            log_gesture_result(session, event.name, False, 0, fps, HOLD_CANCEL_STATUS[event.name], 0)
+            session.gesture_counts[event.name]["total"] += 1
+        elif event.name == "Next":
+            if current_time - session.last_next_action < session.profile["action_interval"]:
+                continue
+            session.last_next_action = current_time
+            print("Next gesture detected: Both hands raised")
+            async_action(perform_next_action, session)
+        elif session.selenium_active:
+            if current_time - session.last_pause_action < session.profile["action_interval"]:
+                continue
+            session.last_pause_action = current_time
+            # The paused check runs on the command executor, not the frame path.
+            async_action(perform_pause_action, session, event.name == "Pause")
     
-    last_speed_status = ""
-    last_volume_status = ""
-    speed_trend = 0
-    volume_trend = 0
+    h, w = frame.shape[:2]
+    for name, remaining in session.gesture_engine.holding(current_time):
+        if remaining > 0:
+            draw_centered_label(frame, f"{name}: {remaining:.1f}s", (w // 2, 80), 0.6, 2)
+
+def pipeline_latency(result, frame_timestamp):
+    """Capture-to-now latency of a frame result.
+
+    Remote results carry a timestamp from the inference node's clock, so the
+    local part is measured from the receive time and the link latency is
+    added on top; a negative link latency (node clock ahead) counts as zero.
+    """
+    received_at = result.get('received_at')
+    if received_at is None:
+        return time.time() - frame_timestamp
+    return time.time() - received_at + max(received_at - frame_timestamp, 0.0)
+
+def process_frame_result(session, result):
+    """Apply gesture logic for one hand-processor result and draw the HUD.
+
+    Returns the annotated frame, or None when the result carries no frame.
+    """
+    session.store.apply_pending()
+    frame = result.get('frame')
+    fps = result.get('fps', 0)
+    landmarks = result.get('landmarks')
+    
+    if frame is None:
+        return None
+    
+    h, w, _ = frame.shape
+    session.frame_timestamp = result.get('timestamp', time.time())
+    if session.replay_time is None:
+        session.latency.observe("pipeline", pipeline_latency(result, session.frame_timestamp))
+    
+    # Stable identities: each hand keeps its role and filter state across label flips
+    tracks = session.hand_tracker.update(session.now(), list(zip(result.get('hand_sides', []),
+                                                               result.get('hand_scores', []), landmarks)))
+    hand_data = dict(zip((track.side for track in tracks), result.get('hand_data', [])))
+    hand_tracks = {track.side: track for track in tracks}
+    left_hand_data = hand_data.get('left')
+    right_hand_data = hand_data.get('right')
+    
+    # Draw landmarks and labels
+    for hand_landmarks, track in zip(landmarks, tracks):
+        color = (0, 255, 0) if track.side == 'left' else (0, 0, 255)
+        draw_hand_landmarks(frame, hand_landmarks, color)
+        
+        wrist_x, wrist_y = int(hand_landmarks[0, 0] * w), int(hand_landmarks[0, 1] * h)
+        draw_centered_label(frame, f"{track.side.capitalize()} hand #{track.id}", 
+                          (wrist_x, wrist_y - 15), size=0.5, thickness=1)
+    
+    # Next video and pause/play hold gestures
+    left_distance = np.nan
+    if left_hand_data:
+        left_distance = hand_tracks['left'].filter.update(left_hand_data['distance'])
+        session.filtered_distance_history.append(left_distance)
+    hand_scores = {track.side: score for track, score in zip(tracks, result.get('hand_scores', []))}
+    handle_hold_gestures(session, frame, left_hand_data is not None, right_hand_data is not None,
+                         left_distance, hand_scores, fps)
+    
+    # Process playback speed (left hand)
+    if left_hand_data:
+        index_point = left_hand_data['index_point']
+        thumb_point = left_hand_data['thumb_point']
+        left_track = hand_tracks['left']
+        smoothed_distance = predict_distance(left_track.predictor, session, left_distance)
+        
+        # Draw connection between index and thumb for left hand
+        cv2.line(frame, index_point, thumb_point, (0, 255, 255), 2)
+        cv2.circle(frame, index_point, 5, (0, 255, 255), -1)
+        cv2.circle(frame, thumb_point, 5, (0, 255, 255), -1)
+        
+        # Display speed at midpoint
+        mid_x = (index_point[0] + thumb_point[0]) // 2
+        mid_y = (index_point[1] + thumb_point[1]) // 2
+        draw_centered_label(frame, f"{session.current_speed}x", (mid_x, mid_y), size=0.6, thickness=2)
+        
+        # Speed bar
+        speed_bar_x = 50
+        speed_bar_y = (h - 200) // 2
+        speed_bar_h = 200
+        speed_bar_w = 30
+        
+        normalized_speed = (session.speed_index / (len(speed_values) - 1))
+        hud.draw_bar(frame, speed_bar_x, speed_bar_y, speed_bar_w, speed_bar_h,
+                     normalized_speed, (255, 165, 0))
+        
+        draw_centered_label(frame, f"{session.current_speed}x", 
+                          (speed_bar_x + speed_bar_w // 2, speed_bar_y + speed_bar_h + 15), 0.5, 1)
+        
+        current_time = session.now()
+        
+        # Process speed control
+        if left_track.prev_distance is not None:
+            distance_change = smoothed_distance - left_track.prev_distance
+            
+            if abs(distance_change) > 0.005:
+                session.speed_trend = 1 if distance_change > 0 else -1
+            else:
+                session.speed_trend = 0
+            
+            dynamic_threshold = speed_step_threshold(distance_change, session.profile)
+            
+            if session.speed_control is not None:
+                apply_absolute_speed(session, smoothed_distance, current_time, fps)
+            elif current_time - session.last_speed_change > session.profile["speed_change_interval"]:
+                if abs(distance_change) > dynamic_threshold and \
+                   abs(smoothed_distance - session.profile["threshold_close"]) > 0.02:
+                    direction = "faster" if distance_change > 0 else "slower"
+                    old_speed = session.current_speed
+                    session.current_speed = adjust_playback_speed(session, direction, distance_change)
+                    session.speed_corrections.record(current_time, old_speed, session.current_speed)
+                    
+                    if session.current_speed != old_speed:
+                        session.last_speed_status = "Speed up" if session.current_speed > old_speed else "Slow down"
+                    session.last_speed_change = current_time
+            
+            if session.speed_trend > 0:
+                draw_centered_label(frame, "▲", 
+                                 (speed_bar_x + speed_bar_w // 2, speed_bar_y - 15), 0.7, 2)
+            elif session.speed_trend < 0:
+                draw_centered_label(frame, "▼", 
+                                 (speed_bar_x + speed_bar_w // 2, speed_bar_y - 15), 0.7, 2)
+        
+        left_track.prev_distance = smoothed_distance
+        
+        if session.last_speed_status:
+            color = (255, 165, 0) if session.last_speed_status == "Speed up" else (0, 165, 255)
+            draw_centered_label(frame, session.last_speed_status, 
+                             (speed_bar_x + speed_bar_w // 2, speed_bar_y - 35), 0.5, 1)
+    
+    # Volume control (right hand)
+    if right_hand_data:
+        index_point = right_hand_data['index_point']
+        thumb_point = right_hand_data['thumb_point']
+        distance = right_hand_data['distance']
+        right_track = hand_tracks['right']
+        
+        smoothed_distance = predict_distance(right_track.predictor, session,
+                                             right_track.filter.update(distance))
+        
+        # Draw connection between index and thumb for right hand
+        cv2.line(frame, index_point, thumb_point, (0, 255, 255), 2)
+        cv2.circle(frame, index_point, 5, (0, 255, 255), -1)
+        cv2.circle(frame, thumb_point, 5, (0, 255, 255), -1)
+        
+        # Display volume at midpoint
+        mid_x = (index_point[0] + thumb_point[0]) // 2
+        mid_y = (index_point[1] + thumb_point[1]) // 2
+        draw_centered_label(frame, f"{int(session.current_volume * 100)}%", (mid_x, mid_y), size=0.6, thickness=2)
+        
+        # Volume bar
+        volume_bar_x = w - 80
+        volume_bar_y = (h - 200) // 2
+        volume_bar_h = 200
+        volume_bar_w = 30
+        
+        hud.draw_bar(frame, volume_bar_x, volume_bar_y, volume_bar_w, volume_bar_h,
+                     session.current_volume, (0, 255, 255))
+        
+        draw_centered_label(frame, f"{int(session.current_volume * 100)}%", 
+                          (volume_bar_x + volume_bar_w // 2, volume_bar_y + volume_bar_h + 15), 0.5, 1)
+        
+        # Process volume control
+        current_time = session.now()
+        
+        if right_track.prev_distance is not None:
+            distance_change = smoothed_distance - right_track.prev_distance
+            
+            if abs(distance_change) > session.profile["volume_change_threshold"]:
+                session.volume_trend = 1 if distance_change > 0 else -1
+            else:
+                session.volume_trend = 0
+            
+            if session.volume_control is not None:
+                apply_absolute_volume(session, smoothed_distance, current_time, fps)
+            elif current_time - session.last_volume_change > session.profile["volume_change_interval"]:
+                if abs(distance_change) > session.profile["volume_change_threshold"]:
+                    direction = "louder" if distance_change > 0 else "quieter"
+                    old_volume = session.current_volume
+                    session.current_volume = adjust_volume(session, direction, distance_change)
+                    session.volume_corrections.record(current_time, old_volume, session.current_volume)
+                    
+                    if session.current_volume != old_volume:
+                        session.last_volume_status = "Volume up" if session.current_volume > old_volume else "Volume down"
+                    session.last_volume_change = current_time
+            
+            if session.volume_trend > 0:
+                draw_centered_label(frame, "🔊", 
+                                 (volume_bar_x + volume_bar_w // 2, volume_bar_y - 15), 0.7, 2)
+            elif session.volume_trend < 0:
+                draw_centered_label(frame, "🔉", 
+                                 (volume_bar_x + volume_bar_w // 2, volume_bar_y - 15), 0.7, 2)
+        
+        right_track.prev_distance = smoothed_distance
+        
+        if session.last_volume_status:
+            color = (0, 255, 255)
+            draw_centered_label(frame, session.last_volume_status, 
+                             (volume_bar_x + volume_bar_w // 2, volume_bar_y - 35), 0.5, 1)
+    
+    # Display action status
+    if session.action_status:
+        draw_centered_label(frame, session.action_status, (w // 2, 50), 0.6, 2)
     
-    # Initialize log file
-    with open(log_file, mode='w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(["Timestamp", "Gesture", "Success", "Latency", "FPS", "Action Status", "Selenium Latency", 
-                         "Hand Detection Accuracy", "Frame Processing Rate", "Distance Stability", "Frame Processing Time", 
-                         "Gesture Success Rate"])
+    # Display FPS and status
+    hud.draw_text(frame, f"FPS: {fps}", (w - 80, 20), 0.6, (255, 255, 255), 1)
+    if session.link_latency is not None:
+        hud.draw_text(frame, f"Link: {session.link_latency * 1000:.0f} ms", (w - 110, 40), 0.5, (255, 255, 255), 1)
+    if session.hand_tracker.make_predictor is not None:
+        hud.draw_text(frame, f"Lead: {session.latency.total() * 1000:.0f} ms", (w - 110, 60), 0.5, (255, 255, 255), 1)
+    status_text = "Connected" if session.selenium_active else "Disconnected"
+    status_color = (0, 255, 0) if session.selenium_active else (0, 0, 255)
+    hud.draw_static(frame, (
+        (f"Using {session.browser_type.capitalize()}", (10, 20), 0.5, (255, 255, 255), 1),
+        (f"YouTube: {status_text}", (10, h - 10), 0.5, status_color, 1),
+    ))
     
-    if not setup_selenium():
-        print("⚠️ Trình duyệt không kết nối được hoặc không mở video.")
+    if isinstance(session.backend, SeleniumBackend) and session.selenium_active:
+        now = time.time()
+        if now - session.last_telemetry_fetch >= TELEMETRY_FETCH_INTERVAL:
+            session.last_telemetry_fetch = now
+            async_action(fetch_page_telemetry, session)
+    if session.events is not None:
+        publish_control_events(session, hand_tracks, hand_scores)
+    session.store.publish()
+    return frame
+
+def predict_distance(predictor, session, distance):
+    """Project a smoothed distance forward by the measured capture-to-browser latency."""
+    if predictor is None:
+        return distance
+    return predictor.update(session.now(), distance, session.latency.total())
+
+def configure_absolute_control(session, speed_range, volume_range):
+    if speed_range is None:
+        # Between the station's pause and play thresholds, so the band never overlaps the holds.
+        speed_range = (session.profile["threshold_close"], session.profile["threshold_open"])
+    session.speed_control = AbsoluteControl(
+        speed_values, ControlCurve.linear(*speed_range), initial=session.current_speed)
+    session.volume_control = AbsoluteControl(
+        volume_levels, ControlCurve.linear(*volume_range), initial=round(session.current_volume, 1))
+
+def apply_absolute_speed(session, distance, current_time, fps):
+    control = session.speed_control
+    low, high = control.curve.points[0][0], control.curve.points[-1][0]
+    if low <= distance <= high:
+        target, new_speed = control.update(current_time, distance)
+    else:
+        # Outside the calibrated band the pinch belongs to the pause/play holds: the
+        # distance no longer moves the target, but the last one still settles and is sent.
+        new_speed = control.settle(current_time)
+    if new_speed is None or new_speed == session.current_speed:
         return
+    gesture = "Speed Up" if new_speed > session.current_speed else "Speed Down"
+    session.speed_corrections.record(current_time, session.current_speed, new_speed)
+    session.speed_index = speed_values.index(new_speed)
+    session.current_speed = new_speed
+    if session.selenium_active:
+        queue_player_value(session, "speed", new_speed)
+    log_gesture_result(session, gesture, True, 0, fps, f"Speed: {new_speed}x", 0)
+    session.gesture_counts[gesture]["success"] += 1
+    session.gesture_counts[gesture]["total"] += 1
+    session.last_speed_status = "Speed up" if gesture == "Speed Up" else "Slow down"
+    session.last_speed_change = current_time
+
+def apply_absolute_volume(session, distance, current_time, fps):
+    target, new_volume = session.volume_control.update(current_time, distance)
+    if new_volume is None or abs(new_volume - session.current_volume) < 0.01:
+        return
+    gesture = "Volume Up" if new_volume > session.current_volume else "Volume Down"
+    session.volume_corrections.record(current_time, session.current_volume, new_volume)
+    session.current_volume = new_volume
+    if session.selenium_active:
+        queue_player_value(session, "volume", new_volume)
+    log_gesture_result(session, gesture, True, 0, fps, f"Volume: {int(new_volume * 100)}%", 0)
+    session.gesture_counts[gesture]["success"] += 1
+    session.gesture_counts[gesture]["total"] += 1
+    session.last_volume_status = "Volume up" if gesture == "Volume Up" else "Volume down"
+    session.last_volume_change = current_time
+
+# ======== Main ========
+def init_gesture_log(session, max_bytes=20 * 1024 * 1024, max_age=0, keep=20, binary=False):
+    # Appends to the existing log; rotated files are gzipped in the background.
+    session.log = SessionLog(session.log_file, session.session_id, max_bytes=max_bytes, max_age=max_age,
+                             keep=keep, binary=binary)
+    print(f"📝 {session.name}: session {session.session_id}, logging to {session.log_file}")
+
+def flush_gesture_log(session):
+    if session.log_buffer:
+        try:
+            session.log.write(session.log_buffer)
+        except OSError as e:
+            print(f"Could not write gesture log: {e}")
+        session.log_buffer.clear()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Control YouTube playback with hand gestures.")
+    parser.add_argument("--camera", type=int, action="append", dest="cameras",
+                        help="Camera index; repeat to run one session per camera (default: 0)")
+    parser.add_argument("--camera-backend", choices=["auto"] + sorted(CAMERA_BACKENDS), default="auto",
+                        help="OpenCV capture backend (auto: v4l2 on Linux, dshow on Windows, avfoundation on macOS)")
+    parser.add_argument("--max-frame-age", type=float, default=MAX_FRAME_AGE,
+                        help="Drop camera frames older than this many seconds when inference starts, 0 = never")
+    parser.add_argument("--url", action="append", dest="urls",
+                        help="YouTube URL for the session with the same position; prompted for when omitted")
+    parser.add_argument("--browser", default=browser_type, choices=["brave", "chrome"],
+                        help="Browser to launch for each session")
+    parser.add_argument("--attach", metavar="HOST:PORT", action="append", dest="attach_addresses",
+                        help="Attach to a browser started with --remote-debugging-port instead of launching one; "
+                             "the YouTube tab (or the one playing --url) is found automatically")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Hand inference worker threads shared by all sessions (default: CPU count)")
+    parser.add_argument("--inference-node", metavar="HOST:PORT", type=parse_address,
+                        help="Only capture and detect hands, streaming landmarks to the controller at HOST:PORT")
+    parser.add_argument("--source-id", type=int, default=0,
+                        help="Session index this inference node feeds on the controller")
+    parser.add_argument("--listen", metavar="HOST:PORT", type=parse_address,
+                        help="Take landmarks from inference nodes instead of local cameras")
+    parser.add_argument("--reorder-delay", type=float, default=0.0,
+                        help="Seconds to hold out-of-order landmark packets before counting them lost")
+    parser.add_argument("--record", metavar="FILE",
+                        help="Record hand-processor output to FILE (session index is appended for extra sessions)")
+    parser.add_argument("--replay", metavar="FILE", action="append", dest="replays",
+                        help="Replay a landmark recording instead of a camera; repeat for more sessions")
+    parser.add_argument("--replay-speed", type=float, default=1.0,
+                        help="Replay speed as a multiple of real time, 0 = as fast as possible")
+    parser.add_argument("--no-browser", action="store_true",
+                        help="Do not start a browser; gestures are evaluated and logged only")
+    parser.add_argument("--control-mode", choices=["relative", "absolute"], default="relative",
+                        help="relative: step speed/volume on pinch movement; "
+                             "absolute: pinch distance maps directly to a target level")
+    parser.add_argument("--speed-range", type=parse_range, default=None,
+                        metavar="LOW,HIGH", help="Pinch distances mapped to the slowest and fastest speed (absolute mode; "
+                                                 "default: the profile's pause/play thresholds)")
+    parser.add_argument("--volume-range", type=parse_range, default=(0.03, 0.25),
+                        metavar="LOW,HIGH", help="Pinch distances mapped to 0%% and 100%% volume (absolute mode)")
+    parser.add_argument("--backend", choices=["selenium", "mpv"], default="selenium",
+                        help="Player to control: YouTube in a browser, or a local mpv over JSON IPC")
+    parser.add_argument("--mpv-socket", default="/tmp/mpvsocket",
+                        help="mpv --input-ipc-server path (session index is appended for extra sessions)")
+    parser.add_argument("--transport", choices=["webdriver", "devtools"], default="webdriver",
+                        help="Send player commands through WebDriver, or over a persistent DevTools WebSocket")
+    parser.add_argument("--latency-compensation", action="store_true",
+                        help="Extrapolate pinch distances by the measured pipeline and browser latency "
+                             "before deciding speed/volume")
+    parser.add_argument("--hold-mode", choices=["timer", "evidence"], default="timer",
+                        help="timer: hold gestures for their full duration; "
+                             "evidence: confirm clear poses early, falling back to the timer")
+    parser.add_argument("--false-trigger-bound", type=float, default=0.01,
+                        help="Target false-trigger probability for early confirmation (evidence mode)")
+    parser.add_argument("--profile", metavar="FILE", action="append", dest="profile_paths",
+                        help="Tuned gesture parameters from autotune.py; repeat per session (the last one covers the rest)")
+    parser.add_argument("--health-interval", type=float, default=HEALTH_CHECK_INTERVAL,
+                        help="Seconds between browser heartbeats that re-inject the controller or restart "
+                             "a crashed browser, 0 = off")
+    parser.add_argument("--log-max-mb", type=float, default=20.0,
+                        help="Rotate the gesture log at this size in MB, 0 = never")
+    parser.add_argument("--log-rotate-hours", type=float, default=0.0,
+                        help="Rotate the gesture log when its first row is this many hours old, 0 = never")
+    parser.add_argument("--log-keep", type=int, default=20,
+                        help="Compressed rotated logs to keep per session, 0 = all")
+    parser.add_argument("--log-binary", action="store_true",
+                        help="Also write a columnar binary log (logs/gesture_log.gcol) next to the CSV")
+    parser.add_argument("--preview", metavar="HOST:PORT", type=parse_address,
+                        help="Serve an MJPEG preview of the annotated frames over HTTP (e.g. 0.0.0.0:8080)")
+    parser.add_argument("--preview-fps", type=float, default=10.0,
+                        help="Frame rate cap of the preview stream")
+    parser.add_argument("--events", metavar="HOST:PORT|PATH", type=parse_event_address,
+                        help="Publish gesture/speed/volume/hand events as JSON lines on a local socket")
+    parser.add_argument("--headless", action="store_true",
+                        help="No OpenCV windows; stop with Ctrl+C (combine with --preview to watch)")
+    parser.add_argument("--gc", choices=["auto", "stats", "scheduled"], default="auto",
+                        help="auto: Python's default collector; stats: also print GC pause and frame-time "
+                             "histograms at exit; scheduled: freeze startup objects and run full "
+                             "collections between frames (prints the histograms too)")
+    parser.add_argument("--gc-interval", type=float, default=5.0,
+                        help="Seconds between deferred full collections (--gc scheduled)")
+    args = parser.parse_args(argv)
+    try:
+        args.profiles = [load_profile(path) for path in args.profile_paths or []]
+    except (OSError, ValueError) as e:
+        parser.error(f"--profile: {e}")
+    return args
+
+def build_sessions(args):
+    sources = args.replays or args.cameras or [0]
+    urls = args.urls or []
+    sessions = []
+    for i, source in enumerate(sources):
+        session = ControllerSession(index=i, camera_index=source if not args.replays else None,
+                                    video_url=urls[i] if i < len(urls) else None,
+                                    browser_type=args.browser, transport=args.transport)
+        session.health_interval = args.health_interval
+        session.camera_backend = args.camera_backend
+        session.max_frame_age = args.max_frame_age
+        if args.attach_addresses and i < len(args.attach_addresses):
+            session.attach_address = args.attach_addresses[i]
+        if args.profiles:
+            # One profile per session; the last one covers any sessions beyond.
+            session.profile = dict(args.profiles[min(i, len(args.profiles) - 1)])
+        session.gesture_engine = GestureEngine(profile_rules(session.profile, hold_mode=args.hold_mode,
+                                                             false_trigger_bound=args.false_trigger_bound))
+        if args.latency_compensation:
+            session.hand_tracker.make_predictor = Extrapolator
+        if args.record:
+            root, ext = os.path.splitext(args.record)
+            session.recorder = LandmarkRecorder(args.record if i == 0 else f"{root}_{i}{ext}")
+        sessions.append(session)
+    return sessions
+
+def main(argv=None):
+    global processing_active
+    args = parse_args(argv)
+    if args.inference_node:
+        session = ControllerSession(index=args.source_id, camera_index=(args.cameras or [0])[0])
+        session.camera_backend = args.camera_backend
+        session.max_frame_age = args.max_frame_age
+        if args.record:
+            session.recorder = LandmarkRecorder(args.record)
+        run_inference_node(session, args.inference_node, args.workers)
+        return
+    sessions = build_sessions(args)
+    
+    ready_sessions = []
+    for session in sessions:
+        init_gesture_log(session, max_bytes=int(args.log_max_mb * 1024 * 1024),
+                         max_age=args.log_rotate_hours * 3600, keep=args.log_keep, binary=args.log_binary)
+        if args.no_browser:
+            ready_sessions.append(session)
+        elif args.backend == "mpv":
+            if setup_mpv(session, args.mpv_socket if session.index == 0 else f"{args.mpv_socket}_{session.index}"):
+                ready_sessions.append(session)
+        elif setup_selenium(session):
+            ready_sessions.append(session)
+        else:
+            print(f"⚠️ Trình duyệt không kết nối được hoặc không mở video ({session.name}).")
+    if not ready_sessions:
+        return
+    sessions = ready_sessions
+    if args.control_mode == "absolute":
+        for session in sessions:
+            configure_absolute_control(session, args.speed_range, args.volume_range)
     
     print("\n===== USER INTENT =====")
     print("YouTube playback speed and pause/play control (left hand):")
     print("- Increase speed: Move thumb and index finger apart")
     print("- Decrease speed: Pinch thumb and index finger closer (but not too close)")
-    print("- Pause: Pinch thumb and index finger close together for 0.7s")
-    print("- Play: Spread thumb and index finger apart for 0.7s")
-    print("- Next video: Raise both hands for 1.0s")
+    print(f"- Pause: Pinch thumb and index finger close together for {sessions[0].profile['pause_duration']:.1f}s")
+    print(f"- Play: Spread thumb and index finger apart for {sessions[0].profile['pause_duration']:.1f}s")
+    print(f"- Next video: Raise both hands for {sessions[0].profile['next_duration']:.1f}s")
     print("Volume control (right hand):")
     print("- Increase volume: Move thumb and index finger apart")
     print("- Decrease volume: Pinch thumb and index finger closer")
-    print("\nSystem ready! Press ESC to exit.")
-    
-    camera_thread = threading.Thread(target=camera_reader, daemon=True)
-    processor_thread = threading.Thread(target=hand_processor, daemon=True)
-    camera_thread.start()
-    processor_thread.start()
+    print("\nSystem ready! Press Ctrl+C to exit." if args.headless else "\nSystem ready! Press ESC to exit.")
     
-    cv2.namedWindow("Hand Controller", cv2.WINDOW_NORMAL)
+    pool = InferencePool(args.workers)
+    receiver = None
+    preview = None
+    events = None
+    if args.events:
+        events = EventPublisher(args.events).start()
+        for session in sessions:
+            session.events = events
+        print(f"Publishing events on {events.address}")
+    if args.preview:
+        preview = PreviewServer(args.preview, [session.name for session in sessions], max_fps=args.preview_fps).start()
+        print(f"Preview at {preview.url}")
+    print(f"Running {len(sessions)} session(s) on {pool.workers} inference worker(s).")
+    if args.listen:
+        receiver = start_landmark_receiver(sessions, pool, args.listen, args.reorder_delay)
+    for session in sessions:
+        if args.replays:
+            recording = open_recording(args.replays[session.index])
+            threading.Thread(target=replay_reader, args=(session, recording, args.replay_speed), daemon=True).start()
+        elif not args.listen:
+            session.hands = create_hands()
+            threading.Thread(target=camera_reader, args=(session, pool), daemon=True).start()
+        if not args.headless:
+            cv2.namedWindow(session.window_name, cv2.WINDOW_NORMAL)
+    gc_scheduler = None
+    if args.gc != "auto":
+        # After startup, so the browser driver and MediaPipe graphs are frozen with the rest.
+        gc_scheduler = GcScheduler(scheduled=args.gc == "scheduled", full_interval=args.gc_interval).enable()
+        for session in sessions:
+            session.gc_scheduler = gc_scheduler
     
     try:
         while processing_active:
-            try:
-                result = result_queue.get(timeout=0.03)
-                frame = result.get('frame')
-                fps = result.get('fps', 0)
-                landmarks = result.get('landmarks')
-                hand_sides = result.get('hand_sides')
-                left_hand_data = result.get('left_hand_data')
-                right_hand_data = result.get('right_hand_data')
-                
-                if frame is None:
+            shown = False
+            for session in sessions:
+                try:
+                    frame = session.result_queue.get_nowait()
+                except queue.Empty:
                     continue
-                
-                h, w, _ = frame.shape
-                
-                # Draw landmarks and labels
-                for hand_landmarks, hand_side in zip(landmarks, hand_sides):
-                    color = (0, 255, 0) if hand_side == 'left' else (0, 0, 255)
-                    mp_drawing.draw_landmarks(
-                        frame, 
-                        hand_landmarks, 
-                        mp_hands.HAND_CONNECTIONS,
-                        mp_drawing.DrawingSpec(color=color, thickness=2, circle_radius=5),
-                        mp_drawing.DrawingSpec(color=color, thickness=2)
-                    )
-                    
-                    wrist = hand_landmarks.landmark[0]
-                    wrist_x, wrist_y = int(wrist.x * w), int(wrist.y * h)
-                    draw_centered_label(frame, f"{hand_side.capitalize()} hand", 
-                                      (wrist_x, wrist_y - 15), size=0.5, thickness=1)
-                
-                # Process playback speed, pause/play, and next video (left hand)
-                if left_hand_data:
-                    index_point = left_hand_data['index_point']
-                    thumb_point = left_hand_data['thumb_point']
-                    distance = left_hand_data['distance']
-                    
-                    smoothed_distance = left_hand_filter.update(distance)
-                    filtered_distance_history.append(smoothed_distance)
-                    
-                    # Draw connection between index and thumb for left hand
-                    cv2.line(frame, index_point, thumb_point, (0, 255, 255), 2)
-                    cv2.circle(frame, index_point, 5, (0, 255, 255), -1)
-                    cv2.circle(frame, thumb_point, 5, (0, 255, 255), -1)
-                    
-                    # Display speed at midpoint
-                    mid_x = (index_point[0] + thumb_point[0]) // 2
-                    mid_y = (index_point[1] + thumb_point[1]) // 2
-                    draw_centered_label(frame, f"{current_speed}x", (mid_x, mid_y), size=0.6, thickness=2)
-                    
-                    # Speed bar
-                    speed_bar_x = 50
-                    speed_bar_y = (h - 200) // 2
-                    speed_bar_h = 200
-                    speed_bar_w = 30
-                    
-                    cv2.rectangle(frame, (speed_bar_x, speed_bar_y), 
-                                (speed_bar_x + speed_bar_w, speed_bar_y + speed_bar_h), 
-                                (200, 200, 200), -1)
-                    
-                    normalized_speed = (speed_index / (len(speed_values) - 1))
-                    fill_h = int(speed_bar_h * normalized_speed)
-                    cv2.rectangle(frame, (speed_bar_x, speed_bar_y + speed_bar_h - fill_h), 
-                                (speed_bar_x + speed_bar_w, speed_bar_y + speed_bar_h),
-                                (255, 165, 0), -1)
-                    
-                    draw_centered_label(frame, f"{current_speed}x", 
-                                      (speed_bar_x + speed_bar_w // 2, speed_bar_y + speed_bar_h + 15), 0.5, 1)
-                    
-                    # Next video detection (both hands raised)
-                    current_time = time.time()
-                    
-                    if left_hand_data and right_hand_data:
-                        print(f"Next gesture detected: Both hands raised")
-                        if next_gesture_start is None:
-                            next_gesture_start = current_time
-                        elif current_time - next_gesture_start >= NEXT_GESTURE_DURATION and \
-                             current_time - last_next_action >= MIN_ACTION_INTERVAL:
-                            async_action(perform_next_action)
-                            next_gesture_start = None
-                        if next_gesture_start is not None:
-                            remaining = NEXT_GESTURE_DURATION - (current_time - next_gesture_start)
-                            if remaining > 0:
-                                draw_centered_label(frame, f"Next: {remaining:.1f}s", (w // 2, 80), 0.6, 2)
-                    elif next_gesture_start is not None:
-                        log_gesture_result("Next", False, 0, fps, "No both hands detected", 0)
-                        gesture_counts["Next"]["total"] += 1
-                        next_gesture_start = None
-                    
-                    # Pause/Play detection
-                    if smoothed_distance < PAUSE_THRESHOLD_CLOSE:
-                        if pause_gesture_start is None:
-                            pause_gesture_start = current_time
-                        elif current_time - pause_gesture_start >= PAUSE_GESTURE_DURATION and \
-                             current_time - last_pause_action >= MIN_ACTION_INTERVAL:
-                            if selenium_active:
-                                video = WebDriverWait(driver, 5).until(
-                                    EC.presence_of_element_located((By.TAG_NAME, "video"))
-                                )
-                                is_paused = driver.execute_script("return arguments[0].paused;", video)
-                                if not is_paused:
-                                    async_action(perform_pause_action)
-                                    pause_gesture_start = None
-                        if pause_gesture_start is not None:
-                            remaining = PAUSE_GESTURE_DURATION - (current_time - pause_gesture_start)
-                            if remaining > 0:
-                                draw_centered_label(frame, f"Pause: {remaining:.1f}s", (w // 2, 80), 0.6, 2)
-                    elif smoothed_distance > PAUSE_THRESHOLD_OPEN:
-                        if pause_gesture_start is None:
-                            pause_gesture_start = current_time
-                        elif current_time - pause_gesture_start >= PAUSE_GESTURE_DURATION and \
-                             current_time - last_pause_action >= MIN_ACTION_INTERVAL:
-                            if selenium_active:
-                                video = WebDriverWait(driver, 5).until(
-                                    EC.presence_of_element_located((By.TAG_NAME, "video"))
-                                )
-                                is_paused = driver.execute_script("return arguments[0].paused;", video)
-                                if is_paused:
-                                    async_action(perform_pause_action)
-                                    pause_gesture_start = None
-                        if pause_gesture_start is not None:
-                            remaining = PAUSE_GESTURE_DURATION - (current_time - pause_gesture_start)
-                            if remaining > 0:
-                                draw_centered_label(frame, f"Play: {remaining:.1f}s", (w // 2, 80), 0.6, 2)
-                    elif pause_gesture_start is not None:
-                        log_gesture_result("Pause" if smoothed_distance < PAUSE_THRESHOLD_CLOSE else "Play", False, 0, fps, "Distance not in threshold", 0)
-                        gesture_counts["Pause" if smoothed_distance < PAUSE_THRESHOLD_CLOSE else "Play"]["total"] += 1
-                        pause_gesture_start = None
-                    
-                    # Process speed control
-                    if prev_left_hand_distance is not None:
-                        distance_change = smoothed_distance - prev_left_hand_distance
-                        
-                        if abs(distance_change) > 0.005:
-                            speed_trend = 1 if distance_change > 0 else -1
-                        else:
-                            speed_trend = 0
-                        
-                        dynamic_threshold = 0.0025 + 0.002 * (1 - abs(distance_change) * 12)
-                        dynamic_threshold = max(0.002, min(0.005, dynamic_threshold))
-                        
-                        if current_time - last_speed_change > MIN_SPEED_CHANGE_INTERVAL:
-                            if abs(distance_change) > dynamic_threshold and \
-                               abs(smoothed_distance - PAUSE_THRESHOLD_CLOSE) > 0.02:
-                                direction = "faster" if distance_change > 0 else "slower"
-                                old_speed = current_speed
-                                current_speed = adjust_playback_speed(direction, distance_change)
-                                
-                                if current_speed != old_speed:
-                                    last_speed_status = "Speed up" if current_speed > old_speed else "Slow down"
-                                last_speed_change = current_time
-                        
-                        if speed_trend > 0:
-                            draw_centered_label(frame, "▲", 
-                                             (speed_bar_x + speed_bar_w // 2, speed_bar_y - 15), 0.7, 2)
-                        elif speed_trend < 0:
-                            draw_centered_label(frame, "▼", 
-                                             (speed_bar_x + speed_bar_w // 2, speed_bar_y - 15), 0.7, 2)
-                    
-                    prev_left_hand_distance = smoothed_distance
-                    
-                    if last_speed_status:
-                        color = (255, 165, 0) if last_speed_status == "Speed up" else (0, 165, 255)
-                        draw_centered_label(frame, last_speed_status, 
-                                         (speed_bar_x + speed_bar_w // 2, speed_bar_y - 35), 0.5, 1)
-                
-                # Volume control (right hand)
-                if right_hand_data:
-                    index_point = right_hand_data['index_point']
-                    thumb_point = right_hand_data['thumb_point']
-                    distance = right_hand_data['distance']
-                    current_volume = right_hand_data['volume']
-                    
-                    smoothed_distance = right_hand_filter.update(distance)
-                    
-                    # Draw connection between index and thumb for right hand
-                    cv2.line(frame, index_point, thumb_point, (0, 255, 255), 2)
-                    cv2.circle(frame, index_point, 5, (0, 255, 255), -1)
-                    cv2.circle(frame, thumb_point, 5, (0, 255, 255), -1)
-                    
-                    # Display volume at midpoint
-                    mid_x = (index_point[0] + thumb_point[0]) // 2
-                    mid_y = (index_point[1] + thumb_point[1]) // 2
-                    draw_centered_label(frame, f"{int(current_volume * 100)}%", (mid_x, mid_y), size=0.6, thickness=2)
-                    
-                    # Volume bar
-                    volume_bar_x = w - 80
-                    volume_bar_y = (h - 200) // 2
-                    volume_bar_h = 200
-                    volume_bar_w = 30
-                    
-                    cv2.rectangle(frame, (volume_bar_x, volume_bar_y), 
-                                (volume_bar_x + volume_bar_w, volume_bar_y + volume_bar_h), 
-                                (200, 200, 200), -1)
-                    
-                    fill_h = int(volume_bar_h * current_volume)
-                    cv2.rectangle(frame, (volume_bar_x, volume_bar_y + volume_bar_h - fill_h), 
-                                (volume_bar_x + volume_bar_w, volume_bar_y + volume_bar_h),
-                                (0, 255, 255), -1)
-                    
-                    draw_centered_label(frame, f"{int(current_volume * 100)}%", 
-                                      (volume_bar_x + volume_bar_w // 2, volume_bar_y + volume_bar_h + 15), 0.5, 1)
-                    
-                    # Process volume control
-                    current_time = time.time()
-                    
-                    if prev_right_hand_distance is not None:
-                        distance_change = smoothed_distance - prev_right_hand_distance
-                        
-                        if abs(distance_change) > VOLUME_CHANGE_THRESHOLD:
-                            volume_trend = 1 if distance_change > 0 else -1
-                        else:
-                            volume_trend = 0
-                        
-                        if current_time - last_volume_change > MIN_VOLUME_CHANGE_INTERVAL:
-                            if abs(distance_change) > VOLUME_CHANGE_THRESHOLD:
-                                direction = "louder" if distance_change > 0 else "quieter"
-                                old_volume = current_volume
-                                current_volume = adjust_volume(direction, distance_change)
-                                
-                                if current_volume != old_volume:
-                                    last_volume_status = "Volume up" if current_volume > old_volume else "Volume down"
-                                last_volume_change = current_time
-                        
-                        if volume_trend > 0:
-                            draw_centered_label(frame, "🔊", 
-                                             (volume_bar_x + volume_bar_w // 2, volume_bar_y - 15), 0.7, 2)
-                        elif volume_trend < 0:
-                            draw_centered_label(frame, "🔉", 
-                                             (volume_bar_x + volume_bar_w // 2, volume_bar_y - 15), 0.7, 2)
-                    
-                    prev_right_hand_distance = smoothed_distance
-                    
-                    if last_volume_status:
-                        color = (0, 255, 255)
-                        draw_centered_label(frame, last_volume_status, 
-                                         (volume_bar_x + volume_bar_w // 2, volume_bar_y - 35), 0.5, 1)
-                
-                # Display action status
-                if action_status:
-                    draw_centered_label(frame, action_status, (w // 2, 50), 0.6, 2)
-                
-                # Display FPS and status
-                cv2.putText(frame, f"FPS: {fps}", (w - 80, 20),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-                cv2.putText(frame, f"Using {browser_type.capitalize()}", (10, 20),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-                status_text = "Connected" if selenium_active else "Disconnected"
-                status_color = (0, 255, 0) if selenium_active else (0, 0, 255)
-                cv2.putText(frame, f"YouTube: {status_text}", (10, h - 10),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, status_color, 1)
-                
-                cv2.imshow("Hand Controller", frame)
-                
-                if cv2.waitKey(1) & 0xFF == 27:
-                    processing_active = False
+                if preview is not None:
+                    preview.publish(session.index, frame)
+                if not args.headless:
+                    cv2.imshow(session.window_name, frame)
+                shown = True
             
-            except queue.Empty:
-                if cv2.waitKey(1) & 0xFF == 27:
-                    processing_active = False
-            except Exception as e:
-                print(f"⚠️ Lỗi trong vòng lặp chính: {e}")
-                log_gesture_result("System", False, 0, fps, f"Main loop error: {str(e)}", 0)
-                time.sleep(0.1)
+            if not args.headless and cv2.waitKey(1) & 0xFF == 27:
+                processing_active = False
+            if all(session.source_finished for session in sessions):
+                processing_active = False
+            if not shown:
+                if gc_scheduler is not None:
+                    gc_scheduler.idle()
+                time.sleep(0.005)
                 
     except KeyboardInterrupt:
         processing_active = False
     finally:
         processing_active = False
-        # Write remaining logs to file
-        if log_buffer:
-            with open(log_file, mode='a', newline='') as f:
-                writer = csv.writer(f)
-                for log_entry in log_buffer:
-                    writer.writerow(log_entry)
-            log_buffer.clear()
+        if preview is not None:
+            preview.stop()
+            print(f"Preview: {preview.summary()}")
+        if events is not None:
+            print(f"Events: {events.summary()}")
+            events.stop()
+        if gc_scheduler is not None:
+            gc_scheduler.disable()
+            print(f"GC:\n{gc_scheduler.summary()}")
+        if receiver is not None:
+            receiver.stop()
+            for source_id, stats in receiver.stats.items():
+                print(f"Landmark link from source {source_id}: {stats.summary()}")
+        pool.shutdown()
+        command_executor.shutdown(wait=False, cancel_futures=True)
         time.sleep(0.5)
-        cv2.destroyAllWindows()
-        if 'hands' in globals():
-            hands.close()
-        if driver:
-            try:
-                driver.quit()
-            except:
-                pass
-        print(f"✅ Exited. Log saved to {log_file}")
+        if not args.headless:
+            cv2.destroyAllWindows()
+        for session in sessions:
+            if session.monitor is not None:
+                session.monitor.stop()
+            if isinstance(session.backend, SeleniumBackend) and session.selenium_active:
+                try:
+                    fetch_page_telemetry(session)
+                except Exception as e:
+                    print(f"Could not fetch page telemetry: {e}")
+            # Updates from commands that finished after the last frame
+            session.store.apply_pending()
+            # Write remaining logs to file
+            flush_gesture_log(session)
+            if session.log is not None:
+                session.log.close()
+            if session.recorder is not None:
+                session.recorder.close()
+                print(f"Landmarks recorded to {session.recorder.path}")
+            if session.hands is not None:
+                session.hands.close()
+            if session.backend is not None:
+                session.backend.close()
+            elif session.driver:
+                try:
+                    session.driver.quit()
+                except:
+                    pass
+            print(f"{session.name} latency (ms): {session.latency.summary()}")
+            if session.frame_ages:
+                print(f"{session.name} frame age at inference: {frame_age_summary(session)}")
+            print(f"{session.name} speed corrections: {session.speed_corrections.summary()}")
+            print(f"{session.name} volume corrections: {session.volume_corrections.summary()}")
+            if session.page_telemetry_seq:
+                print(f"{session.name} in-page command timings: {page_telemetry_summary(session)}")
+            if session.monitor is not None and session.monitor.recoveries:
+                print(f"{session.name} browser recoveries: "
+                      + ", ".join(f"{kind} {elapsed:.2f}s" for kind, elapsed in session.monitor.recoveries))
+            print(f"✅ Exited. Log saved to {session.log_file}")
 if __name__ == "__main__":
     try:
         main()